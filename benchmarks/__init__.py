@@ -0,0 +1,10 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       __init__.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_cache.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+# Run three syncs against the stub server (cold cache, warm cache, expired cache revalidated with ETags)
+# and report the API requests made and the cache counters.
+#
+#   python -m benchmarks.bench_cache --recipes 3000
+#
+
+import argparse
+import tempfile
+import time
+
+from benchmarks.fake_graph import FakeGraph
+from benchmarks.stub_server import StubServer
+from utils.database import Database
+from utils.recipe_downloader import RecipeDownloader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the API traffic saved by the response cache")
+    parser.add_argument('--recipes', type=int, default=3000)
+    args = parser.parse_args()
+
+    server = StubServer(total=args.recipes).start()
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            for run, ttl in (('cold', 3600), ('warm', 3600), ('expired', 0)):
+                settings = {'bearer': '', 'base_url': server.url, 'rate_limit': 0, 'incremental': False,
+                            'cache_dir': directory, 'cache_ttl': ttl, 'similarity': False}
+                downloader = RecipeDownloader(settings)
+                requests_before = server.requests
+                start = time.perf_counter()
+                downloader.download_recipes(Database(FakeGraph(0)))
+                elapsed = time.perf_counter() - start
+                print(f"{run:<8} {elapsed:6.2f} s  {server.requests - requests_before:5d} API requests  "
+                      f"{downloader.cache.stats()}")
+                downloader.cache.close()
+        finally:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
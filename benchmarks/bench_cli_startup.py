@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_cli_startup.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Startup cost of the headless sync: wall time of a fresh interpreter importing the modules sync.py needs,
+# against a bare interpreter, the slowest imports reported by -X importtime, and a check that PyQt5 stays out.
+# With --check, `python sync.py --check` is timed as well (it needs the settings and a reachable Neo4j).
+#
+#   python -m benchmarks.bench_cli_startup --repeat 10
+#
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# What `python sync.py` imports before its first sync
+IMPORTS = "import sync, utils.database, utils.settings, utils.market_sync, utils.recipe_downloader"
+
+
+def wall_time(command, repeat):
+    """
+    Return the median wall time of a command, in milliseconds, and its last exit code.
+    """
+    timings = []
+    code = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        code = subprocess.run(command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), code
+
+
+def qt_loaded():
+    """
+    Return whether the sync imports load PyQt5, or the error raised by the imports.
+    """
+    result = subprocess.run([sys.executable, '-c', IMPORTS + "; import sys; print('PyQt5' in sys.modules)"],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode:
+        return result.stderr.strip().splitlines()[-1]
+    return result.stdout.strip()
+
+
+def slowest_imports(count):
+    """
+    Return the `count` modules with the highest cumulative import time, in milliseconds.
+    """
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', IMPORTS], cwd=ROOT,
+                            capture_output=True, text=True).stderr
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Only the top-level imports, the nested ones are part of their cumulative time
+        if not name.startswith('  '):
+            modules.append((int(cumulative) / 1000, name.strip()))
+    return sorted(modules, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the import and startup time of the headless sync")
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--top', type=int, default=10, help="number of slowest imports shown")
+    parser.add_argument('--check', action='store_true', help="also time `python sync.py --check`")
+    args = parser.parse_args()
+
+    baseline, _ = wall_time([sys.executable, '-c', 'pass'], args.repeat)
+    imports, _ = wall_time([sys.executable, '-c', IMPORTS], args.repeat)
+    print(f"bare interpreter   {baseline:8.1f} ms")
+    print(f"sync imports       {imports:8.1f} ms  (+{imports - baseline:.1f} ms, PyQt5 loaded: {qt_loaded()})")
+    if args.check:
+        check, code = wall_time([sys.executable, 'sync.py', '--check'], args.repeat)
+        print(f"sync.py --check    {check:8.1f} ms  (exit code {code})")
+    for cumulative, name in slowest_imports(args.top):
+        print(f"  {cumulative:8.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
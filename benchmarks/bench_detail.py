@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_detail.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Size of the search results with full recipe subgraphs against the summary rows returned now, and latency of
+# get_recipe_detail() without and with its LRU cache. This needs a Neo4j instance with recipes in it.
+#
+#   python -m benchmarks.bench_detail --password secret
+#
+
+import argparse
+import json
+import time
+
+from utils.database import Database, build_search_query
+
+# What each search row carried before: every node of the recipe subgraph
+FULL_RETURN = " WITH DISTINCT r" \
+              " RETURN [(i:Ingredient)-[:INGREDIENT_IN]->(r) | i] AS Ingredients," \
+              " [(s:Step)-[:STEP_IN]->(r) | s] AS Steps," \
+              " [(c:Cuisine)-[:CUISINE_OF]->(r) | c] AS Cuisine," \
+              " [(t:Tag)-[:TAG_OF]->(r) | t] AS Tags," \
+              " r AS Recipes"
+
+
+def payload(graph, query, parameters):
+    """
+    Return the number of rows, their size once serialised to JSON in megabytes, and the duration of a query.
+    """
+    start = time.perf_counter()
+    rows = graph.run(query, parameters).data()
+    elapsed = time.perf_counter() - start
+    size = len(json.dumps(rows, default=lambda value: dict(value)).encode())
+    return len(rows), size / 1024 / 1024, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare full and summary search rows, and the detail cache")
+    parser.add_argument('--uri', default='bolt://localhost:7687')
+    parser.add_argument('--user', default='neo4j')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--cuisine', default='', help="cuisine filter of the search, all the recipes by default")
+    parser.add_argument('--details', type=int, default=100, help="number of recipes opened, within the cache size")
+    args = parser.parse_args()
+
+    db = Database(settings={'neo4j': {'uri': args.uri, 'user': args.user, 'password': args.password}})
+    query, parameters = build_search_query(args.cuisine, "", "", [])
+    full_query = query[:query.index(" WITH DISTINCT r")] + FULL_RETURN
+    for name, statement in (('full', full_query), ('summary', query)):
+        rows, size, elapsed = payload(db.graph, statement, parameters)
+        print(f"search {name:<8} {rows:7d} rows {size:9.1f} MB {elapsed:6.2f} s")
+
+    recipe_ids = [row['_id'] for row in db.get_recipe_page(limit=args.details)]
+    for name in ('cold', 'cached'):
+        start = time.perf_counter()
+        for recipe_id in recipe_ids:
+            db.get_recipe_detail(recipe_id)
+        elapsed = (time.perf_counter() - start) * 1000 / max(len(recipe_ids), 1)
+        print(f"detail {name:<8} {elapsed:7.2f} ms per recipe")
+    print(f"detail cache {db.details.stats()}")
+
+
+if __name__ == '__main__':
+    main()
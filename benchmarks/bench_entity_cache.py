@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_entity_cache.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Effect of the sync-scoped entity cache: node rows sent to the merges, round trips and recipes per second of
+# put_recipes and put_recipes_bulk, without and with a SeenEntities shared by all the pages of the sync.
+#
+#   python -m benchmarks.bench_entity_cache --recipes 5000 --latency 0.0005
+#
+
+import argparse
+import time
+
+from benchmarks.fake_graph import FakeGraph
+from benchmarks.payloads import make_pages
+from utils.database import Database, UNWIND_MERGE_NODES
+from utils.entity_cache import SeenEntities
+
+
+def merged_rows(graph):
+    # Rows sent to the UNWIND node merges
+    prefix = UNWIND_MERGE_NODES.split("{label}")[0]
+    return sum(len(parameters['rows']) for cypher, parameters in graph.statements if cypher.startswith(prefix))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the merges avoided by the entity cache")
+    parser.add_argument('--recipes', type=int, default=5000)
+    parser.add_argument('--take', type=int, default=100)
+    parser.add_argument('--legacy-recipes', type=int, default=500, help="recipes written by put_recipes")
+    parser.add_argument('--latency', type=float, default=0.0005, help="fake round trip latency, in seconds")
+    parser.add_argument('--cache-size', type=int, default=100000)
+    args = parser.parse_args()
+
+    for method, recipes in (('put_recipes', args.legacy_recipes), ('put_recipes_bulk', args.recipes)):
+        pages = list(make_pages(recipes, args.take))
+        for cached in (False, True):
+            graph = FakeGraph(args.latency)
+            db = Database(graph)
+            seen = SeenEntities(args.cache_size) if cached else None
+            start = time.perf_counter()
+            for page in pages:
+                getattr(db, method)(page['items'], seen=seen)
+            elapsed = time.perf_counter() - start
+            line = f"{method:<17} cache={cached!s:<5} {recipes / elapsed:9.1f} recipes/s  " \
+                   f"{graph.round_trips:7d} round trips"
+            if method == 'put_recipes_bulk':
+                line += f"  {merged_rows(graph):7d} node rows merged"
+            if seen is not None:
+                line += f"  {seen.stats()['skipped']} merges avoided"
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_facet_index.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+# Build time, memory per 10k recipes and query latency of the in-memory FacetIndex, on synthetic recipes.
+# With --uri, the same filters are also run through Database.search for comparison (the database must hold
+# the same synthetic recipes, see bench_search --load).
+#
+#   python -m benchmarks.bench_facet_index --recipes 50000
+#   python -m benchmarks.bench_facet_index --recipes 50000 --uri bolt://localhost:7687 --password secret
+#
+
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.payloads import make_pages
+from utils.facet_index import FacetIndex
+
+# Filter combinations: (cuisine, tag, ingredients, match all ingredients)
+SCENARIOS = {
+    'cuisine': ("Cuisine 3", None, [], False),
+    'cuisine+tag': ("Cuisine 3", "Tag 7", [], False),
+    'any ingredient': (None, None, ["Ingredient 10", "Ingredient 42"], False),
+    'all ingredients': (None, None, ["Ingredient 10", "Ingredient 42"], True),
+    'all filters': ("Cuisine 3", "Tag 7", ["Ingredient 10"], False),
+}
+
+
+def median_us(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the FacetIndex build, memory and query latency")
+    parser.add_argument('--recipes', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--uri', help="also time Database.search on this Neo4j instance")
+    parser.add_argument('--user', default='neo4j')
+    parser.add_argument('--password', default='')
+    args = parser.parse_args()
+
+    pages = [page['items'] for page in make_pages(args.recipes, take=1000)]
+
+    # Build time, then memory in a second build: tracing allocations slows the build down
+    start = time.perf_counter()
+    index = FacetIndex()
+    for items in pages:
+        index.add_recipes(items)
+    build = time.perf_counter() - start
+
+    tracemalloc.start()
+    traced = FacetIndex()
+    for items in pages:
+        traced.add_recipes(items)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del traced
+    print(f"build {build:.2f} s for {len(index)} recipes, "
+          f"{memory / 1024 / 1024 / len(index) * 10000:.1f} MB per 10k recipes")
+
+    db = None
+    if args.uri:
+        from utils.database import Database
+        db = Database(settings={'neo4j': {'uri': args.uri, 'user': args.user, 'password': args.password}})
+
+    for name, (cuisine, tag, ingredients, match_all) in SCENARIOS.items():
+        def query():
+            bitmap = index.match(cuisine, tag, ingredients, match_all)
+            return index.count(bitmap)
+
+        def query_with_counts():
+            bitmap = index.match(cuisine, tag, ingredients, match_all)
+            return index.counts('cuisine', bitmap), index.counts('tag', bitmap)
+
+        line = f"{name:<16} {query():6d} recipes  match {median_us(query, args.repeat):8.1f} us  " \
+               f"match+facet counts {median_us(query_with_counts, args.repeat):9.1f} us"
+        if db is not None:
+            search = lambda: db.search(cuisine or "", tag or "", "", ingredients, match_all)
+            line += f"  Database.search {median_us(search, 3) / 1000:8.1f} ms"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
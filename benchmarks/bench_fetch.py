@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_fetch.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+# Measure pages per second of the PageFetcher against the local stub server, for several concurrency levels.
+#
+#   python -m benchmarks.bench_fetch --recipes 5000 --latency 0.2 --error-rate 0.05
+#
+
+import argparse
+import time
+
+from benchmarks.stub_server import StubServer
+from utils.fetcher import PageFetcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure PageFetcher throughput against the stub server")
+    parser.add_argument('--recipes', type=int, default=2000)
+    parser.add_argument('--take', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.2, help="stub response latency, in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate', type=float, default=0.0, help="token bucket rate, 0 to disable")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    server = StubServer(total=args.recipes, latency=args.latency, error_rate=args.error_rate).start()
+    try:
+        for concurrency in args.concurrency:
+            fetcher = PageFetcher(server.url, concurrency=concurrency, rate=args.rate, backoff=0.01)
+            start = time.perf_counter()
+            pages = sum(1 for _ in fetcher.map(lambda skip: fetcher.get({'take': args.take, 'skip': skip}),
+                                               range(0, args.recipes, args.take)))
+            elapsed = time.perf_counter() - start
+            fetcher.close()
+            print(f"concurrency={concurrency:<3} {pages / elapsed:8.1f} pages/s  {fetcher.retries} retries")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_incremental.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+# Compare a first (full) sync with a steady-state incremental sync of the same catalogue.
+#
+#   python -m benchmarks.bench_incremental --recipes 3000
+#
+
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.fake_graph import FakeGraph
+from benchmarks.stub_server import StubServer
+from utils.database import Database
+from utils.recipe_downloader import RecipeDownloader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a full sync with a steady-state incremental sync")
+    parser.add_argument('--recipes', type=int, default=3000)
+    parser.add_argument('--db-latency', type=float, default=0.002, help="fake round trip latency, in seconds")
+    args = parser.parse_args()
+
+    server = StubServer(total=args.recipes).start()
+    with tempfile.TemporaryDirectory() as directory:
+        settings = {'bearer': '', 'base_url': server.url, 'rate_limit': 0, 'cache': False,
+                    'state_path': os.path.join(directory, 'state.sqlite'), 'similarity': False}
+        try:
+            for run in ('first', 'steady-state'):
+                downloader = RecipeDownloader(settings)
+                graph = FakeGraph(args.db_latency)
+                start = time.perf_counter()
+                downloader.download_recipes(Database(graph))
+                elapsed = time.perf_counter() - start
+                print(f"{run:<13} {elapsed:7.2f} s  {graph.round_trips:6d} round trips  {downloader.state.counts}")
+        finally:
+            server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_ingest.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+# Compare recipes per second between Database.put_recipes and Database.put_recipes_bulk.
+# With --uri, the target database is emptied before each run, and its constraints dropped unless --schema is given:
+# use an instance dedicated to benchmarks, and confirm with --wipe.
+#
+#   python -m benchmarks.bench_ingest                      (recorded fake, 0.5 ms per round trip)
+#   python -m benchmarks.bench_ingest --uri bolt://localhost:7687 --password secret --wipe [--schema]
+#
+
+import argparse
+import time
+
+from benchmarks.fake_graph import FakeGraph
+from benchmarks.payloads import make_pages
+from utils.database import Database
+from utils.schema import SchemaManager
+
+
+def run(db, pages, method, batch_pages=1):
+    """
+    Write every page through the given Database method and return the number of recipes per second.
+    """
+    nb_recipes = 0
+    start = time.perf_counter()
+    batch = []
+    for page_index, page in enumerate(pages, start=1):
+        batch.extend(page['items'])
+        nb_recipes += len(page['items'])
+        if page_index % batch_pages == 0:
+            getattr(db, method)(batch)
+            batch = []
+    if batch:
+        getattr(db, method)(batch)
+    return nb_recipes / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare put_recipes and put_recipes_bulk throughput")
+    parser.add_argument('--recipes', type=int, default=1000)
+    parser.add_argument('--take', type=int, default=100)
+    parser.add_argument('--batch-pages', type=int, default=1)
+    parser.add_argument('--latency', type=float, default=0.0005, help="fake round trip latency, in seconds")
+    parser.add_argument('--uri', help="run against a real Neo4j instance instead of the fake")
+    parser.add_argument('--user', default='neo4j')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--schema', action='store_true',
+                        help="with --uri, create the constraints and indexes first (they are dropped otherwise)")
+    parser.add_argument('--wipe', action='store_true', help="with --uri, confirm that the database is emptied")
+    args = parser.parse_args()
+    if args.uri and not args.wipe:
+        parser.error(f"every node of {args.uri} is deleted, confirm with --wipe")
+
+    for method, batch_pages in (('put_recipes', 1), ('put_recipes_bulk', args.batch_pages)):
+        pages = list(make_pages(args.recipes, args.take))
+        if args.uri:
+            from py2neo import Graph
+            graph = Graph(args.uri, auth=(args.user, args.password))
+            graph.run("MATCH (n) DETACH DELETE n")
+            if args.schema:
+                SchemaManager(graph).ensure(wait=True)
+            else:
+                SchemaManager(graph).drop()
+        else:
+            graph = FakeGraph(args.latency)
+        rate = run(Database(graph), pages, method, batch_pages)
+        round_trips = getattr(graph, 'round_trips', None)
+        print(f"{method:<18} {rate:10.1f} recipes/s" + (f"  {round_trips} round trips" if round_trips else ""))
+
+
+if __name__ == '__main__':
+    main()
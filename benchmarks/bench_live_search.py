@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_live_search.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Latency percentiles of the as-you-type search: the full-text index query against a CONTAINS scan of the names.
+# The queries replay someone typing synthetic recipe names, one query per keystroke from the third character.
+# This needs a Neo4j instance dedicated to benchmarks: --load fills it with synthetic recipes first.
+#
+#   python -m benchmarks.bench_live_search --password secret --load --recipes 50000
+#
+
+import argparse
+import random
+import time
+
+from benchmarks.payloads import make_pages
+from utils.database import Database
+
+# The query the search box used before the full-text index, scanning every recipe name
+CONTAINS_QUERY = "MATCH (r:Recette) WHERE toLower(r.name) CONTAINS toLower($query) " \
+                 "RETURN r._id AS _id, r.name AS name, r.headline AS headline LIMIT $limit"
+
+
+def keystrokes(recipes, queries, seed):
+    """
+    Return the successive texts of the search box while `queries` random recipe names are typed.
+    """
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(queries):
+        name = f"Recipe {rng.randrange(recipes)}"
+        texts.extend(name[:length] for length in range(3, len(name) + 1))
+    return texts
+
+
+def percentile(timings, fraction):
+    """
+    Return the value below which `fraction` of the sorted timings fall.
+    """
+    return timings[min(len(timings) - 1, int(fraction * len(timings)))]
+
+
+def measure(search, texts):
+    """
+    Run `search` on each text and return the p50, p95 and maximum latencies in milliseconds.
+    """
+    timings = []
+    for text in texts:
+        start = time.perf_counter()
+        search(text)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return percentile(timings, 0.5), percentile(timings, 0.95), timings[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the latency of the as-you-type recipe search")
+    parser.add_argument('--uri', default='bolt://localhost:7687')
+    parser.add_argument('--user', default='neo4j')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--recipes', type=int, default=50000)
+    parser.add_argument('--load', action='store_true', help="load the synthetic recipes before measuring")
+    parser.add_argument('--queries', type=int, default=100, help="number of recipe names typed")
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    db = Database(settings={'neo4j': {'uri': args.uri, 'user': args.user, 'password': args.password}})
+    db.ensure_schema(wait=True)
+    if args.load:
+        for page in make_pages(args.recipes, take=1000):
+            db.put_recipes_bulk(page['items'])
+
+    texts = keystrokes(args.recipes, args.queries, args.seed)
+    scenarios = {
+        'contains': lambda text: db.graph.run(CONTAINS_QUERY, query=text, limit=args.limit).data(),
+        'fulltext': lambda text: db.search_names(text, args.limit),
+    }
+    for name, search in scenarios.items():
+        p50, p95, worst = measure(search, texts)
+        print(f"{name:<9} {len(texts)} queries  p50 {p50:7.1f} ms  p95 {p95:7.1f} ms  max {worst:7.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_markets.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Sync several markets from the local stub server one after the other, then in parallel with MarketSync,
+# each market with its own rate limit. Prints the throughput of each market and in aggregate.
+#
+#   python -m benchmarks.bench_markets --markets 4 --recipes 2000 --rate 5
+#
+
+import argparse
+import time
+
+from benchmarks.fake_graph import FakeGraph
+from benchmarks.stub_server import StubServer
+from utils.database import Database
+from utils.market_sync import MarketSync
+from utils.recipe_downloader import RecipeDownloader
+
+# Markets synced by the benchmark, the stub serves the same pages to each of them
+MARKETS = [{'country': 'FR', 'locale': 'fr-FR'}, {'country': 'DE', 'locale': 'de-DE'},
+           {'country': 'BE', 'locale': 'nl-BE'}, {'country': 'GB', 'locale': 'en-GB'},
+           {'country': 'NL', 'locale': 'nl-NL'}, {'country': 'CH', 'locale': 'fr-CH'}]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sequential and parallel multi-market syncs")
+    parser.add_argument('--markets', type=int, default=4, choices=range(1, len(MARKETS) + 1))
+    parser.add_argument('--recipes', type=int, default=2000, help="recipes per market")
+    parser.add_argument('--latency', type=float, default=0.1, help="stub response latency, in seconds")
+    parser.add_argument('--db-latency', type=float, default=0.005, help="fake round trip latency, in seconds")
+    parser.add_argument('--rate', type=float, default=5.0, help="requests per second allowed per market")
+    args = parser.parse_args()
+
+    server = StubServer(total=args.recipes, latency=args.latency).start()
+    try:
+        settings = {'bearer': '', 'base_url': server.url, 'rate_limit': args.rate, 'incremental': False,
+                    'cache': False, 'markets': MARKETS[:args.markets], 'similarity': False}
+
+        db = Database(FakeGraph(args.db_latency))
+        start = time.perf_counter()
+        for market in settings['markets']:
+            RecipeDownloader(settings, market=market).download_recipes(db)
+        elapsed = time.perf_counter() - start
+        print(f"sequential {args.recipes * args.markets / elapsed:8.1f} recipes/s ({elapsed:.1f} s)")
+
+        sync = MarketSync(settings)
+        sync.download_recipes(Database(FakeGraph(args.db_latency)))
+        total = sync.throughput()['total']
+        print(f"parallel   {total['recipes_per_second']:8.1f} recipes/s ({total['seconds']:.1f} s)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
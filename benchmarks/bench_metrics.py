@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_metrics.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Cost of the instrumentation: time per counter increment, histogram observation and timer block, then the bulk
+# ingest throughput with the metrics enabled and disabled (on the recorded fake, no latency by default so that
+# the overhead is not hidden by the round trips). Finally prints the registry as exported in the metrics file.
+#
+#   python -m benchmarks.bench_metrics --recipes 2000 [--prometheus]
+#
+
+import argparse
+import json
+import time
+
+from benchmarks.fake_graph import FakeGraph
+from benchmarks.payloads import make_pages
+from utils.database import Database
+from utils.metrics import Metrics, metrics
+
+
+def per_call(function, repeat):
+    """
+    Return the mean duration of a call, in microseconds.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def ingest(pages, repeat):
+    """
+    Write the pages with put_recipes_bulk, alternating runs with the metrics disabled and enabled,
+    and return the best recipes per second of each.
+    """
+    nb_recipes = sum(len(page['items']) for page in pages)
+    best = {False: 0.0, True: 0.0}
+    for _ in range(repeat):
+        for enabled in (False, True):
+            metrics.enabled = enabled
+            db = Database(FakeGraph(0))
+            start = time.perf_counter()
+            for page in pages:
+                db.put_recipes_bulk(page['items'])
+            best[enabled] = max(best[enabled], nb_recipes / (time.perf_counter() - start))
+    return best[False], best[True]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the overhead of the metrics")
+    parser.add_argument('--recipes', type=int, default=2000)
+    parser.add_argument('--take', type=int, default=100)
+    parser.add_argument('--calls', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--prometheus', action='store_true', help="print the Prometheus text instead of JSON")
+    args = parser.parse_args()
+
+    registry = Metrics()
+    disabled = Metrics(enabled=False)
+
+    def timer_block():
+        with registry.timer('bench_seconds', statement='x'):
+            pass
+
+    print(f"inc                {per_call(lambda: registry.inc('bench_total', status=200), args.calls):6.2f} us")
+    print(f"observe            {per_call(lambda: registry.observe('bench_seconds', 0.01), args.calls):6.2f} us")
+    print(f"timer block        {per_call(timer_block, args.calls):6.2f} us")
+    print(f"observe, disabled  {per_call(lambda: disabled.observe('bench_seconds', 0.01), args.calls):6.2f} us")
+
+    pages = list(make_pages(args.recipes, args.take))
+    off, on = ingest(pages, args.repeat)
+    print(f"bulk ingest, metrics off {off:10.1f} recipes/s")
+    print(f"bulk ingest, metrics on  {on:10.1f} recipes/s  ({(off - on) / off * 100:+.2f} % overhead)")
+
+    print(metrics.prometheus() if args.prometheus else json.dumps(metrics.as_dict(), indent=1))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_offline_import.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Cold rebuild of the graph from cached pages: replaying them through put_recipes and put_recipes_bulk, against
+# the offline import (parallel normalisation to CSV, then LOAD CSV). Without --uri only the normalisation is
+# measured, for 1 process then --processes. With --uri the database is emptied before each run: use an instance
+# dedicated to benchmarks, confirm with --wipe, and point --import-dir at its import directory.
+#
+#   python -m benchmarks.bench_offline_import --recipes 20000 --processes 8
+#   python -m benchmarks.bench_offline_import --uri bolt://localhost:7687 --password secret --wipe \
+#       --import-dir /var/lib/neo4j/import --recipes 20000
+#
+
+import argparse
+import tempfile
+import time
+
+from benchmarks.payloads import make_pages
+from utils.cache import ResponseCache, read_blob
+from utils.database import Database
+from utils.offline_import import OfflineImport
+
+
+def fill_cache(directory, recipes, take):
+    """
+    Store the synthetic pages in a response cache, as a sync would, and return the paths of its blobs.
+    """
+    cache = ResponseCache(directory, max_bytes=0)
+    for page in make_pages(recipes, take):
+        cache.store('https://example.test/recipes', {'skip': page['skip'], 'take': take}, page)
+    paths = cache.blob_paths()
+    cache.close()
+    return paths
+
+
+def normalise(paths, output_dir, processes):
+    """
+    Normalise the cached pages to CSV files and return the importer and the duration.
+    """
+    start = time.perf_counter()
+    importer = OfflineImport(output_dir, processes).normalise(paths)
+    importer.write()
+    return importer, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a cold rebuild through put_recipes and the offline import")
+    parser.add_argument('--recipes', type=int, default=20000)
+    parser.add_argument('--take', type=int, default=100)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--uri', help="also rebuild a real Neo4j instance")
+    parser.add_argument('--user', default='neo4j')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--wipe', action='store_true', help="with --uri, confirm that the database is emptied")
+    parser.add_argument('--import-dir', help="import directory of the Neo4j instance, for LOAD CSV")
+    args = parser.parse_args()
+    if args.uri and not args.wipe:
+        parser.error(f"every node of {args.uri} is deleted, confirm with --wipe")
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = fill_cache(directory, args.recipes, args.take)
+        output_dir = args.import_dir or f"{directory}/import"
+        for processes in (1, args.processes):
+            importer, elapsed = normalise(paths, output_dir, processes)
+            print(f"normalise {processes:2d} processes {args.recipes / elapsed:10.1f} recipes/s  "
+                  f"({elapsed:.1f} s, {importer.duplicates} duplicates)")
+        if not args.uri:
+            return
+
+        db = Database(settings={'neo4j': {'uri': args.uri, 'user': args.user, 'password': args.password}})
+        for method in ('put_recipes', 'put_recipes_bulk', 'load_csv'):
+            db.graph.run("MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS")
+            db.ensure_schema(wait=True)
+            start = time.perf_counter()
+            if method == 'load_csv':
+                importer, _ = normalise(paths, output_dir, args.processes)
+                importer.load_csv(db.graph)
+            else:
+                for path in paths:
+                    getattr(db, method)(read_blob(path)['items'])
+            elapsed = time.perf_counter() - start
+            print(f"{method:<18} {args.recipes / elapsed:10.1f} recipes/s  ({elapsed:.1f} s)  {db.count_graph()[0]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_pipeline.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+# Compare the sequential and the pipelined sync against the stub server and the recorded fake graph.
+#
+#   python -m benchmarks.bench_pipeline --recipes 3000 --latency 0.1
+#
+
+import argparse
+import time
+
+from benchmarks.fake_graph import FakeGraph
+from benchmarks.stub_server import StubServer
+from utils.database import Database
+from utils.recipe_downloader import RecipeDownloader
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the sequential and the pipelined sync")
+    parser.add_argument('--recipes', type=int, default=3000)
+    parser.add_argument('--latency', type=float, default=0.1, help="stub response latency, in seconds")
+    parser.add_argument('--db-latency', type=float, default=0.05, help="fake round trip latency, in seconds")
+    parser.add_argument('--writers', type=int, default=1)
+    args = parser.parse_args()
+
+    server = StubServer(total=args.recipes, latency=args.latency).start()
+    try:
+        for pipeline in (False, True):
+            settings = {'bearer': '', 'base_url': server.url, 'rate_limit': 0,
+                        'pipeline': pipeline, 'writers': args.writers, 'incremental': False, 'cache': False,
+                        'similarity': False}
+            downloader = RecipeDownloader(settings)
+            start = time.perf_counter()
+            downloader.download_recipes(Database(FakeGraph(args.db_latency)))
+            elapsed = time.perf_counter() - start
+            print(f"pipeline={pipeline!s:<5} {args.recipes / elapsed:8.1f} recipes/s")
+            if downloader.stats is not None:
+                print(f"  {downloader.stats}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
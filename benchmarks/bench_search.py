@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_search.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+# Compare the former single-MATCH search query with the planned, parameterised one on a synthetic graph.
+# This needs a Neo4j instance dedicated to benchmarks: --load fills it with synthetic recipes first.
+# With --compare-schema every scenario is measured without, then with the constraints and indexes.
+#
+#   python -m benchmarks.bench_search --uri bolt://localhost:7687 --password secret --load --recipes 50000
+#   python -m benchmarks.bench_search --password secret --compare-schema
+#
+
+import argparse
+import statistics
+import time
+
+from py2neo import Graph
+
+from benchmarks.payloads import make_pages
+from utils.database import Database, build_search_query
+from utils.schema import SchemaManager
+
+
+def legacy_search_query(selected_cuisine, selected_tag, recipe_name, selected_ingredients):
+    """
+    The search query as it was built before the planner, with values inlined in the Cypher text.
+    """
+    conditions = []
+    q = "MATCH (r:Recette), " \
+        "(r:Recette)-[:INGREDIENT_IN]-(i:Ingredient), " \
+        "(r:Recette)-[:STEP_IN]-(s:Step), " \
+        "(r:Recette)-[:CUISINE_OF]-(c:Cuisine), " \
+        "(r:Recette)-[:TAG_OF]-(t:Tag) "
+    if selected_cuisine:
+        conditions.append(f"c.name = '{selected_cuisine}'")
+    if selected_tag:
+        conditions.append(f"t.name = '{selected_tag}'")
+    if recipe_name:
+        conditions.append(f"r.name CONTAINS '{recipe_name}'")
+    if selected_ingredients:
+        conditions.append(f"i.name IN {selected_ingredients}")
+    query = q + " WHERE " + " AND ".join(conditions) if conditions else q
+    query += " RETURN COLLECT(DISTINCT i) AS Ingredients, " \
+             "COLLECT(DISTINCT s) AS Steps, " \
+             "COLLECT(DISTINCT c) AS Cuisine, " \
+             "COLLECT(DISTINCT t) AS Tags, " \
+             "r AS Recipes, " \
+             "size([(r)-[:INGREDIENT_IN]->(i) | i]) AS NumberOfIngredients, " \
+             "r.prepTime AS PrepTime " \
+             "ORDER BY NumberOfIngredients DESC"
+    return query, {}
+
+
+# Filter combinations used by the benchmark: (cuisine, tag, recipe name, ingredients)
+SCENARIOS = {
+    'cuisine': ("Cuisine 3", "", "", []),
+    'cuisine+tag': ("Cuisine 3", "Tag 7", "", []),
+    'name': ("", "", "Recipe 123", []),
+    'ingredients': ("", "", "", ["Ingredient 10", "Ingredient 42"]),
+    'all filters': ("Cuisine 3", "Tag 7", "Recipe 1", ["Ingredient 10"]),
+}
+
+
+def measure(graph, query, parameters, repeat):
+    """
+    Return the median latency, in milliseconds, and the number of rows of a query.
+    """
+    timings = []
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(graph.run(query, parameters).data())
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the legacy and the planned search queries")
+    parser.add_argument('--uri', default='bolt://localhost:7687')
+    parser.add_argument('--user', default='neo4j')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--recipes', type=int, default=50000)
+    parser.add_argument('--load', action='store_true', help="load the synthetic recipes before measuring")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--compare-schema', action='store_true', help="measure without, then with the schema")
+    args = parser.parse_args()
+
+    graph = Graph(args.uri, auth=(args.user, args.password))
+    schema = SchemaManager(graph)
+    if args.load:
+        db = Database(graph)
+        schema.ensure(wait=True)
+        for page in make_pages(args.recipes, take=1000):
+            db.put_recipes_bulk(page['items'])
+
+    for with_schema in ((False, True) if args.compare_schema else (None,)):
+        if with_schema is not None:
+            if with_schema:
+                schema.ensure(wait=True)
+            else:
+                schema.drop()
+            print(f"--- {'with' if with_schema else 'without'} constraints and indexes")
+        for name, filters in SCENARIOS.items():
+            legacy, legacy_rows = measure(graph, *legacy_search_query(*filters), args.repeat)
+            planned, planned_rows = measure(graph, *build_search_query(*filters), args.repeat)
+            print(f"{name:<12} legacy {legacy:9.1f} ms ({legacy_rows} rows)  "
+                  f"planned {planned:9.1f} ms ({planned_rows} rows)")
+
+
+if __name__ == '__main__':
+    main()
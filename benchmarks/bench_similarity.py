@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_similarity.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Build time, lookup time, incremental update time and recall of the MinHash/LSH similarity index against the exact
+# Jaccard top-k. The recipes are seeded variants of base recipes (a few ingredients and tags swapped), so that
+# each one has real neighbours, unlike the independent draws of benchmarks.payloads.
+#
+#   python -m benchmarks.bench_similarity --recipes 50000 --queries 200
+#
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from utils.similarity import MinHashIndex, jaccard, numpy, recipe_tokens
+
+
+def make_rows(total, family_size=10, nb_ingredients=2000, nb_tags=60, nb_cuisines=25, seed=42):
+    """
+    Return (recipe _id, name, tokens) rows: families of `family_size` variants of a base recipe.
+    """
+    rng = random.Random(seed)
+    rows = []
+    base = None
+    for index in range(total):
+        if index % family_size == 0:
+            base = (rng.sample(range(nb_ingredients), rng.randint(8, 14)), rng.sample(range(nb_tags), 3),
+                    rng.randrange(nb_cuisines))
+        ingredients, tags, cuisine = base
+        ingredients = [rng.randrange(nb_ingredients) if rng.random() < 0.2 else i for i in ingredients]
+        tags = tags[:rng.randint(1, 3)]
+        rows.append((f"recipe-{index:08d}", f"Recipe {index}",
+                     recipe_tokens([f"Ingredient {i}" for i in ingredients], [f"Tag {t}" for t in tags],
+                                   [f"Cuisine {cuisine}"])))
+    return rows
+
+
+def exact_top(rows, query, k):
+    """
+    Return the positions of the k recipes with the highest exact Jaccard similarity, and the scores.
+    """
+    tokens = rows[query][2]
+    scored = [(jaccard(tokens, other[2]), position) for position, other in enumerate(rows) if position != query]
+    scored.sort(key=lambda pair: (-pair[0], pair[1]))
+    return scored[:k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the similarity index against exact Jaccard")
+    parser.add_argument('--recipes', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=200, help="recipes whose exact top-k is computed")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--num-perm', type=int, default=64)
+    parser.add_argument('--bands', type=int, nargs='+', default=[16, 32])
+    parser.add_argument('--min-similarity', type=float, default=0.3,
+                        help="exact neighbours below this similarity are left out of the second recall")
+    args = parser.parse_args()
+
+    print(f"Signatures computed with {'NumPy' if numpy is not None else 'pure Python (NumPy is not installed)'}")
+    rows = make_rows(args.recipes)
+    queries = random.Random(1).sample(range(len(rows)), min(args.queries, len(rows)))
+
+    start = time.perf_counter()
+    exact = {query: exact_top(rows, query, args.k) for query in queries}
+    exact_ms = (time.perf_counter() - start) / len(queries) * 1000
+    print(f"exact Jaccard top-{args.k}: {exact_ms:.1f} ms per recipe (scan of {len(rows)} recipes)")
+
+    for bands in args.bands:
+        index = MinHashIndex(args.num_perm, bands, args.k)
+        start = time.perf_counter()
+        index.build(rows)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query in queries:
+            index.similar(rows[query][0])
+        lookup_us = (time.perf_counter() - start) / len(queries) * 1e6
+
+        found = relevant = found_relevant = 0
+        for query, top in exact.items():
+            approximate = {neighbour['_id'] for neighbour in index.similar(rows[query][0])}
+            found += sum(rows[position][0] in approximate for _, position in top)
+            strong = [position for score, position in top if score >= args.min_similarity]
+            relevant += len(strong)
+            found_relevant += sum(rows[position][0] in approximate for position in strong)
+
+        # Incremental update: one page of changed recipes
+        page = [(recipe_id, name, set(list(tokens)[1:]) | {"i:New ingredient"})
+                for recipe_id, name, tokens in rows[:100]]
+        start = time.perf_counter()
+        index.add_many(page)
+        update_ms = (time.perf_counter() - start) * 1000
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'similarity')
+            index.save(path)
+            size = (os.path.getsize(f"{path}.json") + os.path.getsize(f"{path}.bin")) / 1024 / 1024
+            start = time.perf_counter()
+            loaded = MinHashIndex.load(path)
+            loaded.similar(rows[queries[0]][0])
+            load_ms = (time.perf_counter() - start) * 1000
+
+        print(f"bands={bands:<3} rows={args.num_perm // bands:<3} build {build:7.1f} s  lookup {lookup_us:6.1f} us  "
+              f"recall@{args.k} {found / (len(queries) * args.k):.3f}  "
+              f"recall of neighbours >= {args.min_similarity} {found_relevant / max(relevant, 1):.3f}  "
+              f"page update {update_ms:7.1f} ms  files {size:.1f} MB, read and first lookup {load_ms:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_startup.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Startup of the main window: import time, time to the first frame of the recipe table and time until the live
+# list is shown, for the eager start (list loaded before showing) and the fast start without, then with, a snapshot
+# of the previous list. Each run is a fresh process working in a temporary directory with its own settings.yaml.
+# This needs a Neo4j instance with recipes in it.
+#
+#   python -m benchmarks.bench_startup --password secret
+#
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(fast_start):
+    """
+    Import and show the main window, and return the timings of its startup, in milliseconds from this call.
+    """
+    start = time.perf_counter()
+    from PyQt5.QtCore import QEvent, QObject
+    from PyQt5.QtWidgets import QApplication
+    from ui.main_window import MainWindow
+    imported = time.perf_counter()
+
+    app = QApplication(sys.argv)
+    timings = {}
+
+    class PaintWatcher(QObject):
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint and 'first_frame' not in timings:
+                timings['first_frame'] = time.perf_counter()
+                timings['py2neo_loaded'] = 'py2neo' in sys.modules
+            return False
+
+    window = MainWindow(fast_start=fast_start)
+    if fast_start:
+        window.startup_loader.loaded.connect(lambda rows, count: timings.setdefault('live', time.perf_counter()))
+        window.startup_loader.failed.connect(lambda message: timings.setdefault('live', time.perf_counter()))
+    else:
+        timings['live'] = time.perf_counter()
+    watcher = PaintWatcher()
+    window.table.viewport().installEventFilter(watcher)
+    window.show()
+    while 'first_frame' not in timings or 'live' not in timings:
+        app.processEvents()
+    window.close()
+
+    return {'import_ms': round((imported - start) * 1000, 1),
+            'first_frame_ms': round((timings['first_frame'] - start) * 1000, 1),
+            'live_ms': round((timings['live'] - start) * 1000, 1),
+            'py2neo_at_first_frame': timings['py2neo_loaded']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the startup of the main window")
+    parser.add_argument('--uri', default='bolt://localhost:7687')
+    parser.add_argument('--user', default='neo4j')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--mode', choices=('eager', 'fast'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(measure(args.mode == 'fast')))
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, 'settings.yaml'), 'w') as file:
+            json.dump({'neo4j': {'uri': args.uri, 'user': args.user, 'password': args.password},
+                       'recipe_snapshot': os.path.join(directory, 'recipes.json')}, file)  # JSON is valid YAML
+        environment = dict(os.environ, PYTHONPATH=ROOT)
+        for name, mode in (('eager', 'eager'), ('fast, no snapshot', 'fast'), ('fast, snapshot', 'fast')):
+            start = time.perf_counter()
+            output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_startup', '--mode', mode],
+                                    cwd=directory, env=environment, capture_output=True, text=True,
+                                    check=True).stdout
+            process = (time.perf_counter() - start) * 1000
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{name:<18} import {result['import_ms']:7.1f} ms  first frame {result['first_frame_ms']:7.1f} ms  "
+                  f"live list {result['live_ms']:7.1f} ms  process {process:7.1f} ms  "
+                  f"(py2neo loaded at first frame: {result['py2neo_at_first_frame']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_streaming.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+# Peak Python memory (tracemalloc) of the .data() Database methods against their streaming iter_* variants.
+# Each result is consumed row by row, as the UI does. This needs a Neo4j instance with recipes in it.
+#
+#   python -m benchmarks.bench_streaming --password secret --fetch-size 1000
+#
+
+import argparse
+import time
+import tracemalloc
+
+from utils.database import Database
+
+
+def peak(function):
+    """
+    Consume the rows returned by `function` and return the peak traced memory in megabytes and the duration.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = 0
+    for _ in function():
+        rows += 1
+    elapsed = time.perf_counter() - start
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak_bytes / 1024 / 1024, elapsed, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak memory of .data() and streaming queries")
+    parser.add_argument('--uri', default='bolt://localhost:7687')
+    parser.add_argument('--user', default='neo4j')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--fetch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    db = Database(settings={'neo4j': {'uri': args.uri, 'user': args.user, 'password': args.password,
+                                      'fetch_size': args.fetch_size}})
+    scenarios = {
+        'recipes': (db.get_recipes, db.iter_recipes),
+        'ingredients': (db.get_ingredients, lambda: db.iter_names("Ingredient")),
+        'tags': (db.get_tags, lambda: db.iter_names("Tag")),
+        'cuisines': (db.get_cuisines, lambda: db.iter_names("Cuisine")),
+        'search': (lambda: db.search("", "", "", []), lambda: db.iter_search("", "", "", [])),
+    }
+    for name, (materialised, streamed) in scenarios.items():
+        data_peak, data_time, rows = peak(materialised)
+        stream_peak, stream_time, _ = peak(streamed)
+        print(f"{name:<12} {rows:7d} rows  .data() {data_peak:8.1f} MB {data_time:6.2f} s  "
+              f"streaming {stream_peak:8.1f} MB {stream_time:6.2f} s")
+
+
+if __name__ == '__main__':
+    main()
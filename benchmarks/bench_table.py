@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       bench_table.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+# Time-to-first-paint and resident memory of the recipe table: the former QTableWidget filled from get_recipes()
+# against the lazily paged RecipeTableModel. Each mode runs in its own process so that memory is not shared.
+# This needs a Neo4j instance dedicated to benchmarks: --load fills it with synthetic recipes first.
+#
+#   python -m benchmarks.bench_table --password secret --load --recipes 100000
+#
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+def resident_memory():
+    """
+    Return the resident set size of the current process, in megabytes (Linux only).
+    """
+    with open('/proc/self/statm') as file:
+        return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+
+def measure(mode, settings):
+    """
+    Build the table in the given mode, show it and wait for its first paint.
+    """
+    from PyQt5.QtCore import QEvent, QObject
+    from PyQt5.QtWidgets import QApplication, QTableView, QTableWidget, QTableWidgetItem
+    from ui.recipe_table_model import RecipeTableModel
+    from utils.database import Database
+
+    app = QApplication(sys.argv)
+    db = Database(settings=settings)
+    rss_before = resident_memory()
+
+    class PaintWatcher(QObject):
+        painted = None
+
+        def eventFilter(self, watched, event):
+            if event.type() == QEvent.Paint and self.painted is None:
+                self.painted = time.perf_counter()
+            return False
+
+    start = time.perf_counter()
+    if mode == 'legacy':
+        table = QTableWidget(0, 2)
+        recipes = db.get_recipes()
+        for i, recipe in enumerate(recipes):
+            table.insertRow(i)
+            table.setItem(i, 0, QTableWidgetItem(recipe['recette']['name']))
+            table.setItem(i, 1, QTableWidgetItem(recipe['recette']['_id']))
+    else:
+        table = QTableView()
+        model = RecipeTableModel(db)
+        table.setModel(model)
+        model.refresh()
+
+    watcher = PaintWatcher()
+    table.viewport().installEventFilter(watcher)
+    table.resize(1200, 800)
+    table.show()
+    while watcher.painted is None:
+        app.processEvents()
+
+    return {'mode': mode,
+            'first_paint_ms': round((watcher.painted - start) * 1000, 1),
+            'rss_mb': round(resident_memory() - rss_before, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time-to-first-paint and memory of the recipe table")
+    parser.add_argument('--uri', default='bolt://localhost:7687')
+    parser.add_argument('--user', default='neo4j')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--recipes', type=int, default=100000)
+    parser.add_argument('--load', action='store_true', help="load the synthetic recipes before measuring")
+    parser.add_argument('--mode', choices=('legacy', 'model'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    settings = {'neo4j': {'uri': args.uri, 'user': args.user, 'password': args.password}}
+    if args.mode:
+        print(json.dumps(measure(args.mode, settings)))
+        return
+
+    if args.load:
+        from benchmarks.payloads import make_pages
+        from utils.database import Database
+        db = Database(settings=settings)
+        db.ensure_schema(wait=True)
+        for page in make_pages(args.recipes, take=1000):
+            db.put_recipes_bulk(page['items'])
+
+    for mode in ('legacy', 'model'):
+        output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_table', '--uri', args.uri,
+                                 '--user', args.user, '--password', args.password, '--mode', mode],
+                                capture_output=True, text=True, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<7} first paint {result['first_paint_ms']:9.1f} ms  resident memory +{result['rss_mb']} MB")
+
+
+if __name__ == '__main__':
+    main()
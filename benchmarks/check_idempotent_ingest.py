@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       check_idempotent_ingest.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+# Store the same synthetic page twice, with both ingest paths, and check that the node and relationship counts
+# do not change on the second run. The target database is emptied first: use an instance dedicated to benchmarks,
+# and confirm with --wipe.
+#
+#   python -m benchmarks.check_idempotent_ingest --uri bolt://localhost:7687 --password secret --wipe
+#
+
+import argparse
+import sys
+
+from py2neo import Graph
+
+from benchmarks.payloads import make_page
+from utils.database import Database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that storing the same page twice leaves the graph unchanged")
+    parser.add_argument('--uri', required=True, help="Neo4j instance dedicated to benchmarks")
+    parser.add_argument('--user', default='neo4j')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--wipe', action='store_true', help="confirm that every node of the database is deleted")
+    args = parser.parse_args()
+    if not args.wipe:
+        parser.error(f"every node of {args.uri} is deleted, confirm with --wipe")
+
+    db = Database(Graph(args.uri, auth=(args.user, args.password)))
+    page = make_page(total=100, skip=0)
+    failed = False
+    for method in ('put_recipes', 'put_recipes_bulk'):
+        db.graph.run("MATCH (n) DETACH DELETE n")
+        getattr(db, method)(page['items'])
+        first = db.count_graph()
+        getattr(db, method)(page['items'])
+        second = db.count_graph()
+        ok = first == second
+        failed = failed or not ok
+        print(f"{method:<18} {'OK' if ok else 'FAILED'}  {first} -> {second}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
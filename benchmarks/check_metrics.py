@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       check_metrics.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Check that a registry whose series mix int and str label values, as http_responses_total{status=200} and
+# http_responses_total{status=error}, is exported in both formats and written by the file writer.
+#
+#   python -m benchmarks.check_metrics
+#
+
+import json
+import os
+import sys
+import tempfile
+
+from utils.metrics import Metrics, MetricsFileWriter
+
+
+def main():
+    registry = Metrics()
+    registry.inc('http_responses_total', status=200)
+    registry.inc('http_responses_total', status='error')
+    registry.inc('http_responses_total', status=200)
+    registry.observe('cypher_seconds', 0.01, statement='commit')
+    registry.observe('cypher_seconds', 0.02, statement=3)
+
+    checks = {}
+    counters = registry.as_dict()['counters']
+    checks['as_dict'] = counters == {'http_responses_total{status=200}': 2, 'http_responses_total{status=error}': 1}
+    text = registry.prometheus()
+    checks['prometheus'] = 'hellofresh_http_responses_total{status="200"} 2' in text and \
+        'hellofresh_http_responses_total{status="error"} 1' in text
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ('metrics.json', 'metrics.prom'):
+            path = os.path.join(directory, name)
+            MetricsFileWriter(registry, path).stop()
+            checks[f"writer {name}"] = os.path.exists(path)
+        with open(os.path.join(directory, 'metrics.json'), encoding='utf-8') as file:
+            checks['written json'] = json.load(file)['counters'] == counters
+
+    for name, ok in checks.items():
+        print(f"{name:<20} {'OK' if ok else 'FAILED'}")
+    sys.exit(0 if all(checks.values()) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       check_offline_import_markets.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Sync several markets from the local stub server into the fake graph, then normalise the cached pages as
+# offline_import.py does, and check that the import has exactly the node and relationship ids of the sync: an
+# import that did not prefix the ids with the locale would MERGE a second copy of every recipe.
+#
+#   python -m benchmarks.check_offline_import_markets --recipes 500
+#
+
+import argparse
+import os
+import sys
+import tempfile
+
+from benchmarks.bench_markets import MARKETS
+from benchmarks.fake_graph import FakeGraph
+from benchmarks.stub_server import StubServer
+from utils.cache import ResponseCache
+from utils.database import Database, NODE_LABELS, RELATIONSHIP_TYPES, UNWIND_MERGE_NODES, \
+    UNWIND_MERGE_RELATIONSHIPS
+from utils.market_sync import MarketSync
+from utils.offline_import import OfflineImport
+
+
+def synced_ids(graph):
+    # Node ids and (source, recipe) pairs sent to the UNWIND merges of the sync, per label
+    nodes = {label: set() for label in NODE_LABELS}
+    relationships = {label: set() for label in RELATIONSHIP_TYPES}
+    statements = {UNWIND_MERGE_NODES.format(label=label): label for label in NODE_LABELS}
+    relationship_statements = {UNWIND_MERGE_RELATIONSHIPS.format(label=label, type=rel_type): label
+                               for label, rel_type in RELATIONSHIP_TYPES.items()}
+    for cypher, parameters in graph.statements:
+        if cypher in statements:
+            nodes[statements[cypher]].update(row['_id'] for row in parameters['rows'])
+        elif cypher in relationship_statements:
+            relationships[relationship_statements[cypher]].update((row['src'], row['dst'])
+                                                                  for row in parameters['rows'])
+    return nodes, relationships
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that an offline import matches a multi-market sync")
+    parser.add_argument('--markets', type=int, default=2, choices=range(2, len(MARKETS) + 1))
+    parser.add_argument('--recipes', type=int, default=500, help="recipes per market")
+    args = parser.parse_args()
+
+    server = StubServer(total=args.recipes).start()
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            settings = {'bearer': '', 'base_url': server.url, 'rate_limit': 0, 'incremental': False,
+                        'resume': False, 'similarity': False, 'ensure_schema': False,
+                        'cache_dir': os.path.join(directory, 'cache'), 'markets': MARKETS[:args.markets]}
+            graph = FakeGraph(0)
+            MarketSync(settings).download_recipes(Database(graph))
+        finally:
+            server.shutdown()
+
+        cache = ResponseCache(settings['cache_dir'])
+        importer = OfflineImport(os.path.join(directory, 'import'), processes=2).normalise(cache.blob_locales())
+        cache.close()
+
+    nodes, relationships = synced_ids(graph)
+    failed = False
+    for label in NODE_LABELS:
+        imported = set(importer.nodes[label])
+        ok = imported == nodes[label]
+        failed = failed or not ok
+        print(f"{label:<13} {'OK' if ok else 'FAILED'}  synced {len(nodes[label]):6d}  imported {len(imported):6d}  "
+              f"only imported {len(imported - nodes[label]):6d}")
+    for label, rel_type in RELATIONSHIP_TYPES.items():
+        ok = importer.relationships[label] == relationships[label]
+        failed = failed or not ok
+        print(f"{rel_type:<13} {'OK' if ok else 'FAILED'}  synced {len(relationships[label]):6d}  "
+              f"imported {len(importer.relationships[label]):6d}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       fake_graph.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+
+import time
+
+
+class FakeTransaction:
+    """
+    Transaction returned by FakeGraph.begin(). Statements are buffered and sent on commit.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.statements = []
+
+    def run(self, cypher, parameters=None, **kwparameters):
+        self.statements.append((cypher, dict(parameters or {}, **kwparameters)))
+        self.graph.round_trip()
+
+
+class FakeGraph:
+    """
+    Stand-in for py2neo.Graph that records every call and charges a fixed latency per Bolt round trip,
+    so that ingest strategies can be compared without a running Neo4j instance.
+    """
+
+    def __init__(self, latency=0.0005):
+        self.latency = latency
+        self.round_trips = 0
+        self.statements = []
+
+    def round_trip(self):
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def merge(self, subgraph, label=None, *property_keys):
+        self.round_trip()
+
+    def create(self, subgraph):
+        self.round_trip()
+
+    def run(self, cypher, parameters=None, **kwparameters):
+        self.statements.append((cypher, dict(parameters or {}, **kwparameters)))
+        self.round_trip()
+
+    def begin(self):
+        self.round_trip()
+        return FakeTransaction(self)
+
+    def commit(self, tx):
+        self.statements.extend(tx.statements)
+        self.round_trip()
+
+    def rollback(self, tx):
+        self.round_trip()
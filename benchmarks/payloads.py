@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       payloads.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+
+import random
+
+
+def make_recipe(rng, index, nb_ingredients=300, nb_tags=40, nb_cuisines=20, nb_allergens=14):
+    """
+    Build one synthetic recipe in the shape returned by the recipes/search endpoint.
+    Entities are drawn from fixed pools so that they are shared between recipes, as in the real catalogue.
+    """
+    recipe_id = f"recipe-{index:08d}"
+    ingredients = rng.sample(range(nb_ingredients), rng.randint(6, 15))
+    return {
+        'id': recipe_id,
+        'name': f"Recipe {index}",
+        'description': f"Description of recipe {index}",
+        'descriptionHtml': f"<p>Description of recipe {index}</p>",
+        'country': 'FR',
+        'difficulty': rng.randint(1, 3),
+        'headline': f"Headline {index}",
+        'imageLink': f"https://img.example/{recipe_id}.jpg",
+        'link': f"https://www.hellofresh.fr/recipes/{recipe_id}",
+        'prepTime': f"PT{rng.choice((15, 20, 30, 45, 60))}M",
+        'slug': f"recipe-{index}",
+        'allergens': [{'id': f"allergen-{a}", 'name': f"Allergen {a}"}
+                      for a in rng.sample(range(nb_allergens), rng.randint(0, 4))],
+        'cuisines': [{'id': f"cuisine-{c}", 'name': f"Cuisine {c}"}
+                     for c in rng.sample(range(nb_cuisines), rng.randint(1, 2))],
+        'ingredients': [{'id': f"ingredient-{i}", 'name': f"Ingredient {i}"} for i in ingredients],
+        'steps': [{'index': s + 1,
+                   'instructions': f"Step {s + 1} of recipe {index}",
+                   'instructionsMarkdown': f"Step **{s + 1}** of recipe {index}",
+                   'instructionsHTML': f"<p>Step <b>{s + 1}</b> of recipe {index}</p>",
+                   'utensils': [],
+                   'ingredients': [f"ingredient-{i}" for i in ingredients[:2]]}
+                  for s in range(rng.randint(4, 8))],
+        'tags': [{'id': f"tag-{t}", 'name': f"Tag {t}"} for t in rng.sample(range(nb_tags), rng.randint(1, 5))],
+    }
+
+
+def make_page(total, skip, take=100, seed=42):
+    """
+    Build the recipes/search page starting at `skip`. Each page has its own seeded generator,
+    so pages can be built in any order and always come out the same.
+    """
+    rng = random.Random(seed * 1000003 + skip)
+    items = [make_recipe(rng, index) for index in range(skip, min(skip + take, total))]
+    return {'items': items, 'total': total, 'skip': skip, 'take': take, 'count': len(items)}
+
+
+def make_pages(total, take=100, seed=42):
+    """
+    Yield recipes/search pages covering `total` synthetic recipes, `take` at a time.
+    """
+    for skip in range(0, total, take):
+        yield make_page(total, skip, take, seed)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       stub_server.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+# Local stand-in for the recipes/search endpoint, serving synthetic pages.
+#
+#   python -m benchmarks.stub_server --port 8765 --recipes 10000 --latency 0.2 --error-rate 0.05
+#
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks.payloads import make_page
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Serve GET /gw/recipes/recipes/search?take=..&skip=.. with synthetic pages.
+    A fraction of the requests is answered with 429 or 503 to exercise the retry logic,
+    and conditional requests with a matching ETag are answered with 304.
+    """
+
+    def do_GET(self):
+        server = self.server
+        server.count_request()
+        query = parse_qs(urlparse(self.path).query)
+        take = int(query.get('take', ['100'])[0])
+        skip = int(query.get('skip', ['0'])[0])
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        if server.error_rate and random.random() < server.error_rate:
+            self.send_response(random.choice((429, 503)))
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+
+        body = json.dumps(make_page(server.total, skip, take, server.seed)).encode()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep the benchmark output readable
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the stub configuration and a request counter.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, total=1000, latency=0.0, error_rate=0.0, seed=42):
+        super().__init__(('127.0.0.1', port), StubHandler)
+        self.total = total
+        self.latency = latency
+        self.error_rate = error_rate
+        self.seed = seed
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def count_request(self):
+        with self.lock:
+            self.requests += 1
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/gw/recipes/recipes/search"
+
+    def start(self):
+        """
+        Serve in a daemon thread and return the server, for use from a benchmark.
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic recipes/search pages")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--recipes', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = StubServer(args.port, args.recipes, args.latency, args.error_rate)
+    print(f"Serving {args.recipes} recipes on {server.url}")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       suite.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Reproducible benchmark suite: every scenario runs on seeded synthetic recipes/search pages, for each size, and the
+# results are written to one JSON file that can be compared with a previous run.
+#
+#   download_recipes   full sync against the local stub server, written to the recorded fake graph
+#   put_recipes        per-node merges (limited to --legacy-limit recipes)
+#   put_recipes_bulk   UNWIND merges, --batch-pages pages per transaction
+#   search             the filter combinations of the search window
+#   facets             get_cuisines, get_ingredients, get_tags and count_recipes
+#   recipe_detail      query_recipe_detail of random recipes
+#   load_data          first page and full population of the recipe table model, as MainWindow.load_data
+#
+# Without --uri, the writes go to the fake graph and the query scenarios are skipped. With --uri, the database is
+# emptied and filled with the synthetic recipes of each size: use an instance dedicated to benchmarks, and confirm
+# with --wipe.
+#
+#   python -m benchmarks.suite --sizes 1000 10000
+#   python -m benchmarks.suite --sizes 1000 10000 100000 --uri bolt://localhost:7687 --password secret --wipe
+#   python -m benchmarks.suite --baseline datas/benchmarks/before.json --output datas/benchmarks/after.json
+#   python -m benchmarks.suite --compare datas/benchmarks/before.json datas/benchmarks/after.json
+#
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.fake_graph import FakeGraph
+from benchmarks.payloads import make_pages
+from benchmarks.stub_server import StubServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Version of the result file format
+FORMAT = 1
+
+# Filter combinations of the search scenario, on the names of benchmarks.payloads:
+# (cuisine, tag, recipe name, ingredients)
+SEARCHES = {
+    'cuisine': ("Cuisine 3", None, None, []),
+    'cuisine_tag': ("Cuisine 3", "Tag 7", None, []),
+    'name': (None, None, "Recipe 12", []),
+    'ingredients': (None, None, None, ["Ingredient 1", "Ingredient 2"]),
+    'all_filters': ("Cuisine 3", "Tag 7", "Recipe 1", ["Ingredient 1"]),
+}
+
+# Scenario functions by name, in execution order, with the resources they need
+SCENARIOS = {}
+
+
+def scenario(name, needs=()):
+    def register(function):
+        SCENARIOS[name] = (function, needs)
+        return function
+    return register
+
+
+def timings(function, repeat):
+    """
+    Call `function` `repeat` times and return the p50, p95 and max durations, in milliseconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+    return {'p50_ms': round(statistics.median(durations), 3),
+            'p95_ms': round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 3),
+            'max_ms': round(durations[-1], 3)}
+
+
+class Context:
+    """
+    What the scenarios of one size share: the arguments, the pages generator and the database, if any.
+    """
+
+    def __init__(self, args, size):
+        self.args = args
+        self.size = size
+        self.db = None
+        if args.uri:
+            from utils.database import Database
+            self.db = Database(settings={'neo4j': {'uri': args.uri, 'user': args.user,
+                                                   'password': args.password}})
+
+    def pages(self, limit=None):
+        total = self.size if limit is None else min(self.size, limit)
+        return make_pages(total, self.args.take, self.args.seed)
+
+    def target(self):
+        """
+        Return the Database the write scenarios write to: the emptied benchmark instance, or a new fake graph.
+        """
+        from utils.database import Database
+        if self.db is None:
+            return Database(FakeGraph(self.args.db_latency))
+        empty(self.db.graph)
+        self.db.ensure_schema(wait=True)
+        return self.db
+
+
+def empty(graph, batch_size=10000):
+    # Delete the nodes by batches, so that a large graph does not need a single huge transaction
+    while graph.run("MATCH (n) WITH n LIMIT $limit DETACH DELETE n RETURN count(*) AS n",
+                    limit=batch_size).evaluate():
+        pass
+
+
+def write(db, method, pages, batch_pages=1):
+    """
+    Write the pages with the given Database method and return the recipes written and the seconds spent writing,
+    leaving out the generation of the pages.
+    """
+    recipes = 0
+    seconds = 0.0
+    batch = []
+    for page_index, page in enumerate(pages, start=1):
+        batch.extend(page['items'])
+        if page_index % batch_pages == 0:
+            start = time.perf_counter()
+            getattr(db, method)(batch)
+            seconds += time.perf_counter() - start
+            recipes += len(batch)
+            batch = []
+    if batch:
+        start = time.perf_counter()
+        getattr(db, method)(batch)
+        seconds += time.perf_counter() - start
+        recipes += len(batch)
+    return recipes, seconds
+
+
+@scenario('download_recipes')
+def download_recipes(context):
+    from utils.database import Database
+    from utils.recipe_downloader import RecipeDownloader
+
+    args = context.args
+    server = StubServer(total=context.size, latency=args.latency, seed=args.seed).start()
+    try:
+        settings = {'bearer': '', 'base_url': server.url, 'rate_limit': 0, 'cache': False, 'incremental': False,
+                    'resume': False, 'ensure_schema': False, 'similarity': False}
+        downloader = RecipeDownloader(settings)
+        start = time.perf_counter()
+        downloader.download_recipes(Database(FakeGraph(args.db_latency)))
+        seconds = time.perf_counter() - start
+    finally:
+        server.shutdown()
+    return {'seconds': round(seconds, 3), 'recipes_per_second': round(downloader.recipes_written / seconds, 1),
+            'recipes': downloader.recipes_written, 'requests': server.requests}
+
+
+@scenario('put_recipes')
+def put_recipes(context):
+    recipes, seconds = write(context.target(), 'put_recipes', context.pages(context.args.legacy_limit))
+    return {'seconds': round(seconds, 3), 'recipes_per_second': round(recipes / seconds, 1), 'recipes': recipes}
+
+
+@scenario('put_recipes_bulk')
+def put_recipes_bulk(context):
+    # Run last of the writes: with a database, it leaves every recipe of the size in it for the queries
+    recipes, seconds = write(context.target(), 'put_recipes_bulk', context.pages(), context.args.batch_pages)
+    return {'seconds': round(seconds, 3), 'recipes_per_second': round(recipes / seconds, 1), 'recipes': recipes}
+
+
+@scenario('search', needs=('neo4j',))
+def search(context):
+    results = {}
+    for name, filters in SEARCHES.items():
+        rows = len(context.db.search(*filters))
+        results[name] = dict(timings(lambda: context.db.search(*filters), context.args.repeat), rows=rows)
+    return results
+
+
+@scenario('facets', needs=('neo4j',))
+def facets(context):
+    db = context.db
+    return {name: timings(getattr(db, name), context.args.repeat)
+            for name in ('get_cuisines', 'get_ingredients', 'get_tags', 'count_recipes')}
+
+
+@scenario('recipe_detail', needs=('neo4j',))
+def recipe_detail(context):
+    rng = random.Random(context.args.seed)
+    # The identifiers of benchmarks.payloads; the LRU cache is bypassed
+    return timings(lambda: context.db.query_recipe_detail(f"recipe-{rng.randrange(context.size):08d}"),
+                   context.args.repeat)
+
+
+@scenario('load_data', needs=('neo4j', 'qt'))
+def load_data(context):
+    from PyQt5.QtCore import QCoreApplication
+    from ui.recipe_table_model import RecipeTableModel
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    model = RecipeTableModel(context.db)
+    # The work of MainWindow.load_data: the first page and the count
+    start = time.perf_counter()
+    model.refresh()
+    context.db.count_recipes()
+    first_page = time.perf_counter() - start
+    # Then every page, as if the table was scrolled to the end
+    while model.canFetchMore():
+        model.fetchMore()
+    seconds = time.perf_counter() - start
+    app.processEvents()
+    return {'first_page_ms': round(first_page * 1000, 3), 'seconds': round(seconds, 3),
+            'rows_per_second': round(model.rowCount() / seconds, 1), 'rows': model.rowCount()}
+
+
+def missing(needs, args):
+    """
+    Return why a scenario cannot run here, or None.
+    """
+    if 'neo4j' in needs and not args.uri:
+        return "needs --uri"
+    if 'qt' in needs:
+        try:
+            import PyQt5.QtCore  # noqa: F401
+        except ImportError:
+            return "needs PyQt5"
+    return None
+
+
+def environment(args):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'format': FORMAT, 'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': commit,
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'arguments': {key: value for key, value in vars(args).items() if key not in ('password', 'compare')}}
+
+
+def run(args):
+    results = []
+    for size in args.sizes:
+        context = Context(args, size)
+        for name, (function, needs) in SCENARIOS.items():
+            if args.scenarios and name not in args.scenarios:
+                continue
+            reason = missing(needs, args)
+            if reason is not None:
+                results.append({'scenario': name, 'size': size, 'skipped': reason})
+                print(f"{name:<18} {size:>7}  skipped ({reason})")
+                continue
+            result = function(context)
+            results.append({'scenario': name, 'size': size, 'metrics': result})
+            print(f"{name:<18} {size:>7}  {json.dumps(result)}")
+    return dict(environment(args), results=results)
+
+
+def flatten(metrics, prefix=""):
+    # Nested metrics (one per query) become dotted names
+    for key, value in metrics.items():
+        if isinstance(value, dict):
+            yield from flatten(value, f"{prefix}{key}.")
+        else:
+            yield f"{prefix}{key}", value
+
+
+def compare(baseline, current, tolerance):
+    """
+    Print the change of every timing and throughput metric present in both runs and return the regressions,
+    changes beyond `tolerance` in the wrong direction.
+    """
+    def metrics_of(run):
+        return {(result['scenario'], result['size']): dict(flatten(result['metrics']))
+                for result in run['results'] if 'metrics' in result}
+
+    before = metrics_of(baseline)
+    regressions = []
+    for key, metrics in metrics_of(current).items():
+        for name, value in metrics.items():
+            previous = before.get(key, {}).get(name)
+            higher_is_better = name.endswith('per_second')
+            if not previous or not (higher_is_better or name.endswith(('_ms', 'seconds'))):
+                continue
+            change = (value - previous) / previous
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSION" if worse > tolerance else ""
+            print(f"{key[0]:<18} {key[1]:>7}  {name:<30} {previous:>12} -> {value:<12} {change * 100:+7.1f} %{flag}")
+            if flag:
+                regressions.append((key, name, previous, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite on seeded synthetic recipes")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), help="run only these scenarios")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--take', type=int, default=100)
+    parser.add_argument('--batch-pages', type=int, default=5)
+    parser.add_argument('--legacy-limit', type=int, default=1000, help="recipes written by put_recipes")
+    parser.add_argument('--repeat', type=int, default=20, help="runs of each query")
+    parser.add_argument('--latency', type=float, default=0.0, help="stub server latency, in seconds")
+    parser.add_argument('--db-latency', type=float, default=0.0005, help="fake round trip latency, in seconds")
+    parser.add_argument('--uri', help="Neo4j instance dedicated to benchmarks, emptied by the suite")
+    parser.add_argument('--user', default='neo4j')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--wipe', action='store_true', help="with --uri, confirm that the database is emptied")
+    parser.add_argument('--output',
+                        default=os.path.join('datas', 'benchmarks', time.strftime('suite-%Y%m%d-%H%M%S.json')))
+    parser.add_argument('--baseline', help="result file of a previous run to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="relative change reported as a regression")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'RESULTS'), help="only compare two result files")
+    args = parser.parse_args()
+    if args.uri and not args.wipe:
+        parser.error(f"every node of {args.uri} is deleted, confirm with --wipe")
+
+    if args.compare:
+        with open(args.compare[0]) as first, open(args.compare[1]) as second:
+            regressions = compare(json.load(first), json.load(second), args.tolerance)
+        sys.exit(1 if regressions else 0)
+
+    results = run(args)
+    if os.path.dirname(args.output):
+        os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=1)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(json.load(file), results, args.tolerance)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       deduplicate.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+# One-off job removing the duplicate relationships created by past syncs.
+#
+#   python deduplicate.py
+#
+
+from utils.database import Database
+
+if __name__ == '__main__':
+    db = Database.shared()
+    print("Before:", db.count_graph())
+    deleted = db.deduplicate_relationships()
+    print(f"Deleted {sum(deleted.values())} duplicate relationships: {deleted}")
+    print("After:", db.count_graph())
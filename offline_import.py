@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       offline_import.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Rebuild the graph from the cached recipe pages, without calling the API.
+# --admin runs neo4j-admin on the CSV files (the database must be stopped, its content is replaced);
+# --load-csv merges them into the running database, the output directory being its import directory.
+#
+#   python offline_import.py --output datas/import --admin
+#   python offline_import.py --output /var/lib/neo4j/import --load-csv
+#   python offline_import.py --pages "datas/*.json" --output datas/import
+#
+# Once `markets` is set in the settings, the ids are prefixed with the locale of each cached page, as the sync does;
+# --locale gives the locale of pages that do not record one (JSON files, caches made by older versions).
+#
+
+import argparse
+import glob
+import subprocess
+import sys
+import time
+
+from utils.cache import ResponseCache
+from utils.database import Database
+from utils.offline_import import OfflineImport
+from utils.settings import load_settings
+
+if __name__ == '__main__':
+    settings = load_settings()
+    parser = argparse.ArgumentParser(description="Rebuild the graph from the cached recipe pages")
+    parser.add_argument('--cache-dir', default=settings.get('cache_dir', 'datas/cache'))
+    parser.add_argument('--pages', help="glob of JSON page files to read instead of the cache")
+    parser.add_argument('--output', default='datas/import', help="directory of the CSV files")
+    parser.add_argument('--processes', type=int, help="normalisation processes, one per CPU by default")
+    parser.add_argument('--admin', action='store_true', help="run neo4j-admin database import on the files")
+    parser.add_argument('--database', default='neo4j')
+    parser.add_argument('--load-csv', action='store_true', help="merge the files with LOAD CSV")
+    parser.add_argument('--url-prefix', default='file:///', help="URL of the output directory for LOAD CSV")
+    parser.add_argument('--batch-size', type=int, default=10000, help="rows per LOAD CSV transaction")
+    parser.add_argument('--locale', help="locale of the pages that do not record one, when `markets` is set")
+    args = parser.parse_args()
+
+    # With markets, the synced ids are prefixed with the locale of their page
+    scoped = bool(settings.get('markets'))
+    if args.pages:
+        paths = sorted(glob.glob(args.pages))
+        if scoped:
+            paths = [(path, None) for path in paths]
+    else:
+        cache = ResponseCache(args.cache_dir, compression=settings.get('cache_compression'))
+        paths = cache.blob_locales() if scoped else cache.blob_paths()
+        cache.close()
+
+    if scoped and not args.locale and any(locale is None for _, locale in paths):
+        sys.exit("Some pages do not record their market: give their locale with --locale, "
+                 "otherwise their ids would not match the synced ones")
+
+    start = time.perf_counter()
+    importer = OfflineImport(args.output, args.processes).normalise(paths, locale=args.locale if scoped else None)
+    importer.write()
+    print(f"Normalised {len(paths)} pages in {time.perf_counter() - start:.1f} s: {importer.stats()}")
+
+    if args.admin:
+        command = importer.admin_command(args.database)
+        print(" ".join(command))
+        subprocess.run(command, check=True)
+    elif args.load_csv:
+        start = time.perf_counter()
+        db = Database.shared()
+        db.ensure_schema(wait=True)
+        importer.load_csv(db.graph, args.url_prefix, args.batch_size)
+        print(f"Loaded in {time.perf_counter() - start:.1f} s: {db.count_graph()}")
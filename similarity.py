@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       similarity.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Rebuild the recipe similarity index from the graph, for instance after an offline import, and show the recipes
+# similar to one of them. The syncs keep the index up to date afterwards.
+#
+#   python similarity.py
+#   python similarity.py --recipe <recipe _id>
+#
+
+import argparse
+import time
+
+from utils.database import Database
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the recipe similarity index")
+    parser.add_argument('--recipe', help="only print the recipes similar to this recipe _id")
+    args = parser.parse_args()
+
+    db = Database.shared()
+    if args.recipe:
+        for neighbour in db.similar_recipes(args.recipe):
+            print(f"{neighbour['score']:.3f}  {neighbour['_id']}  {neighbour['name']}")
+    else:
+        start = time.perf_counter()
+        index = db.get_similarity_index(rebuild=True)
+        print(f"Indexed {len(index)} recipes in {time.perf_counter() - start:.1f} s, saved to {db.similarity_path}")
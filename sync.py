@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       sync.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+# Headless sync, for cron jobs, containers and servers: it never imports PyQt5.
+# Logs are written to the standard error, one JSON object per line (or plain text with --log-format text).
+#
+#   python sync.py                        run one sync and exit
+#   python sync.py --every 3600           sync every hour until SIGINT or SIGTERM
+#   python sync.py --check                only load the settings and connect to Neo4j
+#
+# Exit codes: 0 success, 1 sync error, 2 configuration error, 3 database unreachable, 130 interrupted.
+#
+
+import argparse
+import contextlib
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+
+EXIT_OK = 0
+EXIT_SYNC_ERROR = 1
+EXIT_CONFIG_ERROR = 2
+EXIT_DATABASE_ERROR = 3
+EXIT_INTERRUPTED = 130
+
+log = logging.getLogger('sync')
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format each log record as one JSON object: time, level, event and the fields passed in `extra`.
+    """
+
+    def format(self, record):
+        entry = {'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'), 'level': record.levelname,
+                 'event': record.getMessage()}
+        entry.update(getattr(record, 'fields', {}))
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class LogWriter:
+    """
+    File-like object turning the lines printed by the sync modules into log records.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.lock = threading.Lock()  # The fetch and write threads print too
+
+    def write(self, text):
+        with self.lock:
+            self.buffer += text
+            lines = self.buffer.split("\n")
+            self.buffer = lines.pop()
+        for line in lines:
+            if line.strip():
+                log.info('output', extra={'fields': {'message': line}})
+
+    def flush(self):
+        pass
+
+
+def event(name, level=logging.INFO, **fields):
+    log.log(level, name, extra={'fields': fields})
+
+
+def run_sync(db, settings):
+    """
+    Run one sync and return its exit code.
+    """
+    from utils.market_sync import MarketSync
+    from utils.recipe_downloader import RecipeDownloader
+
+    downloader = MarketSync(settings) if settings.get('markets') else RecipeDownloader(settings)
+    errors = []
+
+    def on_error(message):
+        errors.append(message)
+        event('sync_error', logging.ERROR, message=message)
+
+    def on_progress(pages_written, pages_total, recipes_written):
+        event('sync_progress', pages_written=pages_written, pages_total=pages_total, recipes_written=recipes_written)
+
+    downloader.on_error = on_error
+    downloader.on_progress = on_progress
+
+    # SIGINT and SIGTERM stop the sync after the pages in flight, which are checkpointed
+    interrupted = threading.Event()
+
+    def stop(signum, frame):
+        interrupted.set()
+        event('sync_cancel', logging.WARNING, signal=signal.Signals(signum).name)
+        downloader.cancel()
+
+    previous = {signum: signal.signal(signum, stop) for signum in (signal.SIGINT, signal.SIGTERM)}
+    start = time.perf_counter()
+    event('sync_start', markets=[market['locale'] for market in settings.get('markets') or []] or None)
+    try:
+        with contextlib.redirect_stdout(LogWriter()):
+            downloader.download_recipes(db)
+    except Exception as error:
+        event('sync_failed', logging.ERROR, error=f"{type(error).__name__}: {error}",
+              seconds=round(time.perf_counter() - start, 2))
+        return EXIT_SYNC_ERROR
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+
+    fields = {'seconds': round(time.perf_counter() - start, 2), 'errors': len(errors)}
+    if isinstance(downloader, MarketSync):
+        fields['throughput'] = downloader.throughput()
+    else:
+        fields.update(pages_written=downloader.pages_written, recipes_written=downloader.recipes_written)
+        if downloader.seen is not None:
+            fields['merges_avoided'] = downloader.seen.stats()['skipped']
+    event('sync_end', logging.ERROR if errors else logging.INFO, **fields)
+    if interrupted.is_set():
+        return EXIT_INTERRUPTED
+    return EXIT_SYNC_ERROR if errors else EXIT_OK
+
+
+def main(argv=None):
+    started = time.perf_counter()
+    parser = argparse.ArgumentParser(description="Sync the recipes without the graphical interface")
+    parser.add_argument('--every', type=float, help="run a sync every EVERY seconds instead of once")
+    parser.add_argument('--check', action='store_true', help="only check the settings and the database")
+    parser.add_argument('--log-format', choices=('json', 'text'), default='json')
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args(argv)
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(JsonFormatter() if args.log_format == 'json'
+                         else logging.Formatter('%(asctime)s %(levelname)s %(message)s %(fields)s'))
+    log.addHandler(handler)
+    log.setLevel(args.log_level.upper())
+
+    # The heavy modules are only imported now, so that their cost shows in the startup event
+    imports = time.perf_counter()
+    from utils.database import Database
+    from utils.settings import load_settings
+
+    try:
+        settings = load_settings()
+    except Exception as error:  # Unreadable file or invalid YAML
+        event('config_error', logging.ERROR, error=str(error))
+        return EXIT_CONFIG_ERROR
+    if not settings.get('bearer') and not args.check:
+        event('config_error', logging.ERROR, error="no bearer token in the settings")
+        return EXIT_CONFIG_ERROR
+
+    try:
+        db = Database(settings=settings)
+        db.count_graph()
+    except Exception as error:
+        event('database_error', logging.ERROR, error=f"{type(error).__name__}: {error}")
+        return EXIT_DATABASE_ERROR
+    event('startup', import_seconds=round(time.perf_counter() - imports, 3),
+          startup_seconds=round(time.perf_counter() - started, 3), qt_loaded='PyQt5' in sys.modules)
+    if args.check:
+        return EXIT_OK
+
+    # The metrics file is refreshed during the syncs and written a last time on exit
+    from utils.metrics import start_metrics_file
+    metrics_writer = start_metrics_file(settings)
+    try:
+        if args.every is None:
+            return run_sync(db, settings)
+
+        # Daemon: one sync per period until a signal arrives while waiting
+        stopping = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda signum, frame: stopping.set())
+        code = EXIT_OK
+        while not stopping.is_set():
+            next_run = time.monotonic() + args.every
+            code = run_sync(db, load_settings())
+            if code == EXIT_INTERRUPTED:
+                break
+            event('sync_scheduled', seconds=round(max(next_run - time.monotonic(), 0), 1))
+            stopping.wait(max(next_run - time.monotonic(), 0))
+        return EXIT_INTERRUPTED if code == EXIT_INTERRUPTED else EXIT_OK
+    finally:
+        if metrics_writer is not None:
+            metrics_writer.stop()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
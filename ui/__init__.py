@@ -9,7 +9,21 @@
 # All rights reserved. 
 #
 
-from .main_window import MainWindow
-from .search_window import SearchWindow
-from .settings_window import SettingsWindow
-from .show_window import ShowWindow
+import importlib
+
+# The windows are imported on first access, so that importing one of them does not load all the others
+_EXPORTS = {
+    'MainWindow': '.main_window',
+    'SearchWindow': '.search_window',
+    'SettingsWindow': '.settings_window',
+    'ShowWindow': '.show_window',
+    'SyncWorker': '.sync_worker',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
@@ -9,14 +9,65 @@
 # All rights reserved. 
 #
 
-from PyQt5.QtWidgets import QMainWindow, QPushButton, QVBoxLayout, QLabel, QTableWidget, QWidget, QHBoxLayout, \
-    QTableWidgetItem, QAbstractItemView, QHeaderView, QMessageBox
-from ui.search_window import SearchWindow
-from ui.settings_window import SettingsWindow
-from utils import Database
-from utils.recipe_downloader import RecipeDownloader
-import os
-import yaml
+from PyQt5.QtCore import QTimer, QThread, pyqtSignal
+from PyQt5.QtWidgets import QMainWindow, QPushButton, QVBoxLayout, QLabel, QTableView, QWidget, QHBoxLayout, \
+    QAbstractItemView, QHeaderView, QMessageBox, QProgressBar
+from ui.recipe_table_model import RecipeTableModel
+from utils.metrics import start_metrics_file
+from utils.settings import load_settings
+
+# The database, the sync and the secondary windows are imported on first use, so that the window shows up
+# before py2neo, requests and the search window are loaded
+
+
+def shared_database():
+    from utils.database import Database
+    return Database.shared()
+
+
+class StartupLoader(QThread):
+    """
+    This class connects to the database on a background thread at startup, creates the schema,
+    and reads the first page of recipes and the recipe count.
+    """
+
+    # first page of recipes, recipe count
+    loaded = pyqtSignal(list, int)
+    # error message
+    failed = pyqtSignal(str)
+
+    def __init__(self, page_size, parent=None):
+        super(StartupLoader, self).__init__(parent)
+        self.page_size = page_size
+
+    def run(self):
+        try:
+            db = shared_database()
+            # Create the constraints and indexes on first start
+            db.ensure_schema()
+            rows = db.get_recipe_page(limit=self.page_size)
+            count = db.count_recipes()
+        except Exception as error:
+            self.failed.emit(f"Cannot connect to the database: {error}")
+            return
+        self.loaded.emit(rows, count[0]['nbRecipes'] if count else 0)
+
+
+class RecipeCounter(QThread):
+    """
+    This class counts the recipes of the database on a background thread, so that the window does not wait for it.
+    """
+
+    # recipe count
+    counted = pyqtSignal(int)
+
+    def run(self):
+        try:
+            count = shared_database().count_recipes()
+        except Exception as error:
+            print(f"Cannot count the recipes: {error}")
+            return
+        self.counted.emit(count[0]['nbRecipes'] if count else 0)
 
 
 class MainWindow(QMainWindow):
@@ -26,8 +77,17 @@ class MainWindow(QMainWindow):
     opening settings, searching, and closing the application.
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, fast_start=None, **kwargs):
+        """
+        With `fast_start` (the `fast_start` setting, on by default) the window shows the recipe list saved by the
+        previous run and connects to the database in the background; otherwise it loads the list before showing.
+        """
         super(MainWindow, self).__init__(*args, **kwargs)
+        settings = load_settings()
+        if fast_start is None:
+            fast_start = settings.get('fast_start', True)
+        self.snapshot_path = settings.get('recipe_snapshot', 'datas/recipes.json')
+        self.metrics_writer = start_metrics_file(settings)
 
         # Setting up the window
         self.setWindowTitle("Recipe Manager")
@@ -35,22 +95,33 @@ class MainWindow(QMainWindow):
 
         # Widget creation
         self.label = QLabel("Label Text")
-        self.table = QTableWidget(0, 2)
+        self.table = QTableView()
+        self.model = RecipeTableModel(parent=self)  # The database is set once connected
+        self.table.setModel(self.model)
 
         # Table configuration
         self.table.verticalHeader().setVisible(False)
-        self.table.setHorizontalHeaderLabels(["Title", "Uuid"])
         self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.table.setSelectionMode(QAbstractItemView.SingleSelection)
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
-        header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
+        # A fixed uuid width: fitting it to the contents would measure every loaded row on each page fetch
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Interactive)
+        header.resizeSection(1, 320)
+
+        # Sync progress, hidden while no sync is running
+        self.progressBar = QProgressBar()
+        self.progressBar.setVisible(False)
 
         # Button creation and signal connection
         self.updateListButton = QPushButton("Update List")
         self.updateListButton.clicked.connect(self.update_list)
 
+        self.cancelSyncButton = QPushButton("Cancel")
+        self.cancelSyncButton.clicked.connect(self.cancel_sync)
+        self.cancelSyncButton.setVisible(False)
+
         self.settingsButton = QPushButton("Settings")
         self.settingsButton.clicked.connect(self.open_settings)
 
@@ -68,6 +139,8 @@ class MainWindow(QMainWindow):
         # Button alignment
         buttonLayout = QHBoxLayout()
         buttonLayout.addWidget(self.updateListButton)
+        buttonLayout.addWidget(self.progressBar)
+        buttonLayout.addWidget(self.cancelSyncButton)
         buttonLayout.addStretch(1)
         buttonLayout.addWidget(self.searchButton)
         buttonLayout.addWidget(self.settingsButton)
@@ -79,50 +152,181 @@ class MainWindow(QMainWindow):
         centralWidget.setLayout(mainLayout)
         self.setCentralWidget(centralWidget)
 
-        self.load_data()
+        # Background sync, and a timer limiting how often the table is updated while it runs
+        self.sync_worker = None
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.setSingleShot(True)
+        self.refreshTimer.setInterval(2000)
+        self.refreshTimer.timeout.connect(self.show_written_recipes)
 
-    def load_data(self):
+        # Recipe count, made off the GUI thread; a count asked for while one runs is made again after it
+        self.recipe_counter = RecipeCounter(self)
+        self.recipe_counter.counted.connect(self.show_count)
+        self.recipe_counter.finished.connect(self.on_count_finished)
+        self.recount = False
+
+        self.startup_loader = StartupLoader(self.model.page_size, self)
+        self.startup_loader.loaded.connect(self.on_live_loaded)
+        self.startup_loader.failed.connect(self.on_sync_error)
+        if fast_start:
+            # Paint the last known list right away, the live one replaces it once loaded
+            count = self.model.load_snapshot(self.snapshot_path)
+            self.label.setText(f"Number of recipes: {count} (connecting...)" if count is not None
+                               else "Connecting to the database...")
+            self.startup_loader.start()
+        else:
+            self.startup_loader.run()
+
+    def on_live_loaded(self, rows, count):
         """
-        Loads the recipe data into the table from the database
+        Show the first page of recipes read from the database, then let the table fetch the next ones.
         """
-        self.table.setRowCount(0)  # Clear the table before filling it
-        recipes = Database().get_recipes()  # Get the recipes from the database
+        self.model.set_database(shared_database(), rows)
+        self.show_count(count)
 
-        for i, recipe in enumerate(recipes):
-            self.table.insertRow(i)
-            self.table.setItem(i, 0, QTableWidgetItem(recipe['recette']['name']))
-            self.table.setItem(i, 1, QTableWidgetItem(recipe['recette']['_id']))
+    def show_count(self, count):
+        # Show the number of recipes and keep the first page for the next start
+        self.label.setText(f"Number of recipes: {count}")
+        try:
+            self.model.save_snapshot(self.snapshot_path, count)
+        except OSError as error:
+            print(f"Cannot save the recipe list snapshot: {error}")
 
-        self.label.setText(f"Number of recipes: {len(recipes)}")
+    def count_recipes(self):
+        """
+        Update the recipe count in the background.
+        """
+        if self.recipe_counter.isRunning():
+            self.recount = True
+        else:
+            self.recipe_counter.start()
+
+    def on_count_finished(self):
+        # Count again if the recipes changed while the previous count ran
+        if self.recount:
+            self.recount = False
+            self.recipe_counter.start()
+
+    def load_data(self):
+        """
+        Loads the recipe data into the table from the database.
+        Only the first page is fetched here, the next ones are fetched as the table scrolls.
+        """
+        if self.model.db is None:
+            return  # Still connecting, the startup loader fills the table
+        self.model.refresh()
+        self.count_recipes()
+
+    def show_written_recipes(self):
+        """
+        Show the recipes written by the running sync without resetting the table, so that the scroll position
+        and the selection are kept: the rows sorted after the loaded ones are appended, the count is updated.
+        Recipes sorted among the loaded rows show up when the table is reloaded at the end of the sync.
+        """
+        if self.model.db is None:
+            return
+        self.model.fetch_new()
+        self.count_recipes()
 
     def update_list(self):
         """
-        Update the list of recipes by downloading them and loading them into the table
+        Update the list of recipes by downloading them in the background.
+        The table is refreshed as batches are written and once the sync is over.
         """
-        if os.path.isfile('settings.yaml'):
-            with open('settings.yaml', 'r') as file:
-                settings = yaml.safe_load(file)
-                downloader = RecipeDownloader(settings)
-                db = Database()  # Initialize the database
-                downloader.download_recipes(db)  # Pass the database instance to download_recipes
+        if self.sync_worker is not None:
+            return
+
+        settings = load_settings()
+        if settings.get('bearer'):
+            from ui.sync_worker import SyncWorker
+            from utils.market_sync import MarketSync
+            from utils.recipe_downloader import RecipeDownloader
+
+            # Several markets are synced in parallel
+            downloader = MarketSync(settings) if settings.get('markets') else RecipeDownloader(settings)
+            db = shared_database()  # Reuse the application-wide database connection pool
+
+            self.sync_worker = SyncWorker(downloader, db, self)
+            self.sync_worker.progress.connect(self.on_sync_progress)
+            self.sync_worker.batch_written.connect(self.on_batch_written)
+            self.sync_worker.error.connect(self.on_sync_error)
+            self.sync_worker.finished.connect(self.on_sync_finished)
 
-            # Update the table
-            self.load_data()
+            self.updateListButton.setEnabled(False)
+            self.cancelSyncButton.setEnabled(True)
+            self.cancelSyncButton.setVisible(True)
+            self.progressBar.setRange(0, 0)  # Busy indicator until the total is known
+            self.progressBar.setVisible(True)
+            self.sync_worker.start()
         else:
             QMessageBox.warning(self, "Settings", "Please configure the settings first")
 
+    def cancel_sync(self):
+        """
+        Cancel the running sync
+        """
+        if self.sync_worker is not None:
+            self.cancelSyncButton.setEnabled(False)
+            self.sync_worker.cancel()
+
+    def on_sync_progress(self, pages_written, pages_total, rate, eta):
+        """
+        Show the progress of the sync: pages written, recipes per second and remaining time
+        """
+        self.progressBar.setRange(0, max(pages_total, 1))
+        self.progressBar.setValue(pages_written)
+        minutes, seconds = divmod(int(eta), 60)
+        self.progressBar.setFormat(f"%v / %m pages - {rate:.0f} recipes/s - ETA {minutes}:{seconds:02d}")
+
+    def on_batch_written(self):
+        """
+        Show the recipes written so far, at most every couple of seconds
+        """
+        if not self.refreshTimer.isActive():
+            self.refreshTimer.start()
+
+    def on_sync_error(self, message):
+        """
+        Show a sync error
+        """
+        QMessageBox.critical(self, "Error", message)
+
+    def on_sync_finished(self):
+        """
+        Restore the buttons and show the final list of recipes
+        """
+        db = shared_database()
+        print(f"Database pool: {db.pool_stats()}")
+        # Persist the facet lists updated by the sync, for a fast search window on next start
+        db.facets.save_snapshot()
+        self.sync_worker.deleteLater()
+        self.sync_worker = None
+        self.refreshTimer.stop()
+        self.progressBar.setVisible(False)
+        self.cancelSyncButton.setVisible(False)
+        self.updateListButton.setEnabled(True)
+
+        # Update the table
+        self.load_data()
+
     def open_search(self):
         """
         Open the search window
         """
-        db = Database()
+        from ui.search_window import SearchWindow
+
+        db = shared_database()
         self.window = SearchWindow(db)
         self.window.show()
+        db.facets.save_snapshot()
+        print(f"Facet cache: {db.facets.stats()}")
 
     def open_settings(self):
         """
         Open the settings window
         """
+        from ui.settings_window import SettingsWindow
+
         settings = SettingsWindow()
         settings.exec_()
 
@@ -131,3 +335,16 @@ class MainWindow(QMainWindow):
         Close the application
         """
         self.close()
+
+    def closeEvent(self, event):
+        """
+        Stop the running sync before the window closes
+        """
+        if self.sync_worker is not None:
+            self.sync_worker.cancel()
+            self.sync_worker.wait()
+        self.startup_loader.wait()
+        self.recipe_counter.wait()
+        if self.metrics_writer is not None:
+            self.metrics_writer.stop()
+        super(MainWindow, self).closeEvent(event)
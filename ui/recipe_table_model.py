@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       recipe_table_model.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+
+import json
+import os
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class RecipeTableModel(QAbstractTableModel):
+    """
+    This class is a table model listing the recipes (title and uuid) ordered by name.
+    Rows are fetched from the database page by page as the view scrolls, with keyset pagination,
+    so only the visible part of the catalogue is loaded in memory.
+    Until a database is set, the model only shows the rows of the snapshot saved by the previous run.
+    """
+
+    HEADERS = ["Title", "Uuid"]
+    KEYS = ["name", "_id"]
+
+    def __init__(self, db=None, page_size=200, parent=None):
+        super(RecipeTableModel, self).__init__(parent)
+        self.db = db
+        self.page_size = page_size
+        self.rows = []
+        self.exhausted = False
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        return self.rows[index.row()][self.KEYS[index.column()]]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted and self.db is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        """
+        Fetch the next page of recipes, starting after the last loaded row.
+        """
+        if parent.isValid():
+            return
+        last = self.rows[-1] if self.rows else None
+        page = self.db.get_recipe_page(after=last, limit=self.page_size)
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+    def refresh(self):
+        """
+        Forget the loaded rows and fetch the first page again.
+        """
+        self.beginResetModel()
+        self.rows = []
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def fetch_new(self):
+        """
+        Look again for rows after the last loaded one, once recipes were written: they are appended right away if
+        the loaded rows do not fill a page, otherwise when the view scrolls to the end. The loaded rows are kept.
+        """
+        self.exhausted = False
+        if self.db is not None and len(self.rows) < self.page_size:
+            self.fetchMore()
+
+    def set_database(self, db, first_page):
+        """
+        Replace the rows with the first page read from `db`, the next pages are then fetched from it.
+        """
+        self.beginResetModel()
+        self.db = db
+        self.rows = list(first_page)
+        self.exhausted = len(first_page) < self.page_size
+        self.endResetModel()
+
+    def load_snapshot(self, path):
+        """
+        Show the rows saved by save_snapshot(), without querying the database.
+        Return the recipe count saved with them, or None if there is no readable snapshot.
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                snapshot = json.load(file)
+            rows, count = snapshot['rows'], snapshot['count']
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        # The snapshot is only a cache: one in another format is ignored and the list is loaded as usual
+        if not isinstance(count, int) or not isinstance(rows, list) or \
+                not all(isinstance(row, dict) and all(key in row for key in self.KEYS) for row in rows):
+            return None
+        self.beginResetModel()
+        self.rows = rows
+        self.exhausted = True  # Until the database is set
+        self.endResetModel()
+        return count
+
+    def save_snapshot(self, path, count):
+        """
+        Save the first page of rows and the recipe count, for the next start.
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'count': count, 'rows': self.rows[:self.page_size]}, file, ensure_ascii=False)
+        os.replace(temporary, path)
@@ -9,12 +9,97 @@
 # All rights reserved. 
 #
 
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QComboBox, QLineEdit, QPushButton, QListWidget, QLabel, \
-    QTableWidget, QTableWidgetItem, QAbstractItemView, QSplitter, QHBoxLayout, QHeaderView
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import Qt, QObject, QThread, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QComboBox, QLineEdit, QPushButton, QListWidget, QListWidgetItem, \
+    QLabel, QTableWidget, QTableWidgetItem, QAbstractItemView, QSplitter, QHBoxLayout, QHeaderView, QCheckBox
 from ui.show_window import ShowWindow
 
 
+class FacetIndexLoader(QThread):
+    """
+    This class builds the facet index of the database on a background thread.
+    """
+
+    loaded = pyqtSignal(object)
+
+    def __init__(self, db, parent=None):
+        super(FacetIndexLoader, self).__init__(parent)
+        self.db = db
+
+    def run(self):
+        self.loaded.emit(self.db.get_facet_index())
+
+
+class LiveSearch(QObject):
+    """
+    This class runs the as-you-type full-text search. Keystrokes are debounced, the query runs on a worker thread
+    so the UI never waits for the database, and the results of a query overtaken by a newer text are dropped.
+    """
+
+    # generation of the query, results
+    found = pyqtSignal(int, list)
+    # generation of the query, error message
+    failed = pyqtSignal(int, str)
+
+    def __init__(self, db, delay=250, limit=20, parent=None):
+        super(LiveSearch, self).__init__(parent)
+        self.db = db
+        self.limit = limit
+        self.text = ""
+        self.generation = 0  # Incremented on each keystroke, a query only reports if it is still the latest
+        self.pending = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+        # Wait for a pause in the typing before querying
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(delay)
+        self.timer.timeout.connect(self.run)
+
+    def schedule(self, text):
+        """
+        This method is called on each keystroke, it restarts the debounce timer.
+        """
+        self.text = text
+        self.generation += 1
+        self.timer.start()
+
+    def run(self):
+        # A query waiting behind the running one is outdated, drop it
+        if self.pending is not None:
+            self.pending.cancel()
+        self.pending = self.executor.submit(self.query, self.generation, self.text)
+
+    def query(self, generation, text):
+        # Runs on the worker thread, skip the query if the text changed in the meantime
+        if generation != self.generation:
+            return
+        try:
+            results = self.db.search_names(text, self.limit)
+        except Exception as error:
+            # Nobody reads the future, report the error instead of losing it
+            print(f"Live search failed: {error}")
+            if generation == self.generation:
+                self.failed.emit(generation, str(error))
+            return
+        if generation == self.generation:
+            self.found.emit(generation, results)
+
+    def is_current(self, generation):
+        # Results reach the UI thread later, the text may have changed again by then
+        return generation == self.generation
+
+    def stop(self):
+        """
+        Stop the timer, drop the pending query and wait for the running one.
+        """
+        self.timer.stop()
+        self.generation += 1
+        self.executor.shutdown(wait=True)
+
+
 class SearchWindow(QWidget):
     """
     This class represents a search window that allows users to search for recipes based on various parameters.
@@ -26,6 +111,7 @@ class SearchWindow(QWidget):
 
         self.db = db  # Database object
         self._recipes = None  # A list to store search results
+        self.index = None  # Facet index, used for the live counts once it is loaded
 
         # Layout and widget setup
         self.layout = QHBoxLayout()
@@ -33,20 +119,24 @@ class SearchWindow(QWidget):
 
         self.cuisine_label = QLabel("Cuisine:")
         self.cuisine_combo = QComboBox()
-        self.cuisine_combo.addItems(db.get_cuisines())
+        self.cuisine_combo.addItems(db.facets.get("Cuisine"))  # Served from the facet cache
         self.form_layout.addWidget(self.cuisine_label)
         self.form_layout.addWidget(self.cuisine_combo)
 
         self.ingredient_label = QLabel("Ingredient:")
         self.ingredient_list = QListWidget()
-        self.ingredient_list.addItems(db.get_ingredients())
+        self.ingredient_list.addItems(db.facets.get("Ingredient"))  # Served from the facet cache
         self.ingredient_list.setSelectionMode(QListWidget.MultiSelection)
         self.form_layout.addWidget(self.ingredient_label)
         self.form_layout.addWidget(self.ingredient_list)
 
+        # By default a recipe matches if it contains any of the selected ingredients
+        self.all_ingredients_check = QCheckBox("Match all selected ingredients")
+        self.form_layout.addWidget(self.all_ingredients_check)
+
         self.tag_label = QLabel("Tag:")
         self.tag_combo = QComboBox()
-        self.tag_combo.addItems(db.get_tags())
+        self.tag_combo.addItems(db.facets.get("Tag"))  # Served from the facet cache
         self.form_layout.addWidget(self.tag_label)
         self.form_layout.addWidget(self.tag_combo)
 
@@ -55,6 +145,18 @@ class SearchWindow(QWidget):
         self.form_layout.addWidget(self.recipe_label)
         self.form_layout.addWidget(self.recipe_line)
 
+        # Best full-text matches of the recipe name, updated while typing
+        self.suggestion_list = QListWidget()
+        self.suggestion_list.itemDoubleClicked.connect(self.open_suggestion)
+        self.form_layout.addWidget(self.suggestion_list)
+        self.live_search = LiveSearch(db, parent=self)
+        self.live_search.found.connect(self.update_suggestions)
+        self.live_search.failed.connect(self.show_suggestion_error)
+        self.recipe_line.textChanged.connect(self.live_search.schedule)
+
+        self.count_label = QLabel("")
+        self.form_layout.addWidget(self.count_label)
+
         self.search_button = QPushButton('Search')
         self.search_button.clicked.connect(self.search_recipes)
         self.form_layout.addWidget(self.search_button)
@@ -67,6 +169,25 @@ class SearchWindow(QWidget):
         self.cuisine_combo.setCurrentIndex(0)
         self.tag_combo.setCurrentIndex(0)
 
+        # Keep the bare names in the items, their text also shows the live counts
+        for combo in (self.cuisine_combo, self.tag_combo):
+            for i in range(combo.count()):
+                combo.setItemData(i, combo.itemText(i), Qt.UserRole)
+        for i in range(self.ingredient_list.count()):
+            item = self.ingredient_list.item(i)
+            item.setData(Qt.UserRole, item.text())
+
+        # Update the counts when a filter changes
+        self.cuisine_combo.currentIndexChanged.connect(self.update_counts)
+        self.tag_combo.currentIndexChanged.connect(self.update_counts)
+        self.ingredient_list.itemSelectionChanged.connect(self.update_counts)
+        self.all_ingredients_check.stateChanged.connect(self.update_counts)
+
+        # Build the facet index in the background
+        self.index_loader = FacetIndexLoader(db, self)
+        self.index_loader.loaded.connect(self.on_index_loaded)
+        self.index_loader.start()
+
         # Create the table and set up the columns
         self.table = QTableWidget()
         self.table.setColumnCount(4)
@@ -96,6 +217,97 @@ class SearchWindow(QWidget):
         header.setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
         header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
 
+    def closeEvent(self, event):
+        """
+        Let the index loader and the live search finish before the window goes away.
+        """
+        self.index_loader.wait()
+        self.live_search.stop()
+        super(SearchWindow, self).closeEvent(event)
+
+    def selected_filters(self):
+        """
+        Return the selected cuisine, tag and ingredients and whether all the ingredients must match.
+        """
+        selected_cuisine = self.cuisine_combo.currentData(Qt.UserRole) or ""
+        selected_tag = self.tag_combo.currentData(Qt.UserRole) or ""
+        selected_ingredients = [item.data(Qt.UserRole) for item in self.ingredient_list.selectedItems()]
+        return selected_cuisine, selected_tag, selected_ingredients, self.all_ingredients_check.isChecked()
+
+    def on_index_loaded(self, index):
+        """
+        This method is called once the facet index is built.
+        """
+        self.index = index
+        self.update_counts()
+
+    def update_counts(self):
+        """
+        This method shows, next to each option, how many recipes match it combined with the other filters,
+        and the number of recipes matching all the filters. It only uses the in-memory facet index.
+        """
+        if self.index is None:
+            return
+        cuisine, tag, ingredients, match_all = self.selected_filters()
+
+        # Each facet is counted under the other filters, so that every option shows what selecting it would give
+        cuisine_counts = self.index.counts('cuisine', self.index.match(None, tag, ingredients, match_all))
+        for i in range(1, self.cuisine_combo.count()):
+            name = self.cuisine_combo.itemData(i, Qt.UserRole)
+            self.cuisine_combo.setItemText(i, f"{name} ({cuisine_counts.get(name, 0)})")
+
+        tag_counts = self.index.counts('tag', self.index.match(cuisine, None, ingredients, match_all))
+        for i in range(1, self.tag_combo.count()):
+            name = self.tag_combo.itemData(i, Qt.UserRole)
+            self.tag_combo.setItemText(i, f"{name} ({tag_counts.get(name, 0)})")
+
+        # Matching all the ingredients, selecting one more narrows the recipes matching the selected ones;
+        # matching any of them, each ingredient shows how many recipes have it under the other filters
+        selected = ingredients if match_all else ()
+        ingredient_counts = self.index.counts('ingredient', self.index.match(cuisine, tag, selected, match_all))
+        for i in range(self.ingredient_list.count()):
+            item = self.ingredient_list.item(i)
+            name = item.data(Qt.UserRole)
+            item.setText(f"{name} ({ingredient_counts.get(name, 0)})")
+
+        matching = self.index.count(self.index.match(cuisine, tag, ingredients, match_all))
+        self.count_label.setText(f"{matching} matching recipes (before the name filter)")
+
+    def update_suggestions(self, generation, results):
+        """
+        This method shows the ranked full-text matches of the recipe name, unless the text changed since.
+        """
+        if not self.live_search.is_current(generation):
+            return
+        self.suggestion_list.clear()
+        for result in results:
+            item = QListWidgetItem(result['name'])
+            item.setToolTip(result['headline'] or "")
+            item.setData(Qt.UserRole, result['_id'])  # Names are not unique, the recipe is opened by its _id
+            self.suggestion_list.addItem(item)
+
+    def show_suggestion_error(self, generation, message):
+        """
+        This method replaces the suggestions with the error of the live search, unless the text changed since.
+        """
+        if not self.live_search.is_current(generation):
+            return
+        self.suggestion_list.clear()
+        item = QListWidgetItem("Search unavailable")
+        item.setToolTip(message)
+        item.setFlags(Qt.NoItemFlags)
+        self.suggestion_list.addItem(item)
+
+    def open_suggestion(self, item):
+        """
+        This method opens the details of the recipe whose suggestion was double-clicked.
+        """
+        if item.data(Qt.UserRole) is None:
+            return  # Error message, not a recipe
+        window = self.open_recipe(item.data(Qt.UserRole))
+        if window is not None:
+            self.show_window = window
+
     def search_recipes(self):
         """
         This method retrieves the selected parameters and calls the search method of the database with these parameters.
@@ -103,46 +315,65 @@ class SearchWindow(QWidget):
         """
 
         # Get search parameters
-        selected_cuisine = self.cuisine_combo.currentText()
-        selected_tag = self.tag_combo.currentText()
+        selected_cuisine, selected_tag, selected_ingredients, match_all_ingredients = self.selected_filters()
         recipe_name = self.recipe_line.text()
-        selected_ingredients = [item.text() for item in self.ingredient_list.selectedItems()]
 
-        # Call the search method of the database with these parameters
-        self._recipes = self.db.search(selected_cuisine, selected_tag, recipe_name, selected_ingredients)
+        # Call the search method of the database with these parameters, streaming the results
+        results = self.db.iter_search(selected_cuisine, selected_tag, recipe_name, selected_ingredients,
+                                      match_all_ingredients)
 
         # Update the table with the search results
-        self.update_table()
+        self.update_table(results)
 
-    def update_table(self):
+    def update_table(self, results):
         """
-        This method updates the table with the search results.
+        This method updates the table with the search results, as they are read from the database.
         """
 
         self.table.setRowCount(0)  # Clear the table
+        self._recipes = []
+
+        # Sorting while rows are inserted would move them around
+        self.table.setSortingEnabled(False)
+
+        for recipe in results:
+            self._recipes.append(recipe)
 
-        for idx, recipe in enumerate(self._recipes):
             # Insert a new row
             row = self.table.rowCount()
             self.table.insertRow(row)
 
             # Set the cells of the row
-            ingredients = ', '.join([ingredient['name'] for ingredient in recipe['Ingredients']])
-            cuisines = ', '.join([cuisine['name'] for cuisine in recipe['Cuisine']])
-            tags = ', '.join([tag['name'] for tag in recipe['Tags']])
-            self.table.setItem(row, 0, QTableWidgetItem(recipe['Recipes']["name"]))
+            ingredients = ', '.join(recipe['Ingredients'])
+            cuisines = ', '.join(recipe['Cuisine'])
+            tags = ', '.join(recipe['Tags'])
+            name_item = QTableWidgetItem(recipe['Recipes']["name"])
+            name_item.setData(Qt.UserRole, len(self._recipes) - 1)  # Position in _recipes, kept when sorting
+            self.table.setItem(row, 0, name_item)
             self.table.setItem(row, 1, QTableWidgetItem(ingredients))
             self.table.setItem(row, 2, QTableWidgetItem(cuisines))
             self.table.setItem(row, 3, QTableWidgetItem(tags))
 
+        self.table.setSortingEnabled(True)
+
     def open_show_window(self, index):
         """
         This method opens a new window to display the selected recipe in detail.
         """
 
-        # Get the selected recipe from the list
-        selected_recipe = self._recipes[index.row()]
+        # Get the selected recipe from the list, the search results only hold a summary of it
+        selected_recipe = self._recipes[self.table.item(index.row(), 0).data(Qt.UserRole)]
+        window = self.open_recipe(selected_recipe['Recipes']['_id'])
+        if window is not None:
+            self.show_window = window
 
-        # Create and show the ShowWindow
-        self.show_window = ShowWindow(selected_recipe)
-        self.show_window.show()
+    def open_recipe(self, recipe_id):
+        """
+        Create and show the ShowWindow of a recipe, with its similar recipes, and return it.
+        """
+        details = self.db.get_recipe_detail(recipe_id)
+        if details is None:
+            return None
+        window = ShowWindow(details, self.db.similar_recipes(recipe_id), open_recipe=self.open_recipe)
+        window.show()
+        return window
@@ -10,8 +10,7 @@
 #
 
 from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel, QLineEdit, QPushButton
-import os
-import yaml
+from utils.settings import load_settings, save_settings
 
 
 class SettingsWindow(QDialog):
@@ -45,22 +44,17 @@ class SettingsWindow(QDialog):
         self.save_button.clicked.connect(self.save_settings)
 
         # Load existing settings if available
-        if os.path.isfile('settings.yaml'):
-            with open('settings.yaml', 'r') as file:
-                settings = yaml.safe_load(file)
-                if settings is not None:
-                    # If bearer token is available in the settings, load it into the input field
-                    self.bearer_input.setText(settings.get('bearer', ''))
+        settings = load_settings()
+        # If bearer token is available in the settings, load it into the input field
+        self.bearer_input.setText(settings.get('bearer', ''))
 
     def save_settings(self):
         """
         This method retrieves the bearer token entered by the user and saves it in the 'settings.yaml' file.
-        After saving the settings, it closes the settings window.
+        The other settings in the file are kept. After saving the settings, it closes the settings window.
         """
-        settings = {
+        save_settings({
             'bearer': self.bearer_input.text()
-        }
-        with open('settings.yaml', 'w') as file:
-            yaml.dump(settings, file)
+        })
 
         self.close()  # Close the settings window
@@ -9,19 +9,25 @@
 # All rights reserved. 
 #
 
-from PyQt5.QtWidgets import QMainWindow, QLabel, QVBoxLayout, QWidget
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QMainWindow, QLabel, QVBoxLayout, QWidget, QListWidget, QListWidgetItem
 
 
 class ShowWindow(QMainWindow):
     """
     This class represents a window to display details of a selected recipe.
     The recipe details include the name, preparation time, ingredients, and steps.
+    They are the dictionary returned by Database.get_recipe_detail().
+    `similar` lists the most similar recipes, as returned by Database.similar_recipes(); double-clicking one calls
+    `open_recipe` with its _id, which returns the window showing it.
     """
 
-    def __init__(self, data):
+    def __init__(self, data, similar=(), open_recipe=None):
         super().__init__()
+        self.open_recipe = open_recipe
+        self.similar_window = None
 
-        recipe = data["Recipes"]
+        recipe = data["Recipe"]
 
         # Set the window title to the recipe name
         self.setWindowTitle(recipe["name"])
@@ -41,9 +47,27 @@ class ShowWindow(QMainWindow):
         # Add a QLabel for the steps
         layout.addWidget(QLabel("Steps:"))
         for step in data['Steps']:
-            layout.addWidget(QLabel(step['description']))
+            layout.addWidget(QLabel(f"{step['stepNumber']}. {step['instructions']}"))
+
+        # Add the list of similar recipes
+        if similar:
+            layout.addWidget(QLabel("Similar recipes:"))
+            self.similar_list = QListWidget()
+            for neighbour in similar:
+                item = QListWidgetItem(f"{neighbour['name']} ({neighbour['score']:.0%})")
+                item.setData(Qt.UserRole, neighbour['_id'])
+                self.similar_list.addItem(item)
+            self.similar_list.itemDoubleClicked.connect(self.open_similar)
+            layout.addWidget(self.similar_list)
 
         # Add the layout to the central widget
         central_widget = QWidget()
         central_widget.setLayout(layout)
         self.setCentralWidget(central_widget)
+
+    def open_similar(self, item):
+        """
+        Open the similar recipe that was double-clicked.
+        """
+        if self.open_recipe is not None:
+            self.similar_window = self.open_recipe(item.data(Qt.UserRole))
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       sync_worker.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+
+import time
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class SyncWorker(QThread):
+    """
+    This class runs RecipeDownloader.download_recipes on a background thread, so that the window stays responsive.
+    It reports the progress and the errors of the sync through Qt signals, which are delivered on the GUI thread.
+    """
+
+    # pages written, total pages, recipes per second, estimated seconds left
+    progress = pyqtSignal(int, int, float, float)
+    # emitted each time a batch of recipes has been written to the database
+    batch_written = pyqtSignal()
+    # error message
+    error = pyqtSignal(str)
+
+    def __init__(self, downloader, db, parent=None):
+        super(SyncWorker, self).__init__(parent)
+        self.downloader = downloader
+        self.db = db
+        self.started_at = None
+
+        # The downloader calls these hooks from its own threads; emitting a signal is thread-safe
+        self.downloader.on_progress = self.on_progress
+        self.downloader.on_error = self.error.emit
+
+    def run(self):
+        """
+        Run the sync. This method is executed on the worker thread.
+        """
+        self.started_at = time.monotonic()
+        try:
+            self.downloader.download_recipes(self.db)
+        except Exception as error:
+            self.error.emit(f"Sync failed: {error}")
+
+    def on_progress(self, pages_written, pages_total, recipes_written):
+        """
+        Compute the throughput and the remaining time, then notify the window.
+        """
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        rate = recipes_written / elapsed
+        pages_left = max(pages_total - pages_written, 0)
+        eta = elapsed / pages_written * pages_left if pages_written else 0.0
+        self.progress.emit(pages_written, pages_total, rate, eta)
+        self.batch_written.emit()
+
+    def cancel(self):
+        """
+        Ask the sync to stop; the thread finishes once the pages in flight are done.
+        """
+        self.downloader.cancel()
@@ -9,5 +9,18 @@
 # All rights reserved. 
 #
 
-from .database import Database
-from .recipe_downloader import RecipeDownloader
+import importlib
+
+# Imported on first access: the lighter modules of the package (settings...) do not load py2neo and requests
+_EXPORTS = {
+    'Database': '.database',
+    'RecipeDownloader': '.recipe_downloader',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       cache.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+# A cached response, as returned by ResponseCache.lookup
+CacheEntry = namedtuple('CacheEntry', ['key', 'data', 'fresh', 'etag', 'last_modified', 'size'])
+
+
+def read_blob(path):
+    """
+    Return the JSON content of a blob (or of a plain .json file), decompressed according to its extension.
+    """
+    with open(path, 'rb') as file:
+        raw = file.read()
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise ValueError("zstd compressed blobs require the zstandard package")
+        raw = zstandard.ZstdDecompressor().decompress(raw)
+    elif path.endswith('.gz'):
+        raw = gzip.decompress(raw)
+    return json.loads(raw)
+
+
+class ResponseCache:
+    """
+    The ResponseCache class stores API responses on disk, compressed and content-addressed:
+    each request (URL and full set of parameters) points to a blob named after the hash of its content,
+    so identical payloads are only stored once. Entries expire after `ttl` seconds but can be revalidated
+    with their ETag or Last-Modified header, and the least recently used ones are evicted once the blobs
+    exceed `max_bytes`.
+    """
+
+    def __init__(self, directory='datas/cache', ttl=60 * 60, max_bytes=512 * 1024 * 1024, compression=None):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.compression = compression or ('zstd' if zstandard is not None else 'gzip')
+        if self.compression == 'zstd' and zstandard is None:
+            raise ValueError("zstd compression requires the zstandard package")
+
+        os.makedirs(os.path.join(directory, 'blobs'), exist_ok=True)
+        self.connection = sqlite3.connect(os.path.join(directory, 'index.sqlite'), check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS entries ("
+                                "key TEXT PRIMARY KEY, blob TEXT NOT NULL, size INTEGER NOT NULL, "
+                                "etag TEXT, last_modified TEXT, stored_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+                                "locale TEXT)")
+        # Caches made before the locale of the pages was recorded
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(entries)")]
+        if 'locale' not in columns:
+            self.connection.execute("ALTER TABLE entries ADD COLUMN locale TEXT")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+        self.connection.commit()
+        self.lock = threading.Lock()
+
+        # Counters, see stats()
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def key(url, params):
+        """
+        Return the cache key of a request: a hash of its URL and of every parameter.
+        """
+        content = json.dumps([url, sorted((str(k), str(v)) for k, v in params.items())])
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def _blob_path(self, blob):
+        extension = 'zst' if self.compression == 'zstd' else 'gz'
+        return os.path.join(self.directory, 'blobs', blob[:2], f"{blob}.json.{extension}")
+
+    def _compress(self, raw):
+        if self.compression == 'zstd':
+            return zstandard.ZstdCompressor(level=6).compress(raw)
+        return gzip.compress(raw, compresslevel=6)
+
+    def _decompress(self, compressed):
+        if self.compression == 'zstd':
+            return zstandard.ZstdDecompressor().decompress(compressed)
+        return gzip.decompress(compressed)
+
+    def lookup(self, url, params):
+        """
+        Return the CacheEntry of a request, or None if it is not cached.
+        A fresh entry counts as a hit; a stale one has to be revalidated or fetched again.
+        """
+        key = self.key(url, params)
+        with self.lock:
+            row = self.connection.execute("SELECT blob, size, etag, last_modified, stored_at FROM entries "
+                                          "WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+
+        blob, size, etag, last_modified, stored_at = row
+        try:
+            with open(self._blob_path(blob), 'rb') as file:
+                raw = self._decompress(file.read())
+        except (OSError, ValueError):
+            # The blob is gone or corrupted: forget the entry
+            self.delete(key)
+            return None
+
+        fresh = time.time() - stored_at < self.ttl
+        with self.lock:
+            if fresh:
+                self.hits += 1
+                self.bytes_saved += len(raw)
+            self.connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.connection.commit()
+        return CacheEntry(key, json.loads(raw), fresh, etag, last_modified, len(raw))
+
+    @staticmethod
+    def validators(entry):
+        """
+        Return the conditional request headers for a stale entry.
+        """
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def revalidated(self, entry):
+        """
+        Mark a stale entry as fresh again, after the server answered 304 Not Modified.
+        """
+        with self.lock:
+            self.revalidations += 1
+            self.bytes_saved += entry.size
+            self.connection.execute("UPDATE entries SET stored_at = ? WHERE key = ?", (time.time(), entry.key))
+            self.connection.commit()
+
+    def store(self, url, params, data, etag=None, last_modified=None):
+        """
+        Store the response of a request, then evict the least recently used entries if the cache is too big.
+        The `locale` parameter of the request is recorded with the entry, see blob_locales().
+        """
+        raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+        blob = hashlib.sha256(raw).hexdigest()
+        path = self._blob_path(blob)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file first so that a crash never leaves a truncated blob behind
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            with open(temporary, 'wb') as file:
+                file.write(self._compress(raw))
+            os.replace(temporary, path)
+
+        now = time.time()
+        with self.lock:
+            self.misses += 1
+            self.connection.execute("INSERT OR REPLACE INTO entries "
+                                    "(key, blob, size, etag, last_modified, stored_at, accessed_at, locale) "
+                                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                    (self.key(url, params), blob, os.path.getsize(path), etag, last_modified,
+                                     now, now, params.get('locale')))
+            self.connection.commit()
+        self.evict()
+
+    def delete(self, key):
+        with self.lock:
+            row = self.connection.execute("SELECT blob FROM entries WHERE key = ?", (key,)).fetchone()
+            self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self.connection.commit()
+            if row is not None:
+                self._delete_blob(row[0])
+
+    def _delete_blob(self, blob):
+        # Remove a blob once no entry refers to it any more (called with the lock held)
+        if self.connection.execute("SELECT 1 FROM entries WHERE blob = ? LIMIT 1", (blob,)).fetchone() is None:
+            try:
+                os.remove(self._blob_path(blob))
+            except OSError:
+                pass
+
+    def blob_paths(self):
+        """
+        Return the path of every blob referenced by an entry, each blob once.
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT DISTINCT blob FROM entries ORDER BY blob").fetchall()
+        return [self._blob_path(blob) for blob, in rows]
+
+    def blob_locales(self):
+        """
+        Return the (path, locale) pairs of the blobs referenced by an entry, the locale being the one of the request.
+        A blob served to several markets comes once per locale; the locale is None for entries stored before it
+        was recorded.
+        """
+        with self.lock:
+            rows = self.connection.execute("SELECT DISTINCT blob, locale FROM entries ORDER BY blob, locale").fetchall()
+        return [(self._blob_path(blob), locale) for blob, locale in rows]
+
+    def size(self):
+        """
+        Return the number of bytes used by the blobs.
+        """
+        with self.lock:
+            return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM "
+                                           "(SELECT DISTINCT blob, size FROM entries)").fetchone()[0]
+
+    def evict(self):
+        """
+        Evict the least recently used entries until the blobs fit in `max_bytes`.
+        """
+        if not self.max_bytes:
+            return
+        total = self.size()
+        if total <= self.max_bytes:
+            return
+        with self.lock:
+            rows = self.connection.execute("SELECT key, blob, size FROM entries ORDER BY accessed_at").fetchall()
+            for key, blob, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self.connection.execute("DELETE FROM entries WHERE key = ?", (key,))
+                if self.connection.execute("SELECT 1 FROM entries WHERE blob = ? LIMIT 1", (blob,)).fetchone() \
+                        is None:
+                    total -= size
+                self._delete_blob(blob)
+                self.evictions += 1
+            self.connection.commit()
+
+    def stats(self):
+        """
+        Return the cache counters.
+        """
+        lookups = self.hits + self.revalidations + self.misses
+        return {
+            'hits': self.hits,
+            'revalidations': self.revalidations,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.revalidations) / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'bytes_saved': self.bytes_saved,
+            'size': self.size(),
+        }
+
+    def close(self):
+        self.connection.close()
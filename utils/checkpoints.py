@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       checkpoints.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class SyncCheckpoints:
+    """
+    The SyncCheckpoints class records, in a local SQLite file (the one of the sync state by default), the parameters
+    and the total of each sync run and every page whose recipes have been committed to the database.
+    A run that did not finish, because of an error, a crash or a cancel, is resumed by the next sync with the same
+    parameters: only the pages it had not committed yet are fetched and written.
+    """
+
+    def __init__(self, path='datas/sync_state.sqlite', max_age=24 * 60 * 60):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_age = max_age
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS sync_runs ("
+                                "key TEXT PRIMARY KEY, params TEXT NOT NULL, total INTEGER NOT NULL, "
+                                "take INTEGER NOT NULL, started_at REAL NOT NULL, updated_at REAL NOT NULL, "
+                                "finished_at REAL)")
+        self.connection.execute("CREATE TABLE IF NOT EXISTS sync_run_pages ("
+                                "key TEXT NOT NULL, skip INTEGER NOT NULL, PRIMARY KEY (key, skip))")
+        self.connection.commit()
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(params):
+        """
+        Return the key of a run: a hash of its parameters.
+        """
+        content = json.dumps(params, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def resume(self, params):
+        """
+        Return the total and the set of committed page offsets of an unfinished run with these parameters,
+        or None if there is no such run or if it is older than `max_age` seconds.
+        """
+        key = self.key(params)
+        with self.lock:
+            row = self.connection.execute("SELECT total, updated_at FROM sync_runs "
+                                          "WHERE key = ? AND finished_at IS NULL", (key,)).fetchone()
+            if row is None or (self.max_age and time.time() - row[1] > self.max_age):
+                return None
+            skips = {skip for skip, in self.connection.execute("SELECT skip FROM sync_run_pages WHERE key = ?",
+                                                               (key,))}
+        return row[0], skips
+
+    def start(self, params, total, take):
+        """
+        Start a new run, forgetting the pages committed by a previous run with the same parameters.
+        """
+        key = self.key(params)
+        now = time.time()
+        with self.lock:
+            self.connection.execute("DELETE FROM sync_run_pages WHERE key = ?", (key,))
+            self.connection.execute("INSERT OR REPLACE INTO sync_runs "
+                                    "(key, params, total, take, started_at, updated_at, finished_at) "
+                                    "VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                                    (key, json.dumps(params, sort_keys=True), total, take, now, now))
+            self.connection.commit()
+
+    def commit(self, params, skips):
+        """
+        Record the offsets of pages whose recipes have been written to the database.
+        """
+        key = self.key(params)
+        with self.lock:
+            self.connection.executemany("INSERT OR IGNORE INTO sync_run_pages (key, skip) VALUES (?, ?)",
+                                        [(key, skip) for skip in skips])
+            self.connection.execute("UPDATE sync_runs SET updated_at = ? WHERE key = ?", (time.time(), key))
+            self.connection.commit()
+
+    def finish(self, params):
+        """
+        Mark a run as finished: the next sync with the same parameters starts from the first page.
+        """
+        key = self.key(params)
+        with self.lock:
+            self.connection.execute("DELETE FROM sync_run_pages WHERE key = ?", (key,))
+            self.connection.execute("UPDATE sync_runs SET finished_at = ? WHERE key = ?", (time.time(), key))
+            self.connection.commit()
+
+    def close(self):
+        self.connection.close()
@@ -9,150 +9,659 @@
 # All rights reserved. 
 #
 
+import functools
+import re
+import threading
+
 from py2neo import Relationship, Node, Graph
 
+from utils.detail_cache import DetailCache
+from utils.facet_cache import FacetCache
+from utils.facet_index import FacetIndex
+from utils.metrics import metrics
+from utils.pool import ConnectionPool
+from utils.schema import SchemaManager
+from utils.similarity import MinHashIndex, recipe_tokens
+from utils.settings import load_settings, neo4j_settings
+
+# Node labels written by the ingest, in the order they must be merged (the
+# recipes first, so that relationships can be attached to them afterwards)
+NODE_LABELS = ("Recette", "Allergene", "Cuisine", "Ingredient", "Step", "Tag")
+
+# Relationship type created from each dependent label towards its recipe
+RELATIONSHIP_TYPES = {
+    "Allergene": "ALLERGENE_IN",
+    "Cuisine": "CUISINE_OF",
+    "Ingredient": "INGREDIENT_IN",
+    "Step": "STEP_IN",
+    "Tag": "TAG_OF",
+}
+
+# Bulk ingest statements: one per node label and one per relationship type
+UNWIND_MERGE_NODES = "UNWIND $rows AS row MERGE (n:{label} {{_id: row._id}}) SET n += row"
+UNWIND_MERGE_RELATIONSHIPS = "UNWIND $rows AS row " \
+                             "MATCH (a:{label} {{_id: row.src}}) " \
+                             "MATCH (r:Recette {{_id: row.dst}}) " \
+                             "MERGE (a)-[:{type}]->(r)"
+
+
+def recipe_properties(recette_data):
+    # Properties stored on a Recipe node
+    return dict(_id=recette_data.get('id'),
+                name=recette_data.get('name'),
+                description=recette_data.get('description'),
+                descriptionHtml=recette_data.get('descriptionHtml'),
+                country=recette_data.get('country'),
+                category=recette_data.get('category.name', ''),
+                difficulty=recette_data.get('difficulty'),
+                headline=recette_data.get('headline'),
+                imageLink=recette_data.get('imageLink'),
+                link=recette_data.get('link'),
+                prepTime=recette_data.get('prepTime'),
+                slug=recette_data.get('slug'))
+
+
+def allergene_properties(allergene_data):
+    # Properties stored on an Allergene node
+    return dict(_id=allergene_data.get('id'), name=allergene_data.get('name'))
+
+
+def cuisine_properties(cuisine_data):
+    # Properties stored on a Cuisine node
+    return dict(_id=cuisine_data.get('id'), name=cuisine_data.get('name'))
+
+
+def ingredient_properties(ingredient_data):
+    # Properties stored on an Ingredient node
+    return dict(_id=ingredient_data.get('id'),
+                name=ingredient_data.get('name'),
+                quantity=ingredient_data.get('quantity'),
+                unit=ingredient_data.get('unit'))
+
+
+def step_properties(recette_data, step_data):
+    # Properties stored on a Step node, whose id is derived from the recipe id and the step index
+    return dict(_id=str(recette_data.get('id')) + "_" + str(step_data.get('index')),
+                stepNumber=step_data.get('index'),
+                instructions=step_data.get('instructions'),
+                instructionsMarkdown=step_data.get('instructionsMarkdown'),
+                instructionsHTML=step_data.get('instructionsHTML'),
+                utensils=step_data.get('utensils'),
+                images=step_data.get('images.links'),
+                images_str=step_data.get('images.caption'),
+                ingredients=step_data.get('ingredients'))
+
+
+def tag_properties(tag_data):
+    # Properties stored on a Tag node
+    return dict(_id=tag_data.get('id'), name=tag_data.get('name'))
+
+
+def build_rows(json_datas):
+    """
+    Normalise a list of recipes into deduplicated node rows per label and relationship rows per type,
+    ready to be passed as parameters to the UNWIND statements.
+    """
+    nodes = {label: {} for label in NODE_LABELS}
+    relationships = {label: set() for label in RELATIONSHIP_TYPES}
+
+    def add(label, properties, recipe_id):
+        nodes[label][properties['_id']] = properties
+        relationships[label].add((properties['_id'], recipe_id))
+
+    for recette_data in json_datas or []:
+        recette = recipe_properties(recette_data)
+        recipe_id = recette['_id']
+        nodes["Recette"][recipe_id] = recette
+
+        for allergene_data in recette_data.get('allergens') or []:
+            add("Allergene", allergene_properties(allergene_data), recipe_id)
+        for cuisine_data in recette_data.get('cuisines') or []:
+            add("Cuisine", cuisine_properties(cuisine_data), recipe_id)
+        for ingredient_data in recette_data.get('ingredients') or []:
+            add("Ingredient", ingredient_properties(ingredient_data), recipe_id)
+        for step_data in recette_data.get('steps') or []:
+            add("Step", step_properties(recette_data, step_data), recipe_id)
+        for tag_data in recette_data.get('tags') or []:
+            add("Tag", tag_properties(tag_data), recipe_id)
+
+    node_rows = {label: list(rows.values()) for label, rows in nodes.items()}
+    relationship_rows = {label: [{'src': src, 'dst': dst} for src, dst in sorted(rows)]
+                         for label, rows in relationships.items()}
+    return node_rows, relationship_rows
+
+
+# Characters with a meaning in the Lucene query syntax of full-text indexes
+LUCENE_SPECIAL_CHARACTERS = re.compile(r'([+\-&|!(){}\[\]^"~*?:\\/])')
+
+
+def fulltext_query(text):
+    """
+    Turn what the user typed into a Lucene query where every word must match as a prefix,
+    so that results show up while the last word is still being typed. The words are lowercased, as the index
+    stores them, which also keeps a typed AND, OR or NOT from being read as an operator.
+    """
+    terms = [LUCENE_SPECIAL_CHARACTERS.sub(r'\\\1', term.lower()) for term in text.split()]
+    return " AND ".join(f"{term}*" for term in terms)
+
+
+def build_search_query(selected_cuisine, selected_tag, recipe_name, selected_ingredients,
+                       match_all_ingredients=False, fulltext=True):
+    """
+    Build the Cypher search query and its parameters. Only the selected filters are matched, starting from the
+    (indexed) filter nodes, and the ingredient, cuisine and tag names of each recipe are fetched with separate
+    pattern comprehensions so that no cartesian product is built. With `match_all_ingredients` a recipe must contain
+    every selected ingredient, otherwise any of them is enough. Without `fulltext` (the recette_text index is not
+    online), the recipe name is matched with a case-insensitive CONTAINS instead.
+    """
+    clauses = []
+    parameters = {}
+
+    # The recipe name goes through the full-text index (case-insensitive, word prefixes)
+    if fulltext and recipe_name and fulltext_query(recipe_name):
+        clauses.append("CALL db.index.fulltext.queryNodes('recette_text', $recipe_name) YIELD node AS r")
+        parameters['recipe_name'] = fulltext_query(recipe_name)
+
+    # Add a MATCH clause for each search parameter
+    if selected_cuisine:
+        clauses.append("MATCH (:Cuisine {name: $cuisine})-[:CUISINE_OF]->(r:Recette)")
+        parameters['cuisine'] = selected_cuisine
+    if selected_tag:
+        clauses.append("MATCH (:Tag {name: $tag})-[:TAG_OF]->(r:Recette)")
+        parameters['tag'] = selected_tag
+    if selected_ingredients:
+        clauses.append("MATCH (i:Ingredient)-[:INGREDIENT_IN]->(r:Recette) WHERE i.name IN $ingredients")
+        if match_all_ingredients:
+            clauses.append("WITH r, count(DISTINCT i.name) AS matched WHERE matched = size($ingredients)")
+        parameters['ingredients'] = list(selected_ingredients)
+    if not clauses:
+        clauses.append("MATCH (r:Recette)")
+    if not fulltext and recipe_name:
+        clauses.append("WITH r WHERE toLower(r.name) CONTAINS toLower($recipe_name)")
+        parameters['recipe_name'] = recipe_name
+
+    # Define the return values of the query: a summary row per recipe, the details are read by get_recipe_detail()
+    query = " ".join(clauses) + \
+        " WITH DISTINCT r" \
+        " WITH r, [(i:Ingredient)-[:INGREDIENT_IN]->(r) | i.name] AS Ingredients" \
+        " RETURN Ingredients," \
+        " [(c:Cuisine)-[:CUISINE_OF]->(r) | c.name] AS Cuisine," \
+        " [(t:Tag)-[:TAG_OF]->(r) | t.name] AS Tags," \
+        " r {._id, .name, .prepTime} AS Recipes," \
+        " size(Ingredients) AS NumberOfIngredients," \
+        " r.prepTime AS PrepTime" \
+        " ORDER BY NumberOfIngredients DESC"
+    return query, parameters
+
+
+def pooled(method):
+    # Hold a slot of the connection pool while the method talks to the database, and time the call
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.pool.connection(), metrics.timer('db_call_seconds', method=method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
+
 
 class Database:
     """
-    Description for Database class.
+    Access to the Neo4j database. The application shares a single instance, returned by Database.shared(),
+    whose py2neo Graph keeps a pool of Bolt connections configured in the `neo4j` section of settings.yaml.
     """
 
-    def __init__(self):
-        # Connect to the Neo4j database
-        self.graph = Graph("bolt://localhost:7687", auth=("neo4j", "123456789"))
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, graph=None, settings=None):
+        # Connect to the Neo4j database, unless a graph is provided by the caller
+        if settings is None:
+            settings = load_settings()
+        config = neo4j_settings(settings)
+        if graph is None:
+            graph = Graph(config['uri'], auth=(config['user'], config['password']),
+                          max_size=config['max_connections'], max_age=config['max_age'])
+        self.graph = graph
+        self.pool = ConnectionPool(graph, config['max_connections'], config['acquire_timeout'])
 
+        # Number of rows fetched per query by the iter_* streaming methods
+        self.fetch_size = config['fetch_size']
+
+        # Callables notified with (json_datas, node_rows) once recipes are written, see add_write_listener
+        self.write_listeners = []
+
+        # Facet lists served from memory (and from a snapshot on disk), updated after each write
+        self.facets = FacetCache(self, settings.get('facet_snapshot', 'datas/facets.json'))
+        self.add_write_listener(self.facets.on_write)
+
+        # Details of the last opened recipes, see get_recipe_detail()
+        self.details = DetailCache(settings.get('detail_cache_size', 128))
+        self.add_write_listener(self.details.on_write)
+
+        # In-memory inverted index of the facets, built on demand by get_facet_index()
+        self.facet_index = None
+        self.facet_index_lock = threading.Lock()
+
+        # Recipe similarity index, read from `similarity_path` or built by get_similarity_index()
+        self.similarity_path = settings.get('similarity_path', 'datas/similarity')
+        self.similarity_options = {'num_perm': settings.get('similarity_num_perm', 64),
+                                   'bands': settings.get('similarity_bands', 32),
+                                   'k': settings.get('similarity_k', 10)}
+        self.similarity = None
+        self.similarity_lock = threading.Lock()
+
+        # Set once the recette_text full-text index is online, see has_fulltext_index()
+        self.fulltext_online = False
+
+    @classmethod
+    def shared(cls):
+        """
+        Return the application-wide Database, connecting on first use.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def add_write_listener(self, listener):
+        """
+        Register a callable notified after each write with the recipes written and their node rows.
+        Listeners run while the connection is still held, so they must not query the database.
+        """
+        self.write_listeners.append(listener)
+
+    def notify_write(self, json_datas, node_rows):
+        for listener in self.write_listeners:
+            listener(json_datas, node_rows)
+
+    def get_facet_index(self):
+        """
+        Return the inverted facet index, building it from the graph on first use.
+        It is then kept up to date by the writes made through this Database.
+        """
+        with self.facet_index_lock:
+            if self.facet_index is None:
+                index = FacetIndex()
+                # Register first so that recipes written during the build are not missed
+                self.add_write_listener(index.on_write)
+                self.facet_index = index.build(self)
+            return self.facet_index
+
+    def get_similarity_index(self, build=True, rebuild=False):
+        """
+        Return the recipe similarity index saved in `similarity_path`; if there is none (or with `rebuild`),
+        build it from the graph and save it, unless `build` is False, in which case None is returned.
+        It is then kept up to date by the writes made through this Database, see save_similarity_index().
+        """
+        with self.similarity_lock:
+            if self.similarity is not None and not rebuild:
+                return self.similarity
+            index = None if rebuild else MinHashIndex.load(self.similarity_path)
+            if index is not None:
+                self.add_write_listener(index.on_write)
+                self.similarity = index
+                return index
+        if not build:
+            return None
+
+        # Built without the lock, so that similar_recipes() answers (with no recipes) in the meantime
+        index = MinHashIndex(**self.similarity_options)
+        # Register first so that recipes written during the build are not missed
+        self.add_write_listener(index.on_write)
+        index.build((row['_id'], row['name'], recipe_tokens(row['ingredient'], row['tag'], row['cuisine']))
+                    for row in self.iter_recipe_facets())
+        index.save(self.similarity_path)
+        with self.similarity_lock:
+            if self.similarity is not None:
+                # Replaced by a rebuild: a new list, since notify_write may be iterating over the current one
+                previous = self.similarity.on_write
+                self.write_listeners = [listener for listener in self.write_listeners if listener != previous]
+            self.similarity = index
+        return index
+
+    def save_similarity_index(self):
+        # Save the similarity index if writes changed it since it was read
+        with self.similarity_lock:
+            if self.similarity is not None and self.similarity.dirty:
+                self.similarity.save(self.similarity_path)
+
+    def similar_recipes(self, recipe_id, limit=None):
+        """
+        Return the recipes most similar to a recipe (_id, name and estimated similarity), best first, from the
+        saved similarity index; none if it has not been built yet.
+        """
+        index = self.get_similarity_index(build=False)
+        return index.similar(recipe_id, limit) if index is not None else []
+
+    def pool_stats(self):
+        # Return the active and idle connections and the time spent waiting for one
+        return self.pool.stats()
+
+    @pooled
+    def ensure_schema(self, wait=False):
+        # Create the constraints and indexes on the merge keys and the searched properties, if missing
+        SchemaManager(self.graph).ensure(wait)
+
+    def has_fulltext_index(self):
+        """
+        Return whether the recette_text full-text index can be queried. Until it is (`ensure_schema` turned off,
+        first start while it populates), the name searches fall back to CONTAINS; once online it stays so.
+        Called by the search methods, with their pool connection held.
+        """
+        if not self.fulltext_online:
+            try:
+                state = self.graph.run("SHOW INDEXES YIELD name, state WHERE name = 'recette_text' "
+                                       "RETURN state").evaluate()
+            except Exception as error:
+                print(f"Cannot read the state of the full-text index: {error}")
+                return False
+            self.fulltext_online = state == 'ONLINE'
+        return self.fulltext_online
+
+    @pooled
+    def schema_status(self):
+        # Return the state of each constraint and index, by name
+        return SchemaManager(self.graph).status()
+
+    @pooled
     def count_recipes(self):
         # Count the number of Recipe nodes and return the result
         return self.graph.run("MATCH (r:Recette) RETURN DISTINCT count(r) AS nbRecipes").data()
 
+    @pooled
     def get_recipes(self):
         # Get all distinct Recipe nodes and return them, ordered by name
         return self.graph.run("MATCH (r:Recette) RETURN DISTINCT r AS recette ORDER BY r.name").data()
 
+    @pooled
+    def get_recipe_page(self, after=None, limit=200, properties=('name', '_id')):
+        """
+        Return at most `limit` recipes ordered by name then _id, starting after the row `after`
+        (keyset pagination: the cost of a page does not depend on how far the user scrolled).
+        Each row only holds the requested properties, plus name and _id which are the pagination key.
+        """
+        query = "MATCH (r:Recette) WHERE r.name IS NOT NULL"
+        parameters = {'limit': limit}
+        if after is not None:
+            query += " AND (r.name > $name OR (r.name = $name AND r._id > $id))"
+            parameters.update(name=after['name'], id=after['_id'])
+        projection = ", ".join(f".{key}" for key in dict.fromkeys(('name', '_id') + tuple(properties)))
+        query += f" RETURN r {{{projection}}} AS recette ORDER BY r.name, r._id LIMIT $limit"
+        return [row['recette'] for row in self.graph.run(query, parameters).data()]
+
+    @pooled
+    def get_recipe_facets_page(self, after=None, limit=1000):
+        """
+        Return at most `limit` recipes ordered by _id, after the _id `after`, each with its name and the names
+        of its cuisines, tags, ingredients and allergens.
+        """
+        query = "MATCH (r:Recette)"
+        parameters = {'limit': limit}
+        if after is not None:
+            query += " WHERE r._id > $after"
+            parameters['after'] = after
+        query += " RETURN r._id AS _id, r.name AS name," \
+                 " [(c:Cuisine)-[:CUISINE_OF]->(r) | c.name] AS cuisine," \
+                 " [(t:Tag)-[:TAG_OF]->(r) | t.name] AS tag," \
+                 " [(i:Ingredient)-[:INGREDIENT_IN]->(r) | i.name] AS ingredient," \
+                 " [(a:Allergene)-[:ALLERGENE_IN]->(r) | a.name] AS allergen" \
+                 " ORDER BY r._id LIMIT $limit"
+        return self.graph.run(query, parameters).data()
+
+    def iter_recipe_facets(self, fetch_size=None):
+        """
+        Yield every recipe with the names of its facets, `fetch_size` at a time.
+        """
+        fetch_size = fetch_size or self.fetch_size
+        after = None
+        while True:
+            page = self.get_recipe_facets_page(after, fetch_size)
+            yield from page
+            if len(page) < fetch_size:
+                return
+            after = page[-1]['_id']
+
+    def iter_recipes(self, properties=('name', '_id'), fetch_size=None):
+        """
+        Yield every recipe ordered by name, with only the requested properties.
+        Recipes are fetched `fetch_size` at a time, so memory does not grow with the size of the graph.
+        """
+        fetch_size = fetch_size or self.fetch_size
+        after = None
+        while True:
+            page = self.get_recipe_page(after, fetch_size, properties)
+            yield from page
+            if len(page) < fetch_size:
+                return
+            after = page[-1]
+
+    @pooled
+    def count_label(self, label):
+        # Count the nodes of a label (answered from the count store, without scanning the nodes)
+        return self.graph.run(f"MATCH (n:{label}) RETURN count(n) AS n").evaluate()
+
+    @pooled
+    def get_names_page(self, label, after=None, limit=1000):
+        """
+        Return at most `limit` distinct names of the nodes of a label, in order, starting after the name `after`.
+        """
+        query = f"MATCH (n:{label}) WHERE n.name IS NOT NULL"
+        parameters = {'limit': limit}
+        if after is not None:
+            query += " AND n.name > $after"
+            parameters['after'] = after
+        query += " RETURN DISTINCT n.name AS name ORDER BY name LIMIT $limit"
+        return [row['name'] for row in self.graph.run(query, parameters).data()]
+
+    def iter_names(self, label, fetch_size=None):
+        """
+        Yield the distinct names of the nodes of a label (Cuisine, Ingredient, Tag...), in order,
+        `fetch_size` at a time.
+        """
+        fetch_size = fetch_size or self.fetch_size
+        after = None
+        while True:
+            page = self.get_names_page(label, after, fetch_size)
+            yield from page
+            if len(page) < fetch_size:
+                return
+            after = page[-1]
+
+    @pooled
     def get_cuisines(self):
         # Get all distinct Cuisine nodes and return their names, ordered by name
         cuisines = self.graph.run("MATCH (c:Cuisine) RETURN DISTINCT c.name AS cuisine  ORDER BY c.name").data()
         return [cuisine['cuisine'] for cuisine in cuisines]
 
+    @pooled
     def get_ingredients(self):
         # Get all distinct Ingredient nodes and return their names, ordered by name
         ingredients = self.graph.run("MATCH (i:Ingredient) RETURN DISTINCT i.name AS ingredient ORDER BY i.name").data()
         return [ingredient['ingredient'] for ingredient in ingredients]
 
+    @pooled
     def get_tags(self):
         # Get all distinct Tag nodes and return their names, ordered by name
         tags = self.graph.run("MATCH (t:Tag) RETURN DISTINCT t.name AS tag ORDER BY t.name").data()
         return [tag['tag'] for tag in tags]
 
-    def put_recipes(self, json_datas):
-        # Process and store a list of recipes represented as JSON data
+    @pooled
+    def put_recipes(self, json_datas, seen=None):
+        # Process and store a list of recipes represented as JSON data.
+        # Nodes and relationships are merged, so storing the same recipe twice leaves the graph unchanged.
+        # With `seen` (a SeenEntities of the running sync), the shared nodes it already wrote unchanged are not merged
+        def merge_shared(label, properties, recette):
+            if seen is not None and not seen.unseen(label, [properties]):
+                # Only link the node written earlier in the sync to the recipe
+                self.graph.run(UNWIND_MERGE_RELATIONSHIPS.format(label=label, type=RELATIONSHIP_TYPES[label]),
+                               rows=[{'src': properties['_id'], 'dst': recette['_id']}])
+                seen.remember(label, [], skipped=1)
+                return
+            node = Node(label, **properties)
+            self.graph.merge(node, label, "_id")  # Merge to avoid duplicates
+            self.graph.merge(Relationship(node, RELATIONSHIP_TYPES[label], recette))
+            if seen is not None:
+                seen.remember(label, [properties])
+
         if json_datas is not None:
             for recette_data in json_datas:
                 # Create a Recipe node from the recipe data
-                recette = Node("Recette",
-                               _id=recette_data.get('id'),
-                               name=recette_data.get('name'),
-                               description=recette_data.get('description'),
-                               descriptionHtml=recette_data.get('descriptionHtml'),
-                               country=recette_data.get('country'),
-                               category=recette_data.get('category.name', ''),
-                               difficulty=recette_data.get('difficulty'),
-                               headline=recette_data.get('headline'),
-                               imageLink=recette_data.get('imageLink'),
-                               link=recette_data.get('link'),
-                               prepTime=recette_data.get('prepTime'),
-                               slug=recette_data.get('slug')
-                               )
+                recette = Node("Recette", **recipe_properties(recette_data))
                 # Merge the Recipe node to avoid creating duplicate nodes
                 self.graph.merge(recette, "Recette", "_id")
 
                 # Create Allergene nodes and relationships
                 for allergene_data in recette_data.get('allergens'):
-                    allergene = Node("Allergene",
-                                     _id=allergene_data.get('id'),
-                                     name=allergene_data.get('name'))
-                    self.graph.merge(allergene, "Allergene", "_id")  # Merge to avoid duplicates
-                    relation = Relationship(allergene, "ALLERGENE_IN", recette)
-                    self.graph.create(relation)
+                    merge_shared("Allergene", allergene_properties(allergene_data), recette)
 
                 # Create Cuisine nodes and relationships
                 for cuisine_data in recette_data.get('cuisines'):
-                    cuisine = Node("Cuisine",
-                                   _id=cuisine_data.get('id'),
-                                   name=cuisine_data.get('name'))
-                    self.graph.merge(cuisine, "Cuisine", "_id")
-                    relation = Relationship(cuisine, "CUISINE_OF", recette)
-                    self.graph.create(relation)
+                    merge_shared("Cuisine", cuisine_properties(cuisine_data), recette)
 
                 # Create Ingredient nodes and relationships
                 for ingredient_data in recette_data.get('ingredients'):
-                    ingredient = Node("Ingredient",
-                                      _id=ingredient_data.get('id'),
-                                      name=ingredient_data.get('name'),
-                                      quantity=ingredient_data.get('quantity'),
-                                      unit=ingredient_data.get('unit'))
-                    self.graph.merge(ingredient, "Ingredient", "_id")
-                    relation = Relationship(ingredient, "INGREDIENT_IN", recette)
-                    self.graph.create(relation)
+                    merge_shared("Ingredient", ingredient_properties(ingredient_data), recette)
 
                 # Create Step nodes and relationships
                 for step_data in recette_data.get('steps'):
-                    id = str(recette_data.get('id')) + "_" + str(step_data.get('index'))
-                    step = Node("Step", _id=id, stepNumber=step_data.get('index'),
-                                instructions=step_data.get('instructions'),
-                                instructionsMarkdown=step_data.get('instructionsMarkdown'),
-                                instructionsHTML=step_data.get('instructionsHTML'),
-                                utensils=step_data.get('utensils'),
-                                images=step_data.get('images.links'),
-                                images_str=step_data.get('images.caption'),
-                                ingredients=step_data.get('ingredients'))
+                    step = Node("Step", **step_properties(recette_data, step_data))
                     self.graph.merge(step, "Step", "_id")
                     relation = Relationship(step, "STEP_IN", recette)
-                    self.graph.create(relation)
-
-                    # Create Tag nodes and relationships
-                    for tag_data in recette_data.get('tags'):
-                        tag = Node("Tag", _id=tag_data.get('id'), name=tag_data.get('name'))
-                        self.graph.merge(tag, "Tag", "_id")
-                        relation = Relationship(tag, "TAG_OF", recette)
-                        self.graph.create(relation)
-
-    def search(self, selected_cuisine, selected_tag, recipe_name, selected_ingredients):
-        # Initialize a list to hold all the conditions
-        conditions = []
-
-        # Begin the Cypher query
-        q = "MATCH (r:Recette), " \
-            "(r:Recette)-[:INGREDIENT_IN]-(i:Ingredient), " \
-            "(r:Recette)-[:STEP_IN]-(s:Step), " \
-            "(r:Recette)-[:CUISINE_OF]-(c:Cuisine), " \
-            "(r:Recette)-[:TAG_OF]-(t:Tag) "
-
-        # Add conditions based on the search parameters
-        if selected_cuisine:
-            conditions.append(f"c.name = '{selected_cuisine}'")
-        if selected_tag:
-            conditions.append(f"t.name = '{selected_tag}'")
-        if recipe_name:
-            conditions.append(f"r.name CONTAINS '{recipe_name}'")
-        if selected_ingredients:
-            conditions.append(f"i.name IN {selected_ingredients}")
-
-        # Add conditions to the query
-        if conditions:
-            query = q + " WHERE " + " AND ".join(conditions)
-        else:
-            query = q
-
-        # Define the return values of the query
-        query += " RETURN COLLECT(DISTINCT i) AS Ingredients, " \
-                 "COLLECT(DISTINCT s) AS Steps, " \
-                 "COLLECT(DISTINCT c) AS Cuisine, " \
-                 "COLLECT(DISTINCT t) AS Tags, " \
-                 "r AS Recipes, " \
-                 "size([(r)-[:INGREDIENT_IN]->(i) | i]) AS NumberOfIngredients, " \
-                 "r.prepTime AS PrepTime " \
-                 "ORDER BY NumberOfIngredients DESC"
-
-        # Execute the query and return the results
-        return self.graph.run(query).data()
+                    self.graph.merge(relation)
+
+                # Create Tag nodes and relationships, once per recipe
+                for tag_data in recette_data.get('tags'):
+                    merge_shared("Tag", tag_properties(tag_data), recette)
+
+            # Keep the caches and indexes up to date
+            self.notify_write(json_datas, build_rows(json_datas)[0])
+
+    @pooled
+    def put_recipes_bulk(self, json_datas, seen=None):
+        """
+        Store a list of recipes (one page or a batch of pages) with a few parameterised UNWIND statements,
+        one per node label and one per relationship type, all inside a single transaction.
+        With `seen` (a SeenEntities of the running sync), the shared nodes it already wrote unchanged are left out
+        of the node merges; their relationships are still merged.
+        """
+        if not json_datas:
+            return
+
+        node_rows, relationship_rows = build_rows(json_datas)
+        merged_rows = node_rows if seen is None else {label: seen.unseen(label, rows)
+                                                      for label, rows in node_rows.items()}
+
+        tx = self.graph.begin()
+        try:
+            # Merge the nodes first so that every relationship finds both of its ends
+            for label in NODE_LABELS:
+                if merged_rows[label]:
+                    with metrics.timer('cypher_seconds', statement=f"merge_{label}"):
+                        tx.run(UNWIND_MERGE_NODES.format(label=label), rows=merged_rows[label])
+
+            for label, rel_type in RELATIONSHIP_TYPES.items():
+                if relationship_rows[label]:
+                    with metrics.timer('cypher_seconds', statement=f"merge_{rel_type}"):
+                        tx.run(UNWIND_MERGE_RELATIONSHIPS.format(label=label, type=rel_type),
+                               rows=relationship_rows[label])
+        except Exception:
+            self.graph.rollback(tx)
+            metrics.inc('db_rollbacks_total')
+            raise
+        with metrics.timer('cypher_seconds', statement='commit'):
+            self.graph.commit(tx)
+        if seen is not None:
+            for label, rows in merged_rows.items():
+                seen.remember(label, rows, skipped=len(node_rows[label]) - len(rows))
+
+        # Keep the caches and indexes up to date, now that the recipes are committed
+        self.notify_write(json_datas, node_rows)
+
+    @pooled
+    def deduplicate_relationships(self):
+        """
+        Delete the duplicate relationships left by the former ingest, which created a new edge on every sync
+        (and one TAG_OF edge per step). Only one relationship of each type is kept between two nodes.
+        Return the number of relationships deleted, by type.
+        """
+        deleted = {}
+        for label, rel_type in RELATIONSHIP_TYPES.items():
+            result = self.graph.run(f"MATCH (a:{label})-[rel:{rel_type}]->(r:Recette) "
+                                    f"WITH a, r, collect(rel) AS rels WHERE size(rels) > 1 "
+                                    f"UNWIND tail(rels) AS duplicate "
+                                    f"DELETE duplicate "
+                                    f"RETURN count(duplicate) AS deleted").data()
+            deleted[rel_type] = result[0]['deleted'] if result else 0
+        return deleted
+
+    @pooled
+    def count_graph(self):
+        # Count the nodes per label and the relationships per type
+        nodes = {label: self.graph.run(f"MATCH (n:{label}) RETURN count(n) AS n").evaluate() for label in NODE_LABELS}
+        relationships = {rel_type: self.graph.run(f"MATCH ()-[r:{rel_type}]->() RETURN count(r) AS n").evaluate()
+                         for rel_type in RELATIONSHIP_TYPES.values()}
+        return nodes, relationships
+
+    def iter_search(self, selected_cuisine, selected_tag, recipe_name, selected_ingredients,
+                    match_all_ingredients=False):
+        """
+        Same as search(), but yield the rows as they are read from the Bolt cursor instead of building a list.
+        A connection of the pool is held until the generator is exhausted or closed.
+        """
+        with self.pool.connection():
+            query, parameters = build_search_query(selected_cuisine, selected_tag, recipe_name, selected_ingredients,
+                                                   match_all_ingredients, self.has_fulltext_index())
+            for record in self.graph.run(query, parameters):
+                yield record.data()
+
+    def get_recipe_detail(self, recipe_id):
+        """
+        Return the recipe node with its ingredients, steps (ordered by stepNumber), cuisines, tags and allergens,
+        or None if there is no such recipe. The last opened recipes are served from an LRU cache.
+        """
+        details = self.details.get(recipe_id)
+        if details is None:
+            details = self.query_recipe_detail(recipe_id)
+            if details is not None:
+                self.details.put(recipe_id, details)
+        return details
+
+    @pooled
+    def query_recipe_detail(self, recipe_id):
+        # Read the whole subgraph of one recipe. `.*` leaves out the null properties, the ones the recipe window
+        # reads are projected explicitly so that they are always there, possibly None
+        rows = self.graph.run("MATCH (r:Recette {_id: $id}) "
+                              "RETURN r {.*, .name, .prepTime} AS Recipe,"
+                              " [(i:Ingredient)-[:INGREDIENT_IN]->(r) | i {.*, .name}] AS Ingredients,"
+                              " [(s:Step)-[:STEP_IN]->(r) | s {.*, .stepNumber, .instructions}] AS Steps,"
+                              " [(c:Cuisine)-[:CUISINE_OF]->(r) | c.name] AS Cuisines,"
+                              " [(t:Tag)-[:TAG_OF]->(r) | t.name] AS Tags,"
+                              " [(a:Allergene)-[:ALLERGENE_IN]->(r) | a.name] AS Allergens", id=recipe_id).data()
+        if not rows:
+            return None
+        details = rows[0]
+        details['Steps'].sort(key=lambda step: step.get('stepNumber') or 0)
+        return details
+
+    @pooled
+    def search_names(self, text, limit=20):
+        """
+        Return the `limit` recipes best matching the text in their name, headline or description,
+        ranked by full-text score.
+        """
+        query = fulltext_query(text)
+        if not query:
+            return []
+        if not self.has_fulltext_index():
+            return self.graph.run("MATCH (r:Recette) WHERE toLower(r.name) CONTAINS toLower($text) "
+                                  "RETURN r._id AS _id, r.name AS name, r.headline AS headline, 1.0 AS score "
+                                  "ORDER BY r.name LIMIT $limit", text=text.strip(), limit=limit).data()
+        return self.graph.run("CALL db.index.fulltext.queryNodes('recette_text', $query) YIELD node, score "
+                              "RETURN node._id AS _id, node.name AS name, node.headline AS headline, score "
+                              "ORDER BY score DESC LIMIT $limit", query=query, limit=limit).data()
+
+    @pooled
+    def search(self, selected_cuisine, selected_tag, recipe_name, selected_ingredients, match_all_ingredients=False):
+        # Build the query for the selected filters only and execute it with bound parameters
+        query, parameters = build_search_query(selected_cuisine, selected_tag, recipe_name, selected_ingredients,
+                                               match_all_ingredients, self.has_fulltext_index())
+        return self.graph.run(query, parameters).data()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       detail_cache.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+
+import threading
+from collections import OrderedDict
+
+
+class DetailCache:
+    """
+    The DetailCache class keeps the details of the last opened recipes, by _id, and evicts the least recently used
+    ones beyond `max_size`. The entries of recipes written by a sync are dropped so that they are read again.
+    """
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, recipe_id):
+        """
+        Return the cached details of a recipe, or None.
+        """
+        with self.lock:
+            details = self.entries.get(recipe_id)
+            if details is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(recipe_id)
+            self.hits += 1
+            return details
+
+    def put(self, recipe_id, details):
+        with self.lock:
+            self.entries[recipe_id] = details
+            self.entries.move_to_end(recipe_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def on_write(self, json_datas, node_rows):
+        # Write listener of the Database: forget the recipes that were just written
+        with self.lock:
+            for recette in node_rows.get("Recette", []):
+                self.entries.pop(recette['_id'], None)
+
+    def stats(self):
+        """
+        Return the hit and miss counters.
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'entries': len(self.entries)}
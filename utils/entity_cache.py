@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       entity_cache.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from utils.metrics import metrics
+
+# Labels of the nodes shared between recipes; recipes and steps belong to a single recipe and are never seen twice
+SHARED_LABELS = ("Allergene", "Cuisine", "Ingredient", "Tag")
+
+# Properties a recipe sets on a shared node that vary from recipe to recipe, left out of its hash: a node is
+# not merged again only because another recipe uses a different quantity of it
+PER_RECIPE_PROPERTIES = {"Ingredient": ("quantity", "unit")}
+
+
+class SeenEntities:
+    """
+    The SeenEntities class remembers, for the duration of one sync, the shared nodes already merged into the
+    database with a hash of their own properties. A node seen again with the same content does not need its MERGE,
+    only its relationship to the recipe; a node whose content changed is written again. The per-recipe properties
+    (an ingredient's quantity and unit) are not hashed, so they keep the value written first in the sync.
+    At most `max_size` nodes are kept, the least recently seen are forgotten first.
+    """
+
+    def __init__(self, max_size=100000):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()  # The pipeline can have several writer threads
+        self.skipped = dict.fromkeys(SHARED_LABELS, 0)
+        self.written = dict.fromkeys(SHARED_LABELS, 0)
+        self.evictions = 0
+
+    @staticmethod
+    def content_hash(label, properties):
+        excluded = PER_RECIPE_PROPERTIES.get(label, ())
+        content = json.dumps({name: value for name, value in properties.items() if name not in excluded},
+                             sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+        return hashlib.sha1(content.encode('utf-8')).digest()
+
+    def unseen(self, label, rows):
+        """
+        Return the rows of a label that still have to be merged: the nodes not written by this sync yet
+        or written with other properties. The rows of the other labels are all returned.
+        """
+        if label not in self.skipped:
+            return rows
+        result = []
+        with self.lock:
+            for row in rows:
+                key = (label, row['_id'])
+                if self.entries.get(key) == self.content_hash(label, row):
+                    self.entries.move_to_end(key)
+                else:
+                    result.append(row)
+        return result
+
+    def remember(self, label, rows, skipped=0):
+        """
+        Record nodes of a label as written, and the number of their merges that unseen() let skip.
+        Only call it once they are committed, so that a rolled back transaction neither leaves nodes in the cache
+        that are not in the database nor counts merges that were not avoided.
+        """
+        if label not in self.skipped:
+            return
+        with self.lock:
+            for row in rows:
+                key = (label, row['_id'])
+                self.entries[key] = self.content_hash(label, row)
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            self.skipped[label] += skipped
+            self.written[label] += len(rows)
+        if skipped:
+            metrics.inc('entity_merges_skipped_total', skipped, label=label)
+
+    def stats(self):
+        """
+        Return the number of merges avoided and made, in total and per label.
+        """
+        with self.lock:
+            return {'skipped': sum(self.skipped.values()), 'written': sum(self.written.values()),
+                    'size': len(self.entries), 'evictions': self.evictions,
+                    'skipped_by_label': dict(self.skipped)}
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       facet_cache.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+
+import bisect
+import json
+import os
+import threading
+
+
+class FacetCache:
+    """
+    The FacetCache class is a read-through cache of the facet lists (cuisine, ingredient and tag names...).
+    It is filled from the database on first use, kept up to date with the names written by each sync,
+    and can be persisted to a JSON snapshot so that the next start does not query the lists again.
+    A snapshot is trusted as long as the node count of each label has not changed.
+    """
+
+    def __init__(self, db, snapshot_path=None):
+        self.db = db
+        self.snapshot_path = snapshot_path
+        self.lock = threading.Lock()
+
+        # label -> sorted list of names, and the node count of the label when the list was built
+        self.facets = {}
+        self.counts = {}
+
+        # Labels whose list came from the snapshot and has not been checked against the database yet
+        self.unverified = set()
+        # Labels changed by a sync since the last snapshot
+        self.dirty = set()
+
+        # Incremented each time a sync adds names
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+        self.load_snapshot()
+
+    def get(self, label):
+        """
+        Return the sorted names of a label, from the cache when possible.
+        """
+        with self.lock:
+            if label in self.facets and label not in self.unverified:
+                self.hits += 1
+                return list(self.facets[label])
+
+        if label in self.unverified:
+            # A snapshot is only valid if no node was added or removed since it was taken
+            count = self.db.count_label(label)
+            with self.lock:
+                self.unverified.discard(label)
+                if self.counts.get(label) == count:
+                    self.hits += 1
+                    return list(self.facets[label])
+
+        names = list(self.db.iter_names(label))
+        count = self.db.count_label(label)
+        with self.lock:
+            self.misses += 1
+            self.facets[label] = names
+            self.counts[label] = count
+            self.dirty.add(label)
+        return list(names)
+
+    def on_write(self, json_datas, node_rows):
+        """
+        Merge the names written to the database into the cached lists. Registered as a Database write listener.
+        """
+        with self.lock:
+            changed = False
+            for label, names in self.facets.items():
+                for row in node_rows.get(label, ()):
+                    name = row.get('name')
+                    position = bisect.bisect_left(names, name) if name is not None else None
+                    if position is not None and (position == len(names) or names[position] != name):
+                        names.insert(position, name)
+                        changed = True
+                if node_rows.get(label):
+                    # The node count may have changed, it is read again when the snapshot is saved
+                    self.counts[label] = None
+                    self.dirty.add(label)
+            if changed:
+                self.version += 1
+
+    def invalidate(self, label=None):
+        """
+        Drop one cached list, or all of them.
+        """
+        with self.lock:
+            for key in ([label] if label else list(self.facets)):
+                self.facets.pop(key, None)
+                self.counts.pop(key, None)
+                self.dirty.add(key)
+
+    def load_snapshot(self):
+        if not self.snapshot_path or not os.path.isfile(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, 'r') as file:
+                snapshot = json.load(file)
+        except (OSError, ValueError):
+            return
+        with self.lock:
+            self.version = snapshot.get('version', 0)
+            for label, entry in snapshot.get('facets', {}).items():
+                self.facets[label] = entry['names']
+                self.counts[label] = entry['count']
+                self.unverified.add(label)
+
+    def save_snapshot(self):
+        """
+        Write the cached lists to the snapshot file, if they changed. Must not be called while holding
+        a database connection, since the node counts of the changed labels are read again.
+        """
+        if not self.snapshot_path or not self.dirty:
+            return
+        for label in list(self.dirty):
+            if label in self.facets and self.counts.get(label) is None:
+                count = self.db.count_label(label)
+                with self.lock:
+                    self.counts[label] = count
+        with self.lock:
+            snapshot = {'version': self.version,
+                        'facets': {label: {'names': names, 'count': self.counts[label]}
+                                   for label, names in self.facets.items() if self.counts.get(label) is not None}}
+            self.dirty.clear()
+        if os.path.dirname(self.snapshot_path):
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+        temporary = f"{self.snapshot_path}.tmp"
+        with open(temporary, 'w') as file:
+            json.dump(snapshot, file)
+        os.replace(temporary, self.snapshot_path)
+
+    def stats(self):
+        """
+        Return the hit and miss counters.
+        """
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'version': self.version}
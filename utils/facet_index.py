@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       facet_index.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+
+import sys
+import threading
+
+# Facets indexed, with the key of their list in a recipe returned by the API
+FACETS = {
+    'cuisine': 'cuisines',
+    'tag': 'tags',
+    'ingredient': 'ingredients',
+    'allergen': 'allergens',
+}
+
+
+def _bin_count(bitmap):
+    return bin(bitmap).count('1')
+
+
+# Number of recipes of a bitmap: int.bit_count needs Python 3.10, bin() counting is slower but works everywhere
+bit_count = getattr(int, 'bit_count', _bin_count)
+
+
+def _bitmap(positions):
+    """
+    Return the int whose bits are set at the given positions.
+    """
+    if not positions:
+        return 0
+    bits = bytearray(max(positions) // 8 + 1)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class FacetIndex:
+    """
+    The FacetIndex class is an in-memory inverted index from each cuisine, tag, ingredient and allergen name
+    to the set of recipes that have it. Recipes are numbered densely and each set is a bitmap stored in a
+    Python int, so combining filters is a few bitwise operations and counting is a popcount.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ids = []            # position -> recipe _id
+        self.positions = {}      # recipe _id -> position
+        self.postings = {facet: {} for facet in FACETS}
+        self.all = 0             # bitmap of every indexed recipe
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add(self, recipe_id, values):
+        """
+        Index a recipe, given the names of its facets: {'cuisine': [...], 'tag': [...], ...}.
+        A recipe indexed before is updated.
+        """
+        self.add_many([(recipe_id, values)])
+
+    def add_many(self, rows):
+        """
+        Index a batch of (recipe _id, facet names) rows. The bits of the new recipes are gathered first and
+        merged into each bitmap once per batch, since every update of a big int copies it.
+        """
+        with self.lock:
+            new_positions = {facet: {} for facet in FACETS}
+            for recipe_id, values in rows:
+                values = {facet: {sys.intern(name) for name in values.get(facet) or () if name is not None}
+                          for facet in FACETS}
+                position = self.positions.get(recipe_id)
+                if position is not None:
+                    self._update(position, values)
+                    continue
+
+                position = len(self.ids)
+                self.ids.append(recipe_id)
+                self.positions[recipe_id] = position
+                for facet, names in values.items():
+                    for name in names:
+                        new_positions[facet].setdefault(name, []).append(position)
+
+            for facet, names in new_positions.items():
+                postings = self.postings[facet]
+                for name, positions in names.items():
+                    postings[name] = postings.get(name, 0) | _bitmap(positions)
+            self.all = (1 << len(self.ids)) - 1
+
+    def _update(self, position, values):
+        # Move an indexed recipe to its new facet names (called with the lock held). The previous names are
+        # found by scanning the bitmaps rather than kept per recipe, since updates are rare and memory is not
+        bit = 1 << position
+        for facet, names in values.items():
+            postings = self.postings[facet]
+            for name, posting in list(postings.items()):
+                if posting & bit and name not in names:
+                    posting &= ~bit
+                    if posting:
+                        postings[name] = posting
+                    else:
+                        del postings[name]
+            for name in names:
+                postings[name] = postings.get(name, 0) | bit
+
+    def add_recipes(self, json_datas):
+        """
+        Index recipes as returned by the API. Used to keep the index up to date after each write.
+        """
+        self.add_many((recette_data.get('id'),
+                       {facet: [entry.get('name') for entry in recette_data.get(key) or []]
+                        for facet, key in FACETS.items()})
+                      for recette_data in json_datas or [])
+
+    def on_write(self, json_datas, node_rows):
+        # Write listener registered on the Database
+        self.add_recipes(json_datas)
+
+    def build(self, db, batch_size=1000):
+        """
+        Index every recipe of the database.
+        """
+        batch = []
+        for row in db.iter_recipe_facets():
+            batch.append((row['_id'], row))
+            if len(batch) >= batch_size:
+                self.add_many(batch)
+                batch = []
+        self.add_many(batch)
+        return self
+
+    def match(self, cuisine=None, tag=None, ingredients=(), match_all_ingredients=False):
+        """
+        Return the bitmap of the recipes matching the filters; empty filters are ignored.
+        """
+        with self.lock:
+            bitmap = self.all
+            if cuisine:
+                bitmap &= self.postings['cuisine'].get(cuisine, 0)
+            if tag:
+                bitmap &= self.postings['tag'].get(tag, 0)
+            if ingredients:
+                postings = self.postings['ingredient']
+                if match_all_ingredients:
+                    for name in ingredients:
+                        bitmap &= postings.get(name, 0)
+                else:
+                    any_of = 0
+                    for name in ingredients:
+                        any_of |= postings.get(name, 0)
+                    bitmap &= any_of
+            return bitmap
+
+    def counts(self, facet, bitmap=None):
+        """
+        Return, for each name of a facet, how many recipes of `bitmap` (all recipes by default) have it.
+        """
+        with self.lock:
+            if bitmap is None:
+                bitmap = self.all
+            return {name: bit_count(posting & bitmap) for name, posting in self.postings[facet].items()}
+
+    @staticmethod
+    def count(bitmap):
+        return bit_count(bitmap)
+
+    def recipe_ids(self, bitmap):
+        """
+        Return the _id of the recipes of a bitmap.
+        """
+        with self.lock:
+            ids = []
+            while bitmap:
+                lowest = bitmap & -bitmap
+                ids.append(self.ids[lowest.bit_length() - 1])
+                bitmap ^= lowest
+            return ids
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       fetcher.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.metrics import metrics
+
+# Status codes worth retrying: rate limiting and server side errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """
+    Raised when a page cannot be fetched, after all retries have been exhausted.
+    """
+
+    def __init__(self, status_code, text):
+        super().__init__(f"Error {status_code}: {text}")
+        self.status_code = status_code
+        self.text = text
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: allows `rate` requests per second on average, with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token, waiting as long as needed for it to be available.
+        """
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            metrics.observe('sleep_seconds', wait, reason='rate_limit')
+            time.sleep(wait)
+
+
+class PageFetcher:
+    """
+    The PageFetcher class fetches JSON pages from an HTTP API over a pooled requests.Session.
+    It keeps up to `concurrency` requests in flight, throttles them with a token bucket
+    and retries 429 and 5xx responses with a jittered exponential backoff.
+    """
+
+    def __init__(self, url, headers=None, concurrency=4, rate=2.0, burst=None,
+                 max_retries=5, backoff=0.5, max_backoff=30.0, timeout=30.0):
+        self.url = url
+        self.concurrency = max(1, int(concurrency))
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.retries = 0
+
+        # One session shared by every worker, with a connection pool sized for them
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update(headers or {})
+
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="fetcher")
+        # Calls scheduled by map() and not finished yet, cancelled by close()
+        self.scheduled = set()
+        self.scheduled_lock = threading.Lock()
+
+    def _delay(self, attempt, response=None):
+        # Honour the Retry-After header when the server gives one, otherwise use a full jitter backoff
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after is not None and retry_after.isdigit():
+                return min(self.max_backoff, float(retry_after))
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, params, headers=None):
+        """
+        Fetch a single page and return the response, which is either 200 OK or,
+        for a conditional request, 304 Not Modified.
+        """
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            try:
+                with metrics.timer('http_request_seconds'):
+                    response = self.session.get(self.url, params=params, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                metrics.inc('http_responses_total', status='error')
+                if attempt >= self.max_retries:
+                    raise FetchError(None, str(error))
+                response = None
+            else:
+                metrics.inc('http_responses_total', status=response.status_code)
+                if response.status_code == 200 or (response.status_code == 304 and headers):
+                    metrics.observe('http_retries', attempt, buckets=tuple(range(self.max_retries + 1)))
+                    return response
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    raise FetchError(response.status_code, response.text)
+
+            self.retries += 1
+            metrics.inc('http_retries_total')
+            delay = self._delay(attempt, response)
+            metrics.observe('sleep_seconds', delay, reason='backoff')
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, params):
+        """
+        Fetch a single page and return its decoded JSON content.
+        """
+        response = self.request(params)
+        with metrics.timer('json_decode_seconds'):
+            return response.json()
+
+    def map(self, function, iterable):
+        """
+        Apply `function` to every element of `iterable` on the worker threads and yield the results in order.
+        At most twice `concurrency` calls are scheduled ahead of the consumer.
+        """
+        window = deque()
+        for element in iterable:
+            future = self.executor.submit(function, element)
+            with self.scheduled_lock:
+                self.scheduled.add(future)
+            future.add_done_callback(self._finished)
+            window.append(future)
+            if len(window) >= 2 * self.concurrency:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+    def _finished(self, future):
+        with self.scheduled_lock:
+            self.scheduled.discard(future)
+
+    def close(self):
+        """
+        Cancel the pending calls and release the worker threads and the HTTP connections.
+        """
+        # Not shutdown(cancel_futures=True), which needs Python 3.9
+        with self.scheduled_lock:
+            pending = list(self.scheduled)
+        for future in pending:
+            future.cancel()
+        self.executor.shutdown(wait=True)
+        self.session.close()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       market_sync.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from utils.markets import market_settings
+from utils.recipe_downloader import RecipeDownloader
+
+
+class MarketSync:
+    """
+    The MarketSync class syncs every market of the settings at the same time, one RecipeDownloader per market
+    on its own thread. Each market has its own fetcher, hence its own rate limit, and all of them write to the
+    same graph. It has the interface of RecipeDownloader (download_recipes, cancel and the on_progress and
+    on_error hooks), the progress being summed over the markets.
+    """
+
+    def __init__(self, settings, test=False):
+        self.settings = settings
+
+        # The schema is created once, before the markets start
+        market_config = dict(settings, ensure_schema=False)
+        self.downloaders = [RecipeDownloader(market_config, test, market) for market in market_settings(settings)]
+        for downloader in self.downloaders:
+            downloader.on_progress = functools.partial(self.market_progress, downloader.locale)
+            downloader.on_error = functools.partial(self.market_error, downloader.locale)
+
+        # Same hooks as RecipeDownloader
+        self.on_progress = None
+        self.on_error = None
+
+        # locale -> (pages written, pages total, recipes written)
+        self.progress = {}
+        self.progress_lock = threading.Lock()
+
+        # Throughput of the last sync, per locale and in aggregate, see throughput()
+        self.results = {}
+        self.elapsed = 0.0
+
+    def market_progress(self, locale, pages_written, pages_total, recipes_written):
+        # Progress hook of a market's downloader, called from its threads
+        with self.progress_lock:
+            self.progress[locale] = (pages_written, pages_total, recipes_written)
+            totals = [sum(values) for values in zip(*self.progress.values())]
+        if self.on_progress is not None:
+            self.on_progress(*totals)
+
+    def market_error(self, locale, message):
+        # Error hook of a market's downloader, the other markets go on
+        message = f"[{locale}] {message}"
+        if self.on_error is not None:
+            self.on_error(message)
+        else:
+            print(message)
+
+    def cancel(self):
+        for downloader in self.downloaders:
+            downloader.cancel()
+
+    def sync_market(self, downloader, db):
+        # Run the sync of one market and return its duration
+        start = time.perf_counter()
+        downloader.download_recipes(db)
+        return time.perf_counter() - start
+
+    def download_recipes(self, db):
+        """
+        Sync every market in parallel, then print the throughput of each and of the whole sync.
+        """
+        self.progress = {}
+        self.results = {}
+        if self.settings.get('ensure_schema', True):
+            db.ensure_schema()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(self.downloaders)) as executor:
+            futures = {executor.submit(self.sync_market, downloader, db): downloader for downloader in self.downloaders}
+            for future in as_completed(futures):
+                downloader = futures[future]
+                try:
+                    elapsed = future.result()
+                except Exception as error:
+                    self.market_error(downloader.locale, f"Sync failed: {error}")
+                    continue
+                self.results[downloader.locale] = {'pages': downloader.pages_written,
+                                                   'recipes': downloader.recipes_written,
+                                                   'merges_avoided': downloader.seen.stats()['skipped']
+                                                   if downloader.seen is not None else 0,
+                                                   'seconds': round(elapsed, 2)}
+        self.elapsed = time.perf_counter() - start
+
+        for locale, result in self.throughput().items():
+            print(f"{locale:<8} {result['recipes']:8d} recipes in {result['seconds']:8.1f} s "
+                  f"({result['recipes_per_second']:.1f} recipes/s)")
+
+    def throughput(self):
+        """
+        Return the pages, recipes, shared node merges avoided, duration and recipes per second of each market
+        and of the whole sync ('total').
+        """
+        results = {locale: dict(result, recipes_per_second=round(result['recipes'] / max(result['seconds'], 1e-6), 1))
+                   for locale, result in self.results.items()}
+        recipes = sum(result['recipes'] for result in self.results.values())
+        results['total'] = {'pages': sum(result['pages'] for result in self.results.values()),
+                            'recipes': recipes,
+                            'merges_avoided': sum(result['merges_avoided'] for result in self.results.values()),
+                            'seconds': round(self.elapsed, 2),
+                            'recipes_per_second': round(recipes / max(self.elapsed, 1e-6), 1)}
+        return results
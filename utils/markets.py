@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       markets.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+
+# Market synced when the settings do not list any
+DEFAULT_MARKET = {'country': 'FR', 'locale': 'fr-FR'}
+
+# Entities of a recipe whose ids are specific to a market; the others (allergens) are shared by every market
+SCOPED_ENTITIES = ('cuisines', 'ingredients', 'tags')
+
+
+def market_settings(settings):
+    """
+    Return the markets to sync: a list of dictionaries with a `country` and a `locale`, and optionally
+    their own `base_url` and `rate_limit`.
+    """
+    return settings.get('markets') or [DEFAULT_MARKET]
+
+
+def scoped_id(identifier, locale):
+    # Prefix an id with the locale of its market
+    return None if identifier is None else f"{locale}:{identifier}"
+
+
+def scope_recipe(recette_data, locale):
+    """
+    Return a copy of a recipe whose recipe, cuisine, ingredient and tag ids are prefixed with the locale.
+    Step ids derive from the recipe id, so they are scoped as well.
+    """
+    scoped = dict(recette_data, id=scoped_id(recette_data.get('id'), locale))
+    for key in SCOPED_ENTITIES:
+        scoped[key] = [dict(entity, id=scoped_id(entity.get('id'), locale)) for entity in recette_data.get(key) or []]
+    scoped['steps'] = [dict(step, ingredients=[scoped_id(ingredient, locale)
+                                               for ingredient in step.get('ingredients') or []])
+                       for step in recette_data.get('steps') or []]
+    return scoped
+
+
+def scope_page(page, locale):
+    # Scope every recipe of a recipes/search page
+    return dict(page, items=[scope_recipe(recette_data, locale) for recette_data in page.get('items') or []])
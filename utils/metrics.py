@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       metrics.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+
+# Upper bounds of the latency histograms, in seconds
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Upper bounds of the throughput histograms, in recipes per second
+RATE_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000)
+
+
+class Histogram:
+    """
+    Counts of observed values per bucket, with their sum, as exported by Prometheus histograms.
+    """
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # The last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, fraction):
+        """
+        Return the upper bound of the bucket holding the given quantile, None if nothing was observed.
+        """
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+class Timer:
+    """
+    Context manager observing its duration in a histogram of the registry.
+    """
+
+    __slots__ = ('registry', 'name', 'labels', 'start')
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+class Metrics:
+    """
+    The Metrics class is a registry of counters and histograms, identified by a name and labels.
+    Recording takes a lock and a few additions, so it can stay enabled in production; with `enabled` set to False
+    nothing is recorded. The registry is exported in the Prometheus text format or as a JSON document.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+
+    @staticmethod
+    def _key(name, labels):
+        # Label values are kept as text, so that a label recorded with an int and a str still sorts on export
+        return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        """
+        Add `amount` to a counter.
+        """
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name, value, buckets=SECONDS_BUCKETS, **labels):
+        """
+        Record a value in a histogram, created with `buckets` on first use.
+        """
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def timer(self, name, **labels):
+        """
+        Return a context manager recording the duration of its block, in seconds, in the histogram `name`.
+        """
+        return Timer(self, name, labels)
+
+    def timed(self, name, **labels):
+        """
+        Decorator recording the duration of each call in the histogram `name`.
+        """
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with Timer(self, name, labels):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        with self.lock:
+            self.counters = {}
+            self.histograms = {}
+
+    def as_dict(self):
+        """
+        Return the counters and, for each histogram, its count, sum, mean and approximate p50/p95/p99.
+        """
+        def label_text(labels):
+            return ",".join(f"{name}={value}" for name, value in labels)
+
+        with self.lock:
+            counters = {f"{name}{{{label_text(labels)}}}" if labels else name: value
+                        for (name, labels), value in sorted(self.counters.items())}
+            histograms = {}
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                histograms[f"{name}{{{label_text(labels)}}}" if labels else name] = {
+                    'count': histogram.count,
+                    'sum': round(histogram.sum, 6),
+                    'mean': round(histogram.sum / histogram.count, 6) if histogram.count else None,
+                    'p50': histogram.quantile(0.5),
+                    'p95': histogram.quantile(0.95),
+                    'p99': histogram.quantile(0.99),
+                }
+        return {'time': time.time(), 'counters': counters, 'histograms': histograms}
+
+    def prometheus(self, prefix='hellofresh_'):
+        """
+        Return the registry in the Prometheus text exposition format.
+        """
+        def label_text(labels, extra=()):
+            pairs = [f'{name}="{str(value)}"' for name, value in list(labels) + list(extra)]
+            return "{" + ",".join(pairs) + "}" if pairs else ""
+
+        lines = []
+        with self.lock:
+            typed = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {prefix}{name} counter")
+                    typed.add(name)
+                lines.append(f"{prefix}{name}{label_text(labels)} {value}")
+            for (name, labels), histogram in sorted(self.histograms.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {prefix}{name} histogram")
+                    typed.add(name)
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ('+Inf',), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{prefix}{name}_bucket{label_text(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{prefix}{name}_sum{label_text(labels)} {histogram.sum}")
+                lines.append(f"{prefix}{name}_count{label_text(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """
+        Write the registry to a file, in the Prometheus text format if its extension is .prom, in JSON otherwise.
+        The file is replaced atomically, so that a collector never reads half of it.
+        """
+        content = self.prometheus() if path.endswith('.prom') else json.dumps(self.as_dict(), indent=1)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as file:
+            file.write(content)
+        os.replace(temporary, path)
+
+
+class MetricsFileWriter:
+    """
+    The MetricsFileWriter class writes a registry to a file every `interval` seconds on a daemon thread,
+    and once more when it is stopped.
+    """
+
+    def __init__(self, registry, path, interval=15):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="metrics-writer", daemon=True)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.write()
+
+    def write(self):
+        try:
+            self.registry.write(self.path)
+        except (OSError, TypeError, ValueError) as error:
+            print(f"Cannot write the metrics to {self.path}: {error}")
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.write()
+
+
+# Registry shared by the application
+metrics = Metrics()
+
+
+def start_metrics_file(settings):
+    """
+    Configure the shared registry from the settings and start writing it to `metrics_file`, if set.
+    Return the writer, or None.
+    """
+    metrics.enabled = settings.get('metrics', True)
+    path = settings.get('metrics_file')
+    if not path or not metrics.enabled:
+        return None
+    return MetricsFileWriter(metrics, path, settings.get('metrics_interval', 15)).start()
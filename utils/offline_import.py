@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       offline_import.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.cache import read_blob
+from utils.database import NODE_LABELS, RELATIONSHIP_TYPES, build_rows
+from utils.markets import scope_page
+
+# Separator of the values of list properties inside a CSV cell
+ARRAY_DELIMITER = ';'
+
+# Type annotation of a column in the neo4j-admin headers, and the LOAD CSV conversion of its cells
+ADMIN_TYPES = {'string': '', 'int': ':int', 'float': ':float', 'boolean': ':boolean', 'string[]': ':string[]'}
+LOAD_CSV_CONVERSIONS = {
+    'string': "{}",
+    'int': "toInteger({})",
+    'float': "toFloat({})",
+    'boolean': "toBoolean({})",
+    'string[]': f"split({{}}, '{ARRAY_DELIMITER}')",
+}
+
+
+def normalise_pages(pages):
+    # Runs in a worker process: read cached pages, scoped to their market if they have a locale, and turn their
+    # recipes into deduplicated node and relationship rows, so that the shared ingredients, tags... are only sent
+    # back to the parent once per chunk
+    recipes = []
+    for path, locale in pages:
+        page = read_blob(path)
+        if locale:
+            page = scope_page(page, locale)
+        recipes.extend(page.get('items') or [])
+    return len(pages), build_rows(recipes)
+
+
+def column_type(values):
+    """
+    Return the type of a property from its values: a list, a boolean, a number or a string.
+    """
+    values = [value for value in values if value is not None]
+    if any(isinstance(value, (list, tuple)) for value in values):
+        return 'string[]'
+    if values and all(isinstance(value, bool) for value in values):
+        return 'boolean'
+    if values and all(isinstance(value, int) and not isinstance(value, bool) for value in values):
+        return 'int'
+    if values and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in values):
+        return 'float'
+    return 'string'
+
+
+def csv_value(value):
+    # Format a property value as a CSV cell, an empty cell stands for a missing property
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return ARRAY_DELIMITER.join(str(item) for item in value)
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return value
+
+
+class OfflineImport:
+    """
+    The OfflineImport class rebuilds the graph from the cached recipe pages without calling the API.
+    The pages are normalised in parallel worker processes into deduplicated node and relationship rows,
+    written as headerless CSV files with separate header files, and loaded either by `neo4j-admin database import`
+    (into an empty, stopped database) or by LOAD CSV statements committing every `batch_size` rows.
+    """
+
+    def __init__(self, output_dir='datas/import', processes=None):
+        self.output_dir = output_dir
+        self.processes = processes or os.cpu_count()
+
+        # label -> {_id: properties} and label -> {(source _id, recipe _id)}
+        self.nodes = {label: {} for label in NODE_LABELS}
+        self.relationships = {label: set() for label in RELATIONSHIP_TYPES}
+
+        # label or relationship type -> (header file, data file), filled by write()
+        self.files = {}
+        # label -> [(property, type)], filled by write()
+        self.columns = {}
+
+        self.pages = 0
+        self.duplicates = 0
+
+    def normalise(self, paths, chunk_pages=50, locale=None):
+        """
+        Normalise the pages stored at `paths` (cache blobs or plain JSON files), `chunk_pages` pages per task,
+        and merge their rows, the last copy of a node winning. Duplicates are only counted across chunks.
+        An item of `paths` can also be a (path, locale) pair: as in a sync with `markets` set, the ids of the page
+        are then prefixed with the locale. Plain paths and pairs without a locale are scoped with `locale`, if given.
+        """
+        pages = [(path, locale) if isinstance(path, str) else (path[0], path[1] or locale) for path in paths]
+        chunks = [pages[i:i + chunk_pages] for i in range(0, len(pages), chunk_pages)]
+        with ProcessPoolExecutor(max_workers=self.processes) as executor:
+            for pages, (node_rows, relationship_rows) in executor.map(normalise_pages, chunks):
+                self.pages += pages
+                for label, rows in node_rows.items():
+                    nodes = self.nodes[label]
+                    size = len(nodes)
+                    nodes.update((row['_id'], row) for row in rows)
+                    self.duplicates += len(rows) - (len(nodes) - size)
+                for label, rows in relationship_rows.items():
+                    self.relationships[label].update((row['src'], row['dst']) for row in rows)
+        return self
+
+    def write(self):
+        """
+        Write one header file and one data file per node label and per relationship type.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        for label, nodes in self.nodes.items():
+            names = ['_id']
+            for properties in nodes.values():
+                names.extend(name for name in properties if name not in names)
+            columns = [(name, column_type(properties.get(name) for properties in nodes.values()))
+                       for name in names]
+            self.columns[label] = columns
+
+            header = [f"_id:ID({label})"] + [name + ADMIN_TYPES[kind] for name, kind in columns[1:]]
+            rows = ([csv_value(properties.get(name)) for name, _ in columns] for properties in nodes.values())
+            self.files[label] = self._write_csv(label.lower(), header, rows)
+
+        for label, pairs in self.relationships.items():
+            rel_type = RELATIONSHIP_TYPES[label]
+            header = [f":START_ID({label})", ":END_ID(Recette)"]
+            self.files[rel_type] = self._write_csv(rel_type.lower(), header, sorted(pairs))
+        return self.files
+
+    def _write_csv(self, name, header, rows):
+        header_path = os.path.join(self.output_dir, f"{name}_header.csv")
+        data_path = os.path.join(self.output_dir, f"{name}.csv")
+        with open(header_path, 'w', newline='', encoding='utf-8') as file:
+            csv.writer(file).writerow(header)
+        with open(data_path, 'w', newline='', encoding='utf-8') as file:
+            csv.writer(file).writerows(rows)
+        return header_path, data_path
+
+    def admin_command(self, database='neo4j', executable='neo4j-admin'):
+        """
+        Return the neo4j-admin command importing the written files. The database must be stopped,
+        and its current content is replaced.
+        """
+        command = [executable, 'database', 'import', 'full', '--overwrite-destination=true',
+                   '--multiline-fields=true', f'--array-delimiter={ARRAY_DELIMITER}']
+        for label in NODE_LABELS:
+            command.append(f"--nodes={label}={','.join(self.files[label])}")
+        for rel_type in RELATIONSHIP_TYPES.values():
+            command.append(f"--relationships={rel_type}={','.join(self.files[rel_type])}")
+        command.append(database)
+        return command
+
+    def load_csv_statements(self, url_prefix='file:///', batch_size=10000):
+        """
+        Return the LOAD CSV statements merging the written files, nodes first, with the file URL of each.
+        `url_prefix` is where the Neo4j server sees the output directory, usually its import directory.
+        """
+        statements = []
+        for label in NODE_LABELS:
+            assignments = ", ".join(f"n.{name} = " + LOAD_CSV_CONVERSIONS[kind].format(f"row[{i}]")
+                                    for i, (name, kind) in enumerate(self.columns[label]) if i > 0)
+            statements.append((f"LOAD CSV FROM $url AS row CALL {{ WITH row "
+                               f"MERGE (n:{label} {{_id: row[0]}})" + (f" SET {assignments}" if assignments else "") +
+                               f" }} IN TRANSACTIONS OF {batch_size} ROWS",
+                               url_prefix + os.path.basename(self.files[label][1])))
+        for label, rel_type in RELATIONSHIP_TYPES.items():
+            statements.append((f"LOAD CSV FROM $url AS row CALL {{ WITH row "
+                               f"MATCH (a:{label} {{_id: row[0]}}) MATCH (r:Recette {{_id: row[1]}}) "
+                               f"MERGE (a)-[:{rel_type}]->(r) }} IN TRANSACTIONS OF {batch_size} ROWS",
+                               url_prefix + os.path.basename(self.files[rel_type][1])))
+        return statements
+
+    def load_csv(self, graph, url_prefix='file:///', batch_size=10000):
+        """
+        Merge the written files into a running database with LOAD CSV. Each statement runs in its own
+        auto-commit transaction, as CALL ... IN TRANSACTIONS requires.
+        """
+        for statement, url in self.load_csv_statements(url_prefix, batch_size):
+            graph.run(statement, url=url)
+
+    def stats(self):
+        """
+        Return the number of pages read, of distinct nodes and relationships, and of duplicate nodes dropped.
+        """
+        return {'pages': self.pages,
+                'nodes': {label: len(nodes) for label, nodes in self.nodes.items()},
+                'relationships': {RELATIONSHIP_TYPES[label]: len(pairs) for label, pairs in self.relationships.items()},
+                'duplicates': self.duplicates}
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       pipeline.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+
+import queue
+import threading
+import time
+
+# Marker pushed into the queue once every page has been fetched
+_DONE = object()
+
+
+class StageStats:
+    """
+    Counters for one stage of the pipeline: items, recipes and the time spent working on them.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.pages = 0
+        self.recipes = 0
+        self.busy = 0.0
+        self.lock = threading.Lock()
+
+    def add(self, pages, recipes, elapsed):
+        with self.lock:
+            self.pages += pages
+            self.recipes += recipes
+            self.busy += elapsed
+
+    def as_dict(self, wall):
+        return {
+            'pages': self.pages,
+            'recipes': self.recipes,
+            'busy_seconds': round(self.busy, 3),
+            'recipes_per_second': round(self.recipes / wall, 1) if wall else 0.0,
+            'utilisation': round(self.busy / wall, 3) if wall else 0.0,
+        }
+
+
+class PipelineStats:
+    """
+    Throughput of the fetch and write stages and depth of the queue between them.
+    A queue that stays full means the writers are the bottleneck, an empty one means the fetchers are.
+    """
+
+    def __init__(self, queue_size):
+        self.fetch = StageStats('fetch')
+        self.write = StageStats('write')
+        self.queue_size = queue_size
+        self.depth_samples = 0
+        self.depth_total = 0
+        self.depth_max = 0
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def sample_depth(self, depth):
+        self.depth_samples += 1
+        self.depth_total += depth
+        self.depth_max = max(self.depth_max, depth)
+
+    @property
+    def wall(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def as_dict(self):
+        wall = self.wall
+        return {
+            'wall_seconds': round(wall, 3),
+            'fetch': self.fetch.as_dict(wall),
+            'write': self.write.as_dict(wall),
+            'queue': {
+                'size': self.queue_size,
+                'max_depth': self.depth_max,
+                'mean_depth': round(self.depth_total / self.depth_samples, 2) if self.depth_samples else 0.0,
+            },
+        }
+
+    def __str__(self):
+        stats = self.as_dict()
+        return f"fetch {stats['fetch']['recipes_per_second']} recipes/s " \
+               f"(busy {stats['fetch']['utilisation']:.0%}), " \
+               f"write {stats['write']['recipes_per_second']} recipes/s " \
+               f"(busy {stats['write']['utilisation']:.0%}), " \
+               f"queue {stats['queue']['mean_depth']}/{self.queue_size} (max {self.depth_max})"
+
+
+class SyncPipeline:
+    """
+    The SyncPipeline class overlaps HTTP fetches with database writes.
+    A producer thread pushes fetched pages into a bounded queue and writer threads drain it,
+    `batch_pages` pages at a time. When the writers fall behind the queue fills up and the producer blocks,
+    which keeps memory bounded.
+    """
+
+    def __init__(self, pages, write, writers=1, queue_size=8, batch_pages=1, on_write=None):
+        """
+        `pages` is an iterable of fetched pages (it is consumed on the producer thread),
+        `write` is called with a list of recipes and `on_write` with each written batch of pages.
+        """
+        self.pages = pages
+        self.write = write
+        self.writers = max(1, int(writers))
+        self.batch_pages = max(1, int(batch_pages))
+        self.on_write = on_write
+        self.queue = queue.Queue(maxsize=max(1, int(queue_size)))
+        self.stats = PipelineStats(self.queue.maxsize)
+        self.stop = threading.Event()
+        self.errors = []
+
+    def _put(self, item):
+        # Block while the queue is full, but give up if the pipeline is being stopped
+        while not self.stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self):
+        try:
+            iterator = iter(self.pages)
+            while not self.stop.is_set():
+                start = time.perf_counter()
+                try:
+                    page = next(iterator)
+                except StopIteration:
+                    break
+                self.stats.fetch.add(1, len(page['items']), time.perf_counter() - start)
+                if not self._put(page):
+                    break
+        except Exception as error:
+            # The pages already fetched are still written before the error is reported
+            self.errors.append(error)
+        finally:
+            # One end marker per writer, so that each of them exits
+            for _ in range(self.writers):
+                self._put(_DONE)
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        recipes = [item for page in batch for item in page['items']]
+        self.write(recipes)
+        self.stats.write.add(len(batch), len(recipes), time.perf_counter() - start)
+        if self.on_write is not None:
+            self.on_write(batch)
+
+    def _consume(self):
+        batch = []
+        try:
+            while True:
+                self.stats.sample_depth(self.queue.qsize())
+                try:
+                    page = self.queue.get(timeout=0.1)
+                except queue.Empty:
+                    if self.stop.is_set():
+                        break
+                    continue
+                if page is _DONE:
+                    break
+                batch.append(page)
+                if len(batch) >= self.batch_pages:
+                    self._flush(batch)
+                    batch = []
+            # Write what is left, unless the pipeline was stopped
+            if batch and not self.stop.is_set():
+                self._flush(batch)
+        except Exception as error:
+            self.errors.append(error)
+            self.stop.set()
+
+    def run(self):
+        """
+        Run the pipeline until every page is written and return its statistics.
+        The first error raised by a stage is re-raised once all threads are stopped.
+        """
+        threads = [threading.Thread(target=self._produce, name="sync-fetch", daemon=True)]
+        threads += [threading.Thread(target=self._consume, name=f"sync-write-{i}", daemon=True)
+                    for i in range(self.writers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stats.finished = time.perf_counter()
+
+        if self.errors:
+            raise self.errors[0]
+        return self.stats
+
+    def cancel(self):
+        """
+        Ask every stage to stop as soon as possible.
+        """
+        self.stop.set()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       pool.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+
+import threading
+import time
+from contextlib import contextmanager
+
+from utils.metrics import metrics
+
+
+class PoolTimeout(Exception):
+    """
+    Raised when no database connection becomes available within the acquire timeout.
+    """
+
+
+class ConnectionPool:
+    """
+    The ConnectionPool class bounds the concurrent use of a shared py2neo Graph to the size of its Bolt
+    connection pool, and keeps statistics about it: active and idle connections and the time spent waiting
+    for a free one.
+    """
+
+    def __init__(self, graph, max_size=10, acquire_timeout=60):
+        self.graph = graph
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.semaphore = threading.BoundedSemaphore(max_size)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.acquisitions = 0
+        self.waits = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @contextmanager
+    def connection(self):
+        """
+        Hold one of the pool slots for the duration of the block.
+        """
+        start = time.perf_counter()
+        if not self.semaphore.acquire(timeout=self.acquire_timeout):
+            raise PoolTimeout(f"No database connection available after {self.acquire_timeout} s")
+        waited = time.perf_counter() - start
+        metrics.observe('pool_wait_seconds', waited)
+
+        with self.lock:
+            self.active += 1
+            self.acquisitions += 1
+            if waited > 0.001:
+                self.waits += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+        try:
+            yield self.graph
+        finally:
+            with self.lock:
+                self.active -= 1
+            self.semaphore.release()
+
+    def _opened(self):
+        # Number of Bolt connections currently opened by py2neo, if its connector exposes it
+        try:
+            pools = self.graph.service.connector._pools
+            return sum(pool.size for pool in pools.values())
+        except AttributeError:
+            return None
+
+    def stats(self):
+        """
+        Return the pool statistics.
+        """
+        opened = self._opened()
+        with self.lock:
+            return {
+                'max_size': self.max_size,
+                'active': self.active,
+                'idle': max(0, opened - self.active) if opened is not None else self.max_size - self.active,
+                'opened': opened,
+                'acquisitions': self.acquisitions,
+                'waits': self.waits,
+                'wait_time_total': round(self.wait_total, 4),
+                'wait_time_max': round(self.wait_max, 4),
+                'wait_time_mean': round(self.wait_total / self.acquisitions, 6) if self.acquisitions else 0.0,
+            }
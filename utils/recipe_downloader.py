@@ -9,12 +9,19 @@
 # All rights reserved. 
 #
 
-import requests
+import sys
+import threading
 import time
-import os
-import json
+from itertools import chain
 
-from PyQt5.QtWidgets import QMessageBox
+from utils.cache import ResponseCache
+from utils.checkpoints import SyncCheckpoints
+from utils.entity_cache import SeenEntities
+from utils.fetcher import PageFetcher, FetchError
+from utils.markets import market_settings, scope_page
+from utils.metrics import metrics, RATE_BUCKETS
+from utils.pipeline import SyncPipeline
+from utils.sync_state import SyncState
 
 
 class RecipeDownloader:
@@ -23,16 +30,160 @@ class RecipeDownloader:
     from the HelloFresh API and storing them in a Neo4j database.
     """
 
-    def __init__(self, settings, test=False):
+    def __init__(self, settings, test=False, market=None):
         """
         Initialize RecipeDownloader with provided settings and a flag for test mode.
+        `market` is one of the markets of the settings, the first one by default.
         """
         self.settings = settings
         self.test = test
 
+        # Market synced. Once `markets` is set in the settings, node ids are prefixed with the locale
+        # so that the markets written to the same graph do not collide
+        self.market = market or market_settings(settings)[0]
+        self.country = self.market['country']
+        self.locale = self.market['locale']
+        self.scoped = bool(settings.get('markets'))
+
+        # Bulk ingest writes a batch of pages with a few UNWIND statements instead of one merge per entity
+        self.bulk = settings.get('bulk_ingest', True)
+        self.batch_pages = max(1, int(settings.get('batch_pages', 1)))
+
+        # Fetch engine configuration
+        self.url = self.market.get('base_url',
+                                   settings.get('base_url', "https://www.hellofresh.fr/gw/recipes/recipes/search"))
+        self.concurrency = settings.get('concurrency', 4)
+        self.rate_limit = self.market.get('rate_limit', settings.get('rate_limit', 2.0))
+        self.max_retries = settings.get('max_retries', 5)
+
+        # Compressed response cache, keyed by the full request parameters
+        self.cache = ResponseCache(settings.get('cache_dir', 'datas/cache'),
+                                   ttl=settings.get('cache_ttl', 60 * 60),
+                                   max_bytes=settings.get('cache_max_mb', 512) * 1024 * 1024,
+                                   compression=settings.get('cache_compression')) \
+            if settings.get('cache', True) else None
+
+        # Pipelined sync: fetchers and database writers run at the same time, linked by a bounded queue
+        self.pipeline = settings.get('pipeline', True)
+        self.writers = settings.get('writers', 1)
+        self.queue_size = settings.get('queue_size', 8)
+
+        # Statistics of the last pipelined sync
+        self.stats = None
+
+        # Incremental sync: only write the recipes whose fingerprint changed since the last sync.
+        # With `sort` set to an API ordering by last update, paging stops after `stop_after_unchanged` quiet pages
+        self.incremental = settings.get('incremental', True)
+        self.sort = settings.get('sort')
+        self.stop_after_unchanged = settings.get('stop_after_unchanged', 1) if self.sort else 0
+        self.state = SyncState(settings.get('state_path', 'datas/sync_state.sqlite')) if self.incremental else None
+
+        # Resumable sync: the pages committed by each run are checkpointed, an interrupted run is resumed
+        # by the next sync with the same parameters unless it is older than `resume_max_age` seconds
+        self.checkpoints = SyncCheckpoints(settings.get('state_path', 'datas/sync_state.sqlite'),
+                                           max_age=settings.get('resume_max_age', 24 * 60 * 60)) \
+            if settings.get('resume', True) else None
+
+        # Shared nodes (allergens, cuisines, ingredients, tags) merged by the running sync, whose MERGE is skipped
+        # when they show up again unchanged on the next pages. A new cache is made for each sync
+        self.entity_cache_size = settings.get('entity_cache_size', 100000) if settings.get('entity_cache', True) else 0
+        self.seen = None
+
+        # Recipe similarity index, updated by the writes of the sync and saved at its end
+        self.similarity = settings.get('similarity', True)
+
+        # Hooks for a caller running the sync in the background:
+        # on_progress(pages_written, pages_total, recipes_written) and on_error(message)
+        self.on_progress = None
+        self.on_error = None
+        self.cancelled = threading.Event()
+        self.progress_lock = threading.Lock()
+        self.pages_total = 0
+        self.pages_written = 0
+        self.recipes_written = 0
+        self._pipeline = None
+
+    def cancel(self):
+        """
+        Stop the running sync as soon as possible. Pages already written stay in the database.
+        """
+        self.cancelled.set()
+        if self._pipeline is not None:
+            self._pipeline.cancel()
+
+    def report_progress(self, pages, recipes):
+        """
+        Count pages and recipes written to the database and notify the on_progress hook.
+        """
+        with self.progress_lock:
+            self.pages_written += pages
+            self.recipes_written += recipes
+            progress = (self.pages_written, self.pages_total, self.recipes_written)
+        if self.on_progress is not None:
+            self.on_progress(*progress)
+
+    def report_error(self, message):
+        """
+        Report a sync error through the on_error hook, or on the standard error by default.
+        The windows and the command line set the hook, so that this module does not depend on Qt.
+        """
+        if self.on_error is not None:
+            self.on_error(message)
+        else:
+            print(f"Error: {message}", file=sys.stderr)
+
+    def create_fetcher(self):
+        """
+        Create the page fetcher used to talk to the API.
+        """
+        return PageFetcher(self.url,
+                           headers={'Authorization': f"Bearer {self.settings['bearer']}"},
+                           concurrency=self.concurrency,
+                           rate=self.rate_limit,
+                           max_retries=self.max_retries)
+
+    def load_page(self, fetcher, skip, take):
+        """
+        Return one page of recipes, from the cache if it is fresh enough, otherwise from the API.
+        A stale cached page is revalidated with a conditional request.
+        """
+        # Pagination parameters; all of them are part of the cache key
+        params = {'take': take, 'skip': skip, 'country': self.country, 'locale': self.locale}
+        if self.sort:
+            params['sort'] = self.sort
+
+        if self.cache is None:
+            return fetcher.get(params)
+
+        with metrics.timer('cache_seconds', operation='lookup'):
+            entry = self.cache.lookup(fetcher.url, params)
+        if entry is not None and entry.fresh:
+            print(f"Using cached data for page {skip // take}...")
+            metrics.inc('cache_pages_total', result='fresh')
+            return entry.data
+
+        # Make the GET request, conditional if a stale copy is available
+        response = fetcher.request(params, self.cache.validators(entry))
+        if response.status_code == 304:
+            print(f"Cached data for page {skip // take} is still valid...")
+            self.cache.revalidated(entry)
+            metrics.inc('cache_pages_total', result='revalidated')
+            return entry.data
+
+        # Transform the response to JSON and save it to the cache
+        metrics.inc('cache_pages_total', result='miss')
+        with metrics.timer('json_decode_seconds'):
+            data = response.json()
+        with metrics.timer('cache_seconds', operation='store'):
+            self.cache.store(fetcher.url, params, data,
+                             etag=response.headers.get('ETag'),
+                             last_modified=response.headers.get('Last-Modified'))
+        return data
+
     def download_recipes(self, db):
         """
         Download recipes from the HelloFresh API and add them to the Neo4j database.
+        The first page gives the total, then the remaining pages are fetched concurrently.
         """
         # Variable initialization
         if self.test:
@@ -42,60 +193,168 @@ class RecipeDownloader:
             take = 100
             total = None
 
-        skip = 0
-
-        # Base URL
-        url = "https://www.hellofresh.fr/gw/recipes/recipes/search"
+        # Recipes waiting to be written in the next bulk batch, and the offsets of their pages
+        pending = []
+        pending_skips = []
 
-        # Loop as long as all recipes have not been fetched
-        while total is None or skip < total:
+        self.cancelled.clear()
+        self.pages_written = 0
+        self.recipes_written = 0
+        self.seen = SeenEntities(self.entity_cache_size) if self.entity_cache_size else None
 
-            # Define the path of the cache file
-            cache_path = f'datas/{skip // take}.json'
-
-            # Check if the cache file exists and is less than 60 minutes old
-            if os.path.exists(cache_path) and time.time() - os.path.getmtime(cache_path) < 60 * 60:
-                print(f"Using cached data for page {skip // take}...")
-                with open(cache_path, 'r') as file:
-                    data = json.load(file)
+        def write(json_datas):
+            # Write the recipes, then remember their fingerprints once they are safely stored
+            start = time.perf_counter()
+            if self.bulk:
+                db.put_recipes_bulk(json_datas, seen=self.seen)
             else:
-                # Build the URL with pagination parameters
-                url = f"{url}?take={take}&skip={skip}&country=FR&locale=fr-FR"
+                db.put_recipes(json_datas, seen=self.seen)
+            if self.state is not None:
+                self.state.commit(json_datas)
+            seconds = time.perf_counter() - start
+            metrics.observe('write_seconds', seconds)
+            metrics.inc('recipes_written_total', len(json_datas))
+            if json_datas and seconds > 0:
+                metrics.observe('write_recipes_per_second', len(json_datas) / seconds, buckets=RATE_BUCKETS)
+
+        if self.state is not None:
+            self.state.reset_counts()
 
-                # Set headers with the Bearer Token
-                headers = {
-                    'Authorization': f"Bearer {self.settings['bearer']}"
-                }
+        # Parameters identifying the run in the checkpoints
+        run = {'url': self.url, 'country': self.country, 'locale': self.locale, 'sort': self.sort, 'take': take}
+        resumed = self.checkpoints.resume(run) if self.checkpoints is not None else None
 
-                # Make the GET request
-                response = requests.get(url, headers=headers)
+        def checkpoint(skips):
+            # The pages are written, a resumed run will not fetch them again
+            if self.checkpoints is not None:
+                self.checkpoints.commit(run, skips)
 
-                # Ensure the request was successful
-                if response.status_code != 200:
-                    QMessageBox.critical(None, "Error", f"Error {response.status_code}: {response.text}")
-                    return
+        def load(offset):
+            # Keep the offset of each page, it identifies the page in the checkpoints
+            with metrics.timer('page_seconds'):
+                page = self.load_page(fetcher, offset, take)
+            metrics.inc('pages_loaded_total')
+            return dict(page, skip=offset)
 
-                # Transform the response to JSON
-                data = response.json()
+        # Without their constraints, every merge would scan all the nodes of its label
+        if self.settings.get('ensure_schema', True):
+            db.ensure_schema()
 
-                # Save the data to the cache
-                with open(cache_path, 'w') as file:
-                    json.dump(data, file)
+        # Read the saved similarity index now, so that the written recipes update it
+        if self.similarity:
+            db.get_similarity_index(build=False)
 
-            # Update the total if not already done
-            if self.test:
-                total = 2
+        fetcher = self.create_fetcher()
+        try:
+            if resumed is not None:
+                # Only fetch the pages the interrupted run had not written
+                total, committed = resumed
+                offsets = [offset for offset in range(0, total, take) if offset not in committed]
+                print(f"Resuming the interrupted sync: {len(committed)} pages already written, {len(offsets)} left")
+                self.pages_total = -(-total // take)
+                self.pages_written = len(committed)
+                pages = fetcher.map(load, offsets)
             else:
+                # The first page tells how many recipes there are
+                first = load(0)
                 if total is None:
-                    total = data['total']
+                    total = first['total']
+                self.pages_total = -(-total // take)
+                if self.checkpoints is not None:
+                    self.checkpoints.start(run, total, take)
 
-            # Add recipes to the database
-            db.put_recipes(data['items'])
+                # Every remaining offset is known at once and can be scheduled on the fetcher
+                remaining = fetcher.map(load, range(take, total, take))
+                pages = chain([first], remaining)
 
-            print(f"Downloaded {skip} recipes out of {total}...")
+            if self.scoped:
+                pages = (scope_page(page, self.locale) for page in pages)
+
+            # Drop the recipes that did not change since the last sync
+            if self.state is not None:
+                pages = self.state.filter_pages(pages, self.stop_after_unchanged)
+
+            if self.pipeline:
+                self.run_pipeline(write, pages, total, checkpoint)
+            else:
+                for data in pages:
+                    if self.cancelled.is_set():
+                        print("Sync cancelled")
+                        break
+
+                    # Add recipes to the database, either right away or once a full batch of pages is ready
+                    pending.extend(data['items'])
+                    pending_skips.append(data['skip'])
+                    if not self.bulk or len(pending_skips) >= self.batch_pages:
+                        write(pending)
+                        checkpoint(pending_skips)
+                        self.report_progress(len(pending_skips), len(pending))
+                        pending = []
+                        pending_skips = []
+
+                    print(f"Downloaded {data['skip']} recipes out of {total}...")
+
+                if pending_skips:
+                    write(pending)
+                    checkpoint(pending_skips)
+                    self.report_progress(len(pending_skips), len(pending))
+                    pending_skips = []
+
+            # Every page is written: the next sync starts from the first page again
+            if self.checkpoints is not None and not self.cancelled.is_set():
+                self.checkpoints.finish(run)
+
+            # Build the similarity index if there is none yet
+            if self.similarity and not self.cancelled.is_set():
+                db.get_similarity_index()
+        except FetchError as error:
+            self.report_error(str(error))
+            # Do not lose the pages already downloaded in the current batch
+            if pending_skips:
+                write(pending)
+                checkpoint(pending_skips)
+                self.report_progress(len(pending_skips), len(pending))
+        finally:
+            fetcher.close()
+            # Even after an error: the incremental sync will not write the recipes written so far again
+            if self.similarity:
+                db.save_similarity_index()
+            if self.cache is not None:
+                print(f"Response cache: {self.cache.stats()}")
+            if self.seen is not None:
+                entities = self.seen.stats()
+                print(f"Entity cache: {entities['skipped']} redundant merges avoided, {entities['written']} made "
+                      f"({entities['skipped_by_label']})")
+            if self.state is not None:
+                counts = self.state.counts
+                print(f"Incremental sync: {counts['new']} new, {counts['changed']} changed, "
+                      f"{counts['unchanged']} unchanged recipes")
+
+    def run_pipeline(self, write, pages, total, checkpoint):
+        """
+        Write the pages to the database on writer threads while the next ones are still being fetched.
+        `checkpoint` is called with the offsets of each written batch of pages.
+        """
+        def progress(batch):
+            checkpoint([page['skip'] for page in batch])
+            self.report_progress(len(batch), sum(len(page['items']) for page in batch))
+            print(f"Downloaded {self.stats.write.recipes} recipes out of {total}... "
+                  f"(queue depth {pipeline.queue.qsize()}/{self.queue_size})")
 
-            # Update the skip counter for the next request
-            skip += take
+        pipeline = SyncPipeline(pages,
+                                write,
+                                writers=self.writers,
+                                queue_size=self.queue_size,
+                                batch_pages=self.batch_pages if self.bulk else 1,
+                                on_write=progress)
+        self.stats = pipeline.stats
+        self._pipeline = pipeline
+        try:
+            # A cancel() that came in before the pipeline existed still applies
+            if self.cancelled.is_set():
+                pipeline.cancel()
+            pipeline.run()
+        finally:
+            self._pipeline = None
+            print(f"Sync statistics: {self.stats}")
 
-            # Wait a bit before the next request to not overload the server
-            time.sleep(1)
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       schema.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+
+# Uniqueness constraints on the merge key of every label written by the ingest
+CONSTRAINTS = {
+    f"{label.lower()}_id": f"CREATE CONSTRAINT {label.lower()}_id IF NOT EXISTS "
+                           f"FOR (n:{label}) REQUIRE n._id IS UNIQUE"
+    for label in ("Recette", "Ingredient", "Allergene", "Cuisine", "Tag", "Step")
+}
+
+# Indexes on the properties used by the search filters and the facet lists
+INDEXES = {
+    f"{label.lower()}_name": f"CREATE INDEX {label.lower()}_name IF NOT EXISTS FOR (n:{label}) ON (n.name)"
+    for label in ("Recette", "Ingredient", "Allergene", "Cuisine", "Tag")
+}
+
+# Full-text index behind the "Recipe name" search box
+FULLTEXT_INDEXES = {
+    "recette_text": "CREATE FULLTEXT INDEX recette_text IF NOT EXISTS "
+                    "FOR (n:Recette) ON EACH [n.name, n.headline, n.description]",
+}
+
+# Indexes replaced by a newer definition, dropped by ensure()
+OBSOLETE_INDEXES = ("recette_fulltext",)
+
+
+class SchemaManager:
+    """
+    The SchemaManager class creates the constraints and indexes the application relies on.
+    Every statement is idempotent, so ensure() can be called at each startup.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def ensure(self, wait=False):
+        """
+        Create the missing constraints and indexes. With `wait`, block until they are all online.
+        """
+        for name in OBSOLETE_INDEXES:
+            self.graph.run(f"DROP INDEX {name} IF EXISTS")
+        for statements in (CONSTRAINTS, INDEXES, FULLTEXT_INDEXES):
+            for statement in statements.values():
+                self.graph.run(statement)
+        if wait:
+            self.graph.run("CALL db.awaitIndexes(300)")
+
+    def drop(self):
+        """
+        Drop the constraints and indexes created by ensure(), to measure their effect in the benchmarks.
+        """
+        for name in CONSTRAINTS:
+            self.graph.run(f"DROP CONSTRAINT {name} IF EXISTS")
+        for name in list(INDEXES) + list(FULLTEXT_INDEXES):
+            self.graph.run(f"DROP INDEX {name} IF EXISTS")
+
+    def status(self):
+        """
+        Return the state of every expected schema object: ONLINE, POPULATING, FAILED or MISSING.
+        Constraints are reported through the state of their backing index.
+        """
+        indexes = {row['name']: row for row in
+                   self.graph.run("SHOW INDEXES YIELD name, state, populationPercent, owningConstraint").data()}
+        constraints = {row['name'] for row in self.graph.run("SHOW CONSTRAINTS YIELD name").data()}
+
+        status = {}
+        for name in CONSTRAINTS:
+            backing = next((row for row in indexes.values() if row['owningConstraint'] == name), None)
+            if name not in constraints:
+                status[name] = 'MISSING'
+            else:
+                status[name] = backing['state'] if backing is not None else 'ONLINE'
+        for name in list(INDEXES) + list(FULLTEXT_INDEXES):
+            row = indexes.get(name)
+            if row is None:
+                status[name] = 'MISSING'
+            elif row['state'] == 'POPULATING':
+                status[name] = f"POPULATING ({row['populationPercent']:.0f}%)"
+            else:
+                status[name] = row['state']
+        return status
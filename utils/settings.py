@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       settings.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+
+import os
+import yaml
+
+SETTINGS_PATH = 'settings.yaml'
+
+# Neo4j connection used when settings.yaml has no `neo4j` section
+NEO4J_DEFAULTS = {
+    'uri': "bolt://localhost:7687",
+    'user': "neo4j",
+    'password': "123456789",
+    'max_connections': 10,
+    'acquire_timeout': 60,
+    'max_age': 3600,
+    'fetch_size': 1000,
+}
+
+
+def load_settings(path=SETTINGS_PATH):
+    """
+    Load the settings file, or return an empty dict if it does not exist yet.
+    """
+    if not os.path.isfile(path):
+        return {}
+    with open(path, 'r') as file:
+        return yaml.safe_load(file) or {}
+
+
+def save_settings(values, path=SETTINGS_PATH):
+    """
+    Update the settings file with the given values, keeping the other keys as they are.
+    """
+    settings = load_settings(path)
+    settings.update(values)
+    with open(path, 'w') as file:
+        yaml.dump(settings, file)
+
+
+def neo4j_settings(settings=None):
+    """
+    Return the Neo4j connection settings, completed with the defaults.
+    """
+    if settings is None:
+        settings = load_settings()
+    return dict(NEO4J_DEFAULTS, **(settings.get('neo4j') or {}))
@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       similarity.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved.
+#
+
+import hashlib
+import heapq
+import json
+import os
+import random
+import sys
+import threading
+from array import array
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, the pure Python signatures are the same, only slower to compute
+    numpy = None
+
+# Mersenne prime of the universal hash functions, and masks of their 64 bits arithmetic and 32 bits results
+PRIME = (1 << 61) - 1
+MASK_64 = (1 << 64) - 1
+MASK_32 = (1 << 32) - 1
+
+# Version of the files written by MinHashIndex.save
+FORMAT = 1
+# Similarities are saved as integers in [0, SCORE_SCALE]
+SCORE_SCALE = 10000
+
+
+def recipe_tokens(ingredients=(), tags=(), cuisines=()):
+    """
+    Return the set of features a recipe is compared on: the names of its ingredients, tags and cuisines.
+    """
+    return {f"i:{name}" for name in ingredients if name} | {f"t:{name}" for name in tags if name} | \
+        {f"c:{name}" for name in cuisines if name}
+
+
+def token_hash(token):
+    # Stable across processes, unlike hash(), since the signatures are saved
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=4).digest(), 'little')
+
+
+def jaccard(first, second):
+    """
+    Return the exact Jaccard similarity of two sets.
+    """
+    if not first and not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+class MinHashIndex:
+    """
+    The MinHashIndex class keeps a MinHash signature of every recipe (`num_perm` 32 bits values, the fraction of
+    equal values of two signatures estimates the Jaccard similarity of their token sets) and the `k` most similar
+    recipes of each one. Candidates are found by LSH: the signature is cut in `bands` bands and two recipes are
+    compared if one of their bands is identical, so a lookup only looks at a few buckets instead of every recipe.
+    Buckets holding more than `max_bucket` recipes are ignored, they only gather very common features.
+
+    The recipes are saved in a JSON file and the signatures and neighbour lists in a binary file next to it, so the
+    lists are read without recomputing anything and a later sync updates the index incrementally.
+    Signatures are NumPy arrays when NumPy is installed, `array('I')` rows otherwise.
+    """
+
+    def __init__(self, num_perm=64, bands=32, k=10, seed=1, max_bucket=2000):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.k = k
+        self.seed = seed
+        self.max_bucket = max_bucket
+        self.lock = threading.Lock()
+
+        rng = random.Random(seed)
+        self.a = [rng.randrange(1, PRIME) for _ in range(num_perm)]
+        self.b = [rng.randrange(0, PRIME) for _ in range(num_perm)]
+        if numpy is not None:
+            self._a = numpy.array(self.a, dtype=numpy.uint64)
+            self._b = numpy.array(self.b, dtype=numpy.uint64)
+
+        self.ids = []            # position -> recipe _id
+        self.names = []          # position -> recipe name
+        self.positions = {}      # recipe _id -> position
+        self.neighbours = []     # position -> [(position, estimated similarity)], best first
+        self.packed = None       # (positions, scores) flat arrays of k entries per recipe, as read by load()
+        self.signatures = numpy.zeros((0, num_perm), dtype=numpy.uint32) if numpy is not None else []
+        self.buffer = None       # NumPy rows the signatures are a view of, with room to append more
+        self.buckets = None      # one {band bytes: [positions]} per band, built on first use
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.ids)
+
+    # Signatures
+
+    def signature(self, tokens):
+        """
+        Return the MinHash signature of a set of tokens.
+        """
+        hashes = [token_hash(token) for token in tokens] or [0]
+        if numpy is not None:
+            values = numpy.array(hashes, dtype=numpy.uint64)[:, None]
+            # uint64 products wrap around like the masked Python arithmetic below
+            return ((values * self._a + self._b) % numpy.uint64(PRIME) & numpy.uint64(MASK_32)) \
+                .min(axis=0).astype(numpy.uint32)
+        return array('I', (min(((a * value + b) & MASK_64) % PRIME & MASK_32 for value in hashes)
+                            for a, b in zip(self.a, self.b)))
+
+    def _band_keys(self, signature):
+        size = self.rows_per_band
+        return [signature[band * size:(band + 1) * size].tobytes() for band in range(self.bands)]
+
+    def _similarities(self, positions, signature):
+        # Estimated Jaccard similarity of a signature with the recipes at the given positions
+        if numpy is not None:
+            return (self.signatures[positions] == signature).mean(axis=1)
+        return [sum(x == y for x, y in zip(self.signatures[position], signature)) / self.num_perm
+                for position in positions]
+
+    def _store(self, signatures):
+        # Append signatures, in position order
+        if numpy is not None:
+            if not signatures:
+                return
+            count = len(self.signatures)
+            total = count + len(signatures)
+            if self.buffer is None or total > len(self.buffer):
+                # Double the capacity, so that appending batch after batch copies each signature a few times only
+                capacity = max(total, 2 * len(self.buffer) if self.buffer is not None else 0, 1024)
+                self.buffer = numpy.zeros((capacity, self.num_perm), dtype=numpy.uint32)
+                self.buffer[:count] = self.signatures
+            self.buffer[count:total] = signatures
+            self.signatures = self.buffer[:total]
+        else:
+            self.signatures.extend(signatures)
+
+    # LSH
+
+    def _ensure_buckets(self):
+        if self.buckets is not None:
+            return
+        self.buckets = [{} for _ in range(self.bands)]
+        for position in range(len(self.ids)):
+            self._bucket_add(position)
+
+    def _bucket_add(self, position):
+        for band, key in enumerate(self._band_keys(self.signatures[position])):
+            self.buckets[band].setdefault(key, []).append(position)
+
+    def _bucket_remove(self, position):
+        for band, key in enumerate(self._band_keys(self.signatures[position])):
+            bucket = self.buckets[band].get(key)
+            if bucket is not None and position in bucket:
+                bucket.remove(position)
+
+    def _candidates(self, position):
+        candidates = set()
+        for band, key in enumerate(self._band_keys(self.signatures[position])):
+            bucket = self.buckets[band].get(key, ())
+            if len(bucket) <= self.max_bucket:
+                candidates.update(bucket)
+        candidates.discard(position)
+        return sorted(candidates)
+
+    def _top(self, position):
+        # The k candidates most similar to a recipe
+        candidates = self._candidates(position)
+        if not candidates:
+            return []
+        scores = self._similarities(candidates, self.signatures[position])
+        if numpy is not None:
+            # The candidates are sorted, a stable sort keeps the lowest positions first among equal scores
+            return [(candidates[i], float(scores[i])) for i in numpy.argsort(-scores, kind='stable')[:self.k]]
+        return heapq.nsmallest(self.k, zip(candidates, scores), key=lambda pair: (-pair[1], pair[0]))
+
+    def _unpack(self):
+        # Turn the neighbour lists read by load() into lists, before they are changed
+        if self.packed is None:
+            return
+        positions, scores = self.packed
+        self.neighbours = [[(int(positions[i]), int(scores[i]) / SCORE_SCALE)
+                            for i in range(start, start + self.k) if positions[i] >= 0]
+                           for start in range(0, len(self.ids) * self.k, self.k)]
+        self.packed = None
+
+    # Building and updating
+
+    def add_many(self, rows):
+        """
+        Index a batch of (recipe _id, name, tokens) rows and update the neighbour lists. A recipe indexed before
+        is replaced, and removed from the lists of the other recipes first since its similarities changed.
+        """
+        with self.lock:
+            self._unpack()
+            self._ensure_buckets()
+            changed = []
+            new_signatures = []
+            # A recipe given twice is indexed once, with its last content
+            latest = {recipe_id: (name, tokens) for recipe_id, name, tokens in rows}
+            for recipe_id, (name, tokens) in latest.items():
+                signature = self.signature(tokens)
+                position = self.positions.get(recipe_id)
+                if position is None:
+                    position = len(self.ids)
+                    self.positions[recipe_id] = position
+                    self.ids.append(recipe_id)
+                    self.names.append(name)
+                    self.neighbours.append([])
+                    new_signatures.append(signature)
+                else:
+                    self._bucket_remove(position)
+                    self.names[position] = name
+                    self.signatures[position] = signature
+                    self._bucket_add(position)
+                changed.append(position)
+
+            first_new = len(self.ids) - len(new_signatures)
+            self._store(new_signatures)
+            for position in range(first_new, len(self.ids)):
+                self._bucket_add(position)
+
+            # Forget the former similarities of the recipes that were already indexed
+            replaced = {position for position in changed if position < first_new}
+            if replaced:
+                for position, neighbours in enumerate(self.neighbours):
+                    if position not in replaced and any(other in replaced for other, _ in neighbours):
+                        self.neighbours[position] = [pair for pair in neighbours if pair[0] not in replaced]
+
+            # Rank the candidates of the changed recipes, and offer each changed recipe to its candidates
+            for position in dict.fromkeys(changed):
+                top = self._top(position)
+                self.neighbours[position] = top
+                for other, score in top:
+                    self._offer(other, position, score)
+            self.dirty = True
+
+    def _offer(self, position, other, score):
+        # Insert `other` in the neighbour list of `position` if it ranks among the k best
+        neighbours = [pair for pair in self.neighbours[position] if pair[0] != other]
+        if len(neighbours) >= self.k and score <= neighbours[-1][1]:
+            return
+        neighbours.append((other, score))
+        neighbours.sort(key=lambda pair: (-pair[1], pair[0]))
+        self.neighbours[position] = neighbours[:self.k]
+
+    def build(self, rows, batch_size=1000):
+        """
+        Index (recipe _id, name, tokens) rows: every signature is computed and bucketed first, then the
+        neighbour lists are ranked once, which is faster than adding the recipes batch by batch.
+        """
+        with self.lock:
+            self._unpack()
+            self.buckets = [{} for _ in range(self.bands)]
+            batch = []
+            for recipe_id, name, tokens in rows:
+                if recipe_id in self.positions:
+                    continue
+                self.positions[recipe_id] = len(self.ids)
+                self.ids.append(recipe_id)
+                self.names.append(name)
+                self.neighbours.append([])
+                batch.append(self.signature(tokens))
+                if len(batch) >= batch_size:
+                    self._store(batch)
+                    batch = []
+            self._store(batch)
+            for position in range(len(self.ids)):
+                self._bucket_add(position)
+            for position in range(len(self.ids)):
+                self.neighbours[position] = self._top(position)
+            self.dirty = True
+        return self
+
+    def add_recipes(self, json_datas):
+        """
+        Index recipes as returned by the API. Used to keep the index up to date after each write.
+        """
+        self.add_many((recette_data.get('id'), recette_data.get('name'),
+                       recipe_tokens([entry.get('name') for entry in recette_data.get('ingredients') or []],
+                                     [entry.get('name') for entry in recette_data.get('tags') or []],
+                                     [entry.get('name') for entry in recette_data.get('cuisines') or []]))
+                      for recette_data in json_datas or [])
+
+    def on_write(self, json_datas, node_rows):
+        # Write listener registered on the Database
+        self.add_recipes(json_datas)
+
+    # Lookup
+
+    def similar(self, recipe_id, limit=None):
+        """
+        Return the recipes most similar to a recipe, best first, as dictionaries with their _id, name and
+        estimated similarity. An unknown recipe has none.
+        """
+        with self.lock:
+            position = self.positions.get(recipe_id)
+            if position is None:
+                return []
+            if self.packed is not None:
+                positions, scores = self.packed
+                start = position * self.k
+                neighbours = [(int(positions[i]), int(scores[i]) / SCORE_SCALE)
+                              for i in range(start, start + self.k) if positions[i] >= 0]
+            else:
+                neighbours = self.neighbours[position]
+            return [{'_id': self.ids[other], 'name': self.names[other], 'score': round(score, 3)}
+                    for other, score in neighbours[:limit]]
+
+    # Persistence
+
+    def save(self, path):
+        """
+        Write the index to `path`.json (parameters, recipe ids and names) and `path`.bin: the signatures
+        (uint32), then k neighbour positions (int32, -1 when there are fewer) and k similarities (uint16, scaled
+        by SCORE_SCALE) per recipe, all little-endian. Both files are replaced atomically.
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self.lock:
+            self._unpack()
+            positions = array('i', [-1]) * (len(self.ids) * self.k)
+            scores = array('H', [0]) * (len(self.ids) * self.k)
+            for position, neighbours in enumerate(self.neighbours):
+                for rank, (other, score) in enumerate(neighbours[:self.k]):
+                    positions[position * self.k + rank] = other
+                    scores[position * self.k + rank] = round(score * SCORE_SCALE)
+            if numpy is not None:
+                signatures = self.signatures.astype('<u4').tobytes()
+            else:
+                signatures = array('I', [value for signature in self.signatures for value in signature])
+                if sys.byteorder == 'big':
+                    signatures.byteswap()
+                signatures = signatures.tobytes()
+            if sys.byteorder == 'big':
+                positions.byteswap()
+                scores.byteswap()
+
+            header = {'format': FORMAT, 'num_perm': self.num_perm, 'bands': self.bands, 'k': self.k,
+                      'seed': self.seed, 'max_bucket': self.max_bucket, 'ids': self.ids, 'names': self.names}
+            with open(f"{path}.bin.tmp", 'wb') as file:
+                file.write(signatures)
+                file.write(positions.tobytes())
+                file.write(scores.tobytes())
+            with open(f"{path}.json.tmp", 'w', encoding='utf-8') as file:
+                json.dump(header, file, ensure_ascii=False, separators=(',', ':'))
+            os.replace(f"{path}.bin.tmp", f"{path}.bin")
+            os.replace(f"{path}.json.tmp", f"{path}.json")
+            self.dirty = False
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read an index saved by save(), or return None if there is none (or in another format).
+        The neighbour lists are only decoded when the index is updated.
+        """
+        try:
+            with open(f"{path}.json", encoding='utf-8') as file:
+                header = json.load(file)
+            with open(f"{path}.bin", 'rb') as file:
+                raw = file.read()
+        except (OSError, ValueError):
+            return None
+        count, num_perm, k = len(header.get('ids', ())), header.get('num_perm'), header.get('k')
+        if header.get('format') != FORMAT or len(raw) != count * (num_perm * 4 + k * 6):
+            return None
+
+        index = cls(num_perm, header['bands'], k, header['seed'], header['max_bucket'])
+        index.ids = header['ids']
+        index.names = header['names']
+        index.positions = {recipe_id: position for position, recipe_id in enumerate(index.ids)}
+        neighbours_start = count * num_perm * 4
+        scores_start = neighbours_start + count * k * 4
+        if numpy is not None:
+            index.signatures = numpy.frombuffer(raw, dtype='<u4', count=count * num_perm) \
+                .astype(numpy.uint32).reshape(count, num_perm)
+            index.packed = (numpy.frombuffer(raw, dtype='<i4', count=count * k, offset=neighbours_start),
+                            numpy.frombuffer(raw, dtype='<u2', count=count * k, offset=scores_start))
+        else:
+            signatures, positions, scores = array('I'), array('i'), array('H')
+            signatures.frombytes(raw[:neighbours_start])
+            positions.frombytes(raw[neighbours_start:scores_start])
+            scores.frombytes(raw[scores_start:])
+            if sys.byteorder == 'big':
+                for values in (signatures, positions, scores):
+                    values.byteswap()
+            index.signatures = [signatures[start:start + num_perm] for start in range(0, len(signatures), num_perm)]
+            index.packed = (positions, scores)
+        return index
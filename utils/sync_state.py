@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+#
+# File Name:       sync_state.py
+# Creation Date:   18/10/2026
+# Version:         0.0.1
+# Author:          simonstephan Simon STEPHAN <simon.stephan@u-bourgogne.fr>
+#
+# Copyright (c) 2023,
+# All rights reserved. 
+#
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+
+class SyncState:
+    """
+    The SyncState class keeps a fingerprint of every recipe written to the database in a local SQLite file,
+    so that an incremental sync only writes the recipes that are new or have changed since the last run.
+    """
+
+    def __init__(self, path='datas/sync_state.sqlite'):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("CREATE TABLE IF NOT EXISTS recipes ("
+                                "id TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, updated_at TEXT)")
+        self.connection.commit()
+        self.lock = threading.Lock()
+
+        # Fingerprints of the recipes classified but not written yet
+        self.pending = {}
+
+        # Number of new, changed and unchanged recipes seen during the current sync
+        self.counts = {'new': 0, 'changed': 0, 'unchanged': 0}
+
+    @staticmethod
+    def fingerprint(recette_data):
+        """
+        Return a content hash of a recipe as returned by the API.
+        """
+        content = json.dumps(recette_data, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def reset_counts(self):
+        self.counts = {'new': 0, 'changed': 0, 'unchanged': 0}
+
+    def classify(self, json_datas):
+        """
+        Return the recipes of a page that are new or have changed, and update the counters.
+        """
+        fingerprints = {recette_data.get('id'): self.fingerprint(recette_data) for recette_data in json_datas}
+        with self.lock:
+            known = dict(self.connection.execute(
+                f"SELECT id, fingerprint FROM recipes WHERE id IN ({','.join('?' * len(fingerprints))})",
+                list(fingerprints)).fetchall()) if fingerprints else {}
+
+            changed = []
+            for recette_data in json_datas:
+                recipe_id = recette_data.get('id')
+                if recipe_id not in known:
+                    self.counts['new'] += 1
+                elif known[recipe_id] != fingerprints[recipe_id]:
+                    self.counts['changed'] += 1
+                else:
+                    self.counts['unchanged'] += 1
+                    continue
+                self.pending[recipe_id] = fingerprints[recipe_id]
+                changed.append(recette_data)
+        return changed
+
+    def filter_pages(self, pages, stop_after_unchanged=0):
+        """
+        Yield the pages with only their new or changed recipes. When the API returns the most recently updated
+        recipes first, paging stops after `stop_after_unchanged` consecutive pages without any change.
+        """
+        streak = 0
+        for page in pages:
+            items = self.classify(page['items'])
+            streak = 0 if items else streak + 1
+            yield dict(page, items=items)
+            if stop_after_unchanged and streak >= stop_after_unchanged:
+                print(f"No change in the last {streak} pages, stopping the incremental sync early")
+                return
+
+    def commit(self, json_datas):
+        """
+        Record the fingerprints of recipes that have been written to the database.
+        """
+        with self.lock:
+            rows = [(recette_data.get('id'),
+                     self.pending.pop(recette_data.get('id'), None) or self.fingerprint(recette_data),
+                     recette_data.get('updatedAt'))
+                    for recette_data in json_datas]
+            self.connection.executemany("INSERT OR REPLACE INTO recipes (id, fingerprint, updated_at) "
+                                        "VALUES (?, ?, ?)", rows)
+            self.connection.commit()
+
+    def clear(self):
+        """
+        Forget every fingerprint, so that the next sync writes all the recipes again.
+        """
+        with self.lock:
+            self.connection.execute("DELETE FROM recipes")
+            self.connection.commit()
+            self.pending = {}
+
+    def close(self):
+        self.connection.close()